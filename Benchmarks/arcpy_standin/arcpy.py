@@ -0,0 +1,244 @@
+"""
+This software has been approved for release by the U.S. Geological Survey
+(USGS). Although the software has been subjected to rigorous review, the USGS
+reserves the right to update the software as needed pursuant to further
+analysis and review. No warranty, expressed or implied, is made by the USGS or
+the U.S. Government as to the functionality of the software and related
+material nor shall the fact of release constitute any such warranty.
+Furthermore, the software is released on condition that neither the USGS nor
+the U.S. Government shall be held liable for any damages resulting from its
+authorized or unauthorized use.
+
+Created:        17 Oct 2026
+Version:        1.2
+
+Changelog
+1.0     17 Oct 2026     Original development. Local stand-in for the ArcPy
+                        calls made by qa_decode and extract_bands.
+1.1     17 Oct 2026     BitwiseRightShift and BitwiseAnd.
+1.2     17 Oct 2026     Raster false values in Con.
+
+Only for benchmarking the "arcpy" backends without ArcGIS. Each call does
+the same amount of work ArcGIS has to do at minimum (full raster scans for
+attribute tables and Con, a full write for CopyRaster), with NumPy, so the
+timings show the cost of the call pattern rather than of ArcGIS itself.
+Rasters are read and written through raster_io; attribute tables are kept in
+memory.
+"""
+import re
+import sys
+import numpy as np
+import raster_io
+
+# numpy dtype: ArcGIS VALUETYPE code
+value_types = {
+    "uint8": 3,
+    "int8": 4,
+    "uint16": 5,
+    "int16": 6,
+    "uint32": 7,
+    "int32": 8,
+    "float32": 9,
+    "float64": 10
+}
+
+# ArcGIS pixel_type: numpy dtype
+pixel_types = {
+    "8_BIT_UNSIGNED": "uint8",
+    "16_BIT_UNSIGNED": "uint16",
+    "32_BIT_SIGNED": "int32"
+}
+
+# attribute tables, by raster path: {field: list}
+_tables = {}
+
+# calls made, by function name (for checking call patterns)
+calls = {}
+
+
+def _count(name):
+    calls[name] = calls.get(name, 0) + 1
+
+
+def _path(raster):
+    return raster.path if isinstance(raster, Raster) else str(raster)
+
+
+class ExecuteError(Exception):
+    pass
+
+
+class Raster(object):
+    def __init__(self, path, array=None):
+        """
+        Raster on disk, or in memory (result of a Spatial Analyst tool).
+
+        :param path: <str> Path to raster.
+        :param array: <numpy.ndarray> In-memory values.
+        """
+        self.path = path
+        self._array = array
+
+    def read(self):
+        if self._array is None:
+            with raster_io.open_raster(self.path) as r:
+                self._array = np.array(r.read())
+        return self._array
+
+
+class _Result(object):
+    def __init__(self, value):
+        self.value = value
+
+    def getOutput(self, i):
+        return self.value
+
+    def __str__(self):
+        return str(self.value)
+
+
+def AddError(message):
+    sys.stderr.write(message + "\n")
+
+
+def AddMessage(message):
+    sys.stdout.write(message + "\n")
+
+
+def GetMessages(severity=0):
+    return ""
+
+
+def CheckExtension(name):
+    return "Available"
+
+
+def CheckOutExtension(name):
+    return "CheckedOut"
+
+
+def RefreshTOC():
+    pass
+
+
+def GetRasterProperties_management(raster, prop):
+    _count("GetRasterProperties_management")
+    with raster_io.open_raster(_path(raster)) as r:
+        return _Result(value_types[r.dtype.name])
+
+
+def BuildRasterAttributeTable_management(raster, overwrite=None):
+    _count("BuildRasterAttributeTable_management")
+    path = _path(raster)
+    if path in _tables and overwrite != "Overwrite":
+        return
+
+    values, counts = np.unique(Raster(path).read(), return_counts=True)
+    _tables[path] = {"Value": values.tolist(), "Count": counts.tolist()}
+
+
+def AddField_management(raster, name, field_type, precision="", scale="",
+                        length=""):
+    _count("AddField_management")
+    table = _tables[_path(raster)]
+    table.setdefault(name, [None] * len(table["Value"]))
+
+
+def CopyRaster_management(raster, out_raster, pixel_type="8_BIT_UNSIGNED"):
+    _count("CopyRaster_management")
+    with raster_io.open_raster(raster.path) as like:
+        with raster_io.create_raster(out_raster, like,
+                                     pixel_types[pixel_type]) as out:
+            out.write(raster.read())
+
+
+def MakeRasterLayer_management(raster, name):
+    return _Result(name)
+
+
+class _Cursor(object):
+    def __init__(self, raster, fields):
+        if isinstance(fields, str):
+            fields = [fields]
+        self.table = _tables[_path(raster)]
+        self.fields = list(fields)
+        self.i = -1
+
+    def __iter__(self):
+        for self.i in range(len(self.table["Value"])):
+            yield [self.table[f][self.i] for f in self.fields]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+class da(object):
+    class SearchCursor(_Cursor):
+        pass
+
+    class UpdateCursor(_Cursor):
+        def updateRow(self, row):
+            for f, v in zip(self.fields, row):
+                self.table[f][self.i] = v
+
+    @staticmethod
+    def TableToNumPyArray(raster, fields):
+        if isinstance(fields, str):
+            fields = [fields]
+        table = _tables[_path(raster)]
+        out = np.zeros(len(table["Value"]),
+                       dtype=[(f, np.int64) for f in fields])
+        for f in fields:
+            out[f] = table[f]
+        return out
+
+
+class sa(object):
+    @staticmethod
+    def Con(in_raster, true_value, false_value, where_clause=""):
+        """
+        Evaluate a "Value = a Or Value = b ..." clause over a whole raster.
+
+        ArcGIS parses and evaluates the clause per pixel; this does the
+        equivalent set test, so cost still grows with the clause length.
+        """
+        _count("Con")
+        if not isinstance(in_raster, Raster):
+            in_raster = Raster(in_raster)
+        qa = in_raster.read()
+
+        values = [int(v) for v in re.findall(r"Value = (-?\d+)",
+                                             where_clause)]
+        hit = np.isin(qa, values) if where_clause else qa != 0
+        if isinstance(false_value, Raster):
+            false_value = false_value.read()
+
+        return Raster(in_raster.path,
+                      np.where(hit, true_value, false_value).astype(np.uint8))
+
+
+    @staticmethod
+    def BitwiseRightShift(in_raster, shift):
+        _count("BitwiseRightShift")
+        if not isinstance(in_raster, Raster):
+            in_raster = Raster(in_raster)
+
+        return Raster(in_raster.path, in_raster.read() >> shift)
+
+    @staticmethod
+    def BitwiseAnd(in_raster, value):
+        _count("BitwiseAnd")
+        if not isinstance(in_raster, Raster):
+            in_raster = Raster(in_raster)
+
+        return Raster(in_raster.path, in_raster.read() & value)
+
+
+class mapping(object):
+    @staticmethod
+    def MapDocument(name):
+        # never running inside of ArcMap
+        raise RuntimeError("Not running in ArcMap.")
@@ -0,0 +1,293 @@
+"""
+This software has been approved for release by the U.S. Geological Survey
+(USGS). Although the software has been subjected to rigorous review, the USGS
+reserves the right to update the software as needed pursuant to further
+analysis and review. No warranty, expressed or implied, is made by the USGS or
+the U.S. Government as to the functionality of the software and related
+material nor shall the fact of release constitute any such warranty.
+Furthermore, the software is released on condition that neither the USGS nor
+the U.S. Government shall be held liable for any damages resulting from its
+authorized or unauthorized use.
+
+Created:        17 Oct 2026
+Version:        1.1
+
+Changelog
+1.0     17 Oct 2026     Original development. Times decode, extract and
+                        stats on synthetic QA rasters.
+1.1     17 Oct 2026     Stats timed through qa_api.stats.
+
+Usage:
+    python run_benchmarks.py [--sizes small scene] [--bands pixel_qa BQA]
+                             [--backends arcpy numpy] [--repeat 3]
+                             [-o results.json] [--compare baseline.json]
+
+The "arcpy" backends run against the local stand-in in arcpy_standin/,
+unless --installed-arcpy is given. Results are written as JSON, one record
+per (band, sensor, size, backend, operation), and can be compared with a
+previous run to find regressions.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+
+here = os.path.dirname(os.path.abspath(__file__))
+
+import synthetic
+
+import numpy as np
+import lookup_dict
+import lut_cache
+import flag_registry
+
+# result fields identifying a benchmark, for comparing runs
+key_fields = ("band", "sensor", "size", "backend", "op")
+
+
+def _git_revision():
+    try:
+        out = subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=here,
+                                      stderr=subprocess.STDOUT)
+        return out.decode("ascii").strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def time_call(func, repeat, setup=None):
+    """
+    Time a function, best and median of several runs.
+
+    :param func: <func> Function to time, without arguments.
+    :param repeat: <int> Number of runs.
+    :param setup: <func> Called before each run, not timed.
+    :return: <dict> min, median and all run times in seconds.
+    """
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        t0 = time.time()
+        func()
+        times.append(time.time() - t0)
+
+    return {"seconds_min": min(times),
+            "seconds_median": float(np.median(times)),
+            "seconds": times}
+
+
+def benchmark_scene(path, band, sens, size, backends, repeat, workdir,
+                    threads=None):
+    """
+    Time every operation on one synthetic raster.
+
+    :param path: <str> Path to raster.
+    :param band: <str> Band type.
+    :param sens: <str> Sensor type, as either "L8" or "L47".
+    :param size: <str> Size name.
+    :param backends: <list> Backend names.
+    :param repeat: <int> Number of runs of each operation.
+    :param workdir: <str> Directory for outputs and caches.
+    :param threads: <int> Threads for the numpy backend.
+    :return: <list> Result records.
+    """
+    import qa_decode
+    import extract_bands
+    import qa_api
+
+    names = flag_registry.get_flags(band, sens).names
+    basename = os.path.join(workdir, "out")
+    hist_dir = os.path.join(lut_cache.cache_dir(), "hist")
+    rows, cols = synthetic.sizes[size]
+
+    def cold():
+        # value counts must be recomputed in every run
+        shutil.rmtree(hist_dir, ignore_errors=True)
+
+        # as do attribute tables held by the arcpy stand-in
+        standin = sys.modules.get("arcpy")
+        if standin is not None and hasattr(standin, "_tables"):
+            standin._tables.clear()
+
+    numpy_opts = {"threads": threads} if threads else {}
+
+    ops = []
+    if "arcpy" in backends:
+        ops += [
+            ("arcpy", "decode", lambda: qa_decode.build_attr_table_arcpy(
+                path, sens, band)),
+            ("arcpy", "extract_each", lambda: extract_bands.extract_bits_arcpy(
+                path, sens, band, names, basename)),
+            ("arcpy", "extract_combined",
+             lambda: extract_bands.extract_bits_arcpy(
+                 path, sens, band, names, basename, combine_layers=True))]
+
+    if "numpy" in backends:
+        ops += [
+            ("numpy", "decode", lambda: qa_decode.build_attr_table_numpy(
+                path, sens, band, **numpy_opts)),
+            ("numpy", "extract_each", lambda: extract_bands.extract_bits_numpy(
+                path, sens, band, names, basename, **numpy_opts)),
+            ("numpy", "extract_combined",
+             lambda: extract_bands.extract_bits_numpy(
+                 path, sens, band, names, basename, combine_layers=True,
+                 **numpy_opts)),
+            ("numpy", "extract_stack",
+             lambda: extract_bands.extract_bits_numpy(
+                 path, sens, band, names, basename, stack=True,
+                 **numpy_opts)),
+            ("numpy", "stats", lambda: qa_api.stats(
+                path, sens, band, **numpy_opts))]
+
+    results = []
+    for backend, op, func in ops:
+        sys.stdout.write("  {0:6s} {1:17s} ".format(backend, op))
+        sys.stdout.flush()
+        try:
+            timing = time_call(func, repeat, cold)
+            status = "ok"
+        except Exception as e:
+            timing = {}
+            status = "{0}: {1}".format(type(e).__name__, e)
+
+        rec = {"band": band, "sensor": sens, "size": size, "rows": rows,
+               "cols": cols, "backend": backend, "op": op,
+               "flags": len(names), "status": status}
+        rec.update(timing)
+        if timing:
+            rec["mpix_per_s"] = rows * cols / 1e6 / timing["seconds_min"]
+            sys.stdout.write("{0:8.3f} s\n".format(timing["seconds_min"]))
+        else:
+            sys.stdout.write(status + "\n")
+        results.append(rec)
+
+    return results
+
+
+def compare(results, baseline, tolerance=0.1):
+    """
+    Compare results with a previous run.
+
+    :param results: <list> Result records.
+    :param baseline: <list> Result records of previous run.
+    :param tolerance: <float> Relative slow-down reported as regression.
+    :return: <list> (key, old seconds, new seconds, ratio, regressed) tuples.
+    """
+    old = dict((tuple(r[k] for k in key_fields), r) for r in baseline
+               if "seconds_min" in r)
+
+    rows = []
+    for r in results:
+        key = tuple(r[k] for k in key_fields)
+        if key in old and "seconds_min" in r:
+            ratio = r["seconds_min"] / max(old[key]["seconds_min"], 1e-9)
+            rows.append((key, old[key]["seconds_min"], r["seconds_min"],
+                         ratio, ratio > 1 + tolerance))
+
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark QA decoding and extraction.")
+    parser.add_argument("--sizes", nargs="+", default=["small"],
+                        choices=sorted(synthetic.sizes))
+    parser.add_argument("--bands", nargs="+",
+                        default=sorted(lookup_dict.bit_flags))
+    parser.add_argument("--sensors", nargs="+", default=["L8", "L47"])
+    parser.add_argument("--backends", nargs="+", default=["arcpy", "numpy"],
+                        choices=["arcpy", "numpy"])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--threads", type=int,
+                        help="Threads for the numpy backend.")
+    parser.add_argument("--workdir",
+                        help="Directory for rasters (default: temporary).")
+    parser.add_argument("--installed-arcpy", action="store_true",
+                        help="Use ArcPy instead of the local stand-in.")
+    parser.add_argument("-o", "--output", help="Write results to JSON file.")
+    parser.add_argument("--compare", help="Previous results (JSON) to "
+                                          "compare with.")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="Relative slow-down reported as regression.")
+    args = parser.parse_args(argv)
+
+    if not args.installed_arcpy:
+        sys.path.insert(0, os.path.join(here, "arcpy_standin"))
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="qa_bench_")
+    if not os.path.isdir(workdir):
+        os.makedirs(workdir)
+    os.environ["LANDSAT_QA_CACHE"] = os.path.join(workdir, "cache")
+
+    import raster_io
+    rat = raster_io.gdal is not None
+    if not rat:
+        # without GDAL there is nowhere to write attribute tables; time
+        #   the rest of the numpy decode
+        raster_io.write_attr_table = lambda *a, **k: None
+
+    meta = {"time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git_revision": _git_revision(),
+            "table_version": lut_cache.table_version(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count() if hasattr(os, "cpu_count") else None,
+            "arcpy": "installed" if args.installed_arcpy else "stand-in",
+            "attribute_tables_written": rat,
+            "repeat": args.repeat,
+            "threads": args.threads}
+
+    results = []
+    try:
+        for size in args.sizes:
+            for band in args.bands:
+                for sens in args.sensors:
+                    if sens not in lookup_dict.bit_flags.get(band, {}):
+                        continue
+
+                    sys.stdout.write("{0} {1} {2}\n".format(band, sens,
+                                                            size))
+                    t0 = time.time()
+                    lut_cache.build_table(band, sens)
+                    results.append({"band": band, "sensor": sens,
+                                    "size": size, "backend": "-",
+                                    "op": "lut_build", "status": "ok",
+                                    "seconds_min": time.time() - t0})
+
+                    scene_dir = tempfile.mkdtemp(dir=workdir)
+                    path = synthetic.write_qa(scene_dir, band, sens, size)
+                    results.extend(benchmark_scene(
+                        path, band, sens, size, args.backends, args.repeat,
+                        scene_dir, args.threads))
+                    shutil.rmtree(scene_dir, ignore_errors=True)
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {"meta": meta, "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressed = 0
+        for key, old, new, ratio, bad in compare(results, baseline,
+                                                 args.tolerance):
+            regressed += bad
+            sys.stdout.write("{0:40s} {1:8.3f} {2:8.3f} {3:6.2f}x{4}\n".format(
+                " ".join(key), old, new, ratio, "  REGRESSION" if bad else ""))
+        return 1 if regressed else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,277 @@
+"""
+This software has been approved for release by the U.S. Geological Survey
+(USGS). Although the software has been subjected to rigorous review, the USGS
+reserves the right to update the software as needed pursuant to further
+analysis and review. No warranty, expressed or implied, is made by the USGS or
+the U.S. Government as to the functionality of the software and related
+material nor shall the fact of release constitute any such warranty.
+Furthermore, the software is released on condition that neither the USGS nor
+the U.S. Government shall be held liable for any damages resulting from its
+authorized or unauthorized use.
+
+Created:        17 Oct 2026
+Version:        1.0
+
+Changelog
+1.0     17 Oct 2026     Original development. Synthetic QA rasters built
+                        from the flags in lookup_dict.
+"""
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                os.pardir, "Scripts"))
+
+import flag_registry
+import raster_io
+
+# size name: (rows, columns)
+sizes = {
+    "small": (1024, 1024),
+    "scene": (7801, 7681),
+    "mosaic": (20000, 20000)
+}
+
+# file name patterns of each band, so scene_info can detect them
+file_ids = {
+    "L8": "LC08_L1TP_029030_20170801_20170812_01_T1",
+    "L47": "LE07_L1TP_029030_20170801_20170812_01_T1"
+}
+
+
+# rows generated at a time when writing rasters
+STRIP_ROWS = 1024
+
+
+def coarse_grid(rows, cols, rng, cell):
+    """
+    Random values on a grid of cell x cell pixel cells, covering a raster.
+
+    :param rows: <int> Number of rows.
+    :param cols: <int> Number of columns.
+    :param rng: <numpy.random.RandomState> Random number generator.
+    :param cell: <int> Size of the features, in pixels.
+    :return: <numpy.ndarray> float32 array.
+    """
+    return rng.random_sample((rows // cell + 2,
+                              cols // cell + 2)).astype(np.float32)
+
+
+def smooth_field(coarse, cell, row_off, nrows, cols, dy=0, dx=0):
+    """
+    Spatially correlated random field in [0, 1), like cloud or snow cover.
+
+    The coarse grid is interpolated bilinearly, so any strip of rows can be
+    generated on its own and matches the same rows of the whole raster.
+
+    :param coarse: <numpy.ndarray> Grid from coarse_grid().
+    :param cell: <int> Size of the features, in pixels.
+    :param row_off: <int> First row of strip.
+    :param nrows: <int> Number of rows in strip.
+    :param cols: <int> Number of columns.
+    :param dy: <int> Shift of the field down, in pixels.
+    :param dx: <int> Shift of the field right, in pixels.
+    :return: <numpy.ndarray> float32 array, shape (nrows, cols).
+    """
+    y = np.clip(np.arange(row_off, row_off + nrows) - dy, 0, None) \
+        .astype(np.float32) / cell
+    x = np.clip(np.arange(cols) - dx, 0, None).astype(np.float32) / cell
+    y0 = np.minimum(y.astype(np.int64), coarse.shape[0] - 2)
+    x0 = np.minimum(x.astype(np.int64), coarse.shape[1] - 2)
+    fy = (y - y0)[:, None]
+    fx = (x - x0)[None, :]
+
+    top = coarse[y0][:, x0] * (1 - fx) + coarse[y0][:, x0 + 1] * fx
+    bot = coarse[y0 + 1][:, x0] * (1 - fx) + coarse[y0 + 1][:, x0 + 1] * fx
+
+    return top * (1 - fy) + bot * fy
+
+
+def footprint(rows, cols, row_off=0, nrows=None):
+    """
+    Tilted scene footprint; pixels outside of it are Fill, as in Landsat
+    path/row scenes.
+
+    :param rows: <int> Number of rows in raster.
+    :param cols: <int> Number of columns.
+    :param row_off: <int> First row of strip.
+    :param nrows: <int> Number of rows in strip (default: to last row).
+    :return: <numpy.ndarray> Boolean array, True inside of the scene.
+    """
+    if nrows is None:
+        nrows = rows - row_off
+
+    y = np.arange(row_off, row_off + nrows)[:, None]
+    x = np.arange(cols)[None, :]
+    u = (x - cols / 2.0) * 0.97 + (y - rows / 2.0) * 0.22
+    v = (y - rows / 2.0) * 0.97 - (x - cols / 2.0) * 0.22
+
+    return (np.abs(u) < cols * 0.4) & (np.abs(v) < rows * 0.4)
+
+
+def _set(qa, flags, name, where):
+    # set the bits of a flag, if the band has it
+    if name in flags.by_name:
+        np.bitwise_or(qa, flags[name].mask, out=qa, where=where)
+
+
+class QAGenerator(object):
+    def __init__(self, band, sens, rows, cols, seed=0):
+        """
+        Synthetic QA band, with realistic proportions of each flag.
+
+        Cloud, shadow, snow, water, aerosol and saturation are drawn from
+        smooth random fields, and written with the bits of
+        lookup_dict.bit_flags. The result depends only on the seed, not on
+        how the raster is split into strips.
+
+        :param band: <str> Band type.
+        :param sens: <str> Sensor type, as either "L8" or "L47".
+        :param rows: <int> Number of rows.
+        :param cols: <int> Number of columns.
+        :param seed: <int> Random seed.
+        """
+        self.band = band
+        self.flags = flag_registry.get_flags(band, sens)
+        self.rows = rows
+        self.cols = cols
+        self.seed = seed
+
+        rng = np.random.RandomState(seed)
+        self.cloud = coarse_grid(rows, cols, rng, 64)
+        self.surface = coarse_grid(rows, cols, rng, 256)
+        self.aerosol = coarse_grid(rows, cols, rng, 128)
+
+    def strip(self, row_off, nrows):
+        """
+        Generate a strip of rows.
+
+        :param row_off: <int> First row of strip.
+        :param nrows: <int> Number of rows in strip.
+        :return: <numpy.ndarray> uint16 array, shape (nrows, cols).
+        """
+        band, flags, cols = self.band, self.flags, self.cols
+        # per-pixel noise is seeded by row, so strips match the whole raster
+        noise = np.vstack([np.random.RandomState([self.seed, r])
+                           .random_sample(cols)
+                           for r in range(row_off, row_off + nrows)])
+        qa = np.zeros((nrows, cols), dtype=np.uint16)
+
+        inside = footprint(self.rows, cols, row_off, nrows)
+        cloud = smooth_field(self.cloud, 64, row_off, nrows, cols)
+        surface = smooth_field(self.surface, 256, row_off, nrows, cols)
+
+        is_cloud = inside & (cloud > 0.75)
+        # shadows are cast a few pixels away from clouds
+        is_shadow = inside & ~is_cloud & (smooth_field(
+            self.cloud, 64, row_off, nrows, cols, dy=40, dx=-30) > 0.8)
+        is_water = inside & ~is_cloud & (surface < 0.12)
+        is_snow = inside & ~is_cloud & ~is_water & (surface > 0.93)
+
+        if band in ("pixel_qa", "BQA"):
+            _set(qa, flags, "Cloud", is_cloud)
+            _set(qa, flags, "High Cloud Confidence", is_cloud)
+            _set(qa, flags, "Medium Cloud Confidence", inside & ~is_cloud &
+                 (cloud > 0.6))
+            _set(qa, flags, "Low Cloud Confidence", inside & (cloud <= 0.6))
+            _set(qa, flags, "Low Cirrus Confidence", inside)
+            _set(qa, flags, "High Cirrus Confidence", is_cloud &
+                 (cloud > 0.9))
+
+        if band == "pixel_qa":
+            _set(qa, flags, "Cloud Shadow", is_shadow)
+            _set(qa, flags, "Water", is_water & ~is_shadow)
+            _set(qa, flags, "Snow", is_snow & ~is_shadow)
+            _set(qa, flags, "Clear", inside & ~is_cloud & ~is_shadow &
+                 ~is_water & ~is_snow)
+            _set(qa, flags, "Terrain Occlusion", inside & (noise < 1e-4))
+
+        elif band == "BQA":
+            _set(qa, flags, "Low Cloud Shadow Confidence", inside)
+            _set(qa, flags, "High Cloud Shadow Confidence", is_shadow)
+            _set(qa, flags, "Low Snow/Ice Confidence", inside)
+            _set(qa, flags, "High Snow/Ice Confidence", is_snow)
+            _set(qa, flags, "High Radiometric Saturation", inside &
+                 (noise < 2e-3))
+            _set(qa, flags, "Dropped Pixel", inside & (noise > 1 - 1e-5))
+
+        elif band == "radsat_qa":
+            # saturation over bright clouds, a different band per pixel
+            sat = inside & is_cloud & (noise < 0.05)
+            names = [f.name for f in flags if f.name != "Fill"]
+            which = (noise * 1000).astype(np.int64) % len(names)
+            for i, name in enumerate(names):
+                _set(qa, flags, name, sat & (which == i))
+
+        elif band == "sr_aerosol":
+            aero = smooth_field(self.aerosol, 128, row_off, nrows, cols)
+            _set(qa, flags, "Aerosol Retrieval - Valid", inside & ~is_water)
+            _set(qa, flags, "Aerosol Retrieval - Interpolated", is_water)
+            _set(qa, flags, "Water", is_water)
+            _set(qa, flags, "High Aerosol", inside & (aero > 0.8))
+            _set(qa, flags, "Medium Aerosol", inside & (aero > 0.5) &
+                 (aero <= 0.8))
+            _set(qa, flags, "Low Aerosol", inside & (aero > 0.2) &
+                 (aero <= 0.5))
+
+        elif band == "sr_cloud_qa":
+            _set(qa, flags, "Cloud", is_cloud)
+            _set(qa, flags, "Cloud Shadow", is_shadow)
+            _set(qa, flags, "Adjacent to Cloud", inside & ~is_cloud &
+                 (cloud > 0.7))
+            _set(qa, flags, "Snow", is_snow)
+            _set(qa, flags, "Water", is_water)
+            _set(qa, flags, "DDV", inside & ~is_water & (surface > 0.3) &
+                 (surface < 0.4))
+
+        _set(qa, flags, "Fill", ~inside)
+
+        return qa
+
+
+def make_qa(band, sens, rows, cols, seed=0):
+    """
+    Generate a whole synthetic QA band in memory.
+
+    :param band: <str> Band type.
+    :param sens: <str> Sensor type, as either "L8" or "L47".
+    :param rows: <int> Number of rows.
+    :param cols: <int> Number of columns.
+    :param seed: <int> Random seed.
+    :return: <numpy.ndarray> uint16 array.
+    """
+    return QAGenerator(band, sens, rows, cols, seed).strip(0, rows)
+
+
+class _Like(object):
+    # size and georeferencing for raster_io writers
+    def __init__(self, rows, cols):
+        self.shape = (rows, cols)
+        self.geotransform = (500000.0, 30.0, 0.0, 4500000.0, 0.0, -30.0)
+        self.projection = ""
+
+
+def write_qa(directory, band, sens, size, seed=0):
+    """
+    Generate a synthetic QA band and write it as an ESPA style ENVI raster,
+    one strip of rows at a time.
+
+    :param directory: <str> Output directory.
+    :param band: <str> Band type.
+    :param sens: <str> Sensor type, as either "L8" or "L47".
+    :param size: <str> Key of sizes, or (rows, columns).
+    :param seed: <int> Random seed.
+    :return: <str> Path to raster.
+    """
+    rows, cols = sizes[size] if size in sizes else size
+    path = os.path.join(directory, "{0}_{1}.img".format(file_ids[sens],
+                                                        band))
+
+    gen = QAGenerator(band, sens, rows, cols, seed)
+    with raster_io.EnviWriter(path, _Like(rows, cols), "uint16") as out:
+        for row_off in range(0, rows, STRIP_ROWS):
+            nrows = min(STRIP_ROWS, rows - row_off)
+            out.write(gen.strip(row_off, nrows), row_off)
+
+    return path
@@ -0,0 +1,316 @@
+"""
+This software has been approved for release by the U.S. Geological Survey
+(USGS). Although the software has been subjected to rigorous review, the USGS
+reserves the right to update the software as needed pursuant to further
+analysis and review. No warranty, expressed or implied, is made by the USGS or
+the U.S. Government as to the functionality of the software and related
+material nor shall the fact of release constitute any such warranty.
+Furthermore, the software is released on condition that neither the USGS nor
+the U.S. Government shall be held liable for any damages resulting from its
+authorized or unauthorized use.
+
+Created:        17 Oct 2026
+Version:        1.8
+
+Changelog
+1.0     17 Oct 2026     Original development. Decode and extract many scenes
+                        over a process pool.
+1.1     17 Oct 2026     Scenes processed through qa_api.
+1.2     17 Oct 2026     Packed mask output option.
+1.3     17 Oct 2026     Sparse mask output option.
+1.4     17 Oct 2026     Up to date products skipped (output_manifest).
+1.5     17 Oct 2026     Outputs of earlier runs not taken for scenes.
+1.6     17 Oct 2026     Attribute table sidecars and arcpy outputs recorded
+                        in the manifest.
+1.7     17 Oct 2026     Attribute tables written into the input do not make
+                        its products stale.
+1.8     17 Oct 2026     Products whose outputs are not known left unrecorded.
+"""
+import os
+import glob
+import json
+import time
+import traceback
+import multiprocessing
+import scene_info
+
+# file extensions searched for when a directory is given
+raster_exts = ('.tif', '.TIF', '.img')
+
+# extensions of scene list (manifest) files
+manifest_exts = ('.txt', '.csv', '.lst')
+
+# backend options only understood by extraction
+extract_options = ('stack', 'packed', 'sparse')
+
+
+class Scene(object):
+    def __init__(self, path, sensor=None, band=None):
+        """
+        Single QA raster to be processed.
+
+        :param path: <str> Path to raster.
+        :param sensor: <str> Sensor display name (default: from file name).
+        :param band: <str> Band type (default: from file name).
+        """
+        self.path = path
+        self.sensor = sensor or scene_info.detect_sensor(
+            os.path.basename(path))
+        self.band = band or scene_info.detect_band(os.path.basename(path))
+
+
+def read_manifest(path):
+    """
+    Read scene list; one path per line, optionally followed by sensor and
+    band, comma separated. Blank lines and lines starting with # are skipped.
+
+    :param path: <str> Path to manifest file.
+    :return: <list> Scene objects.
+    """
+    scenes = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+
+            cols = [c.strip() for c in line.split(',')]
+            cols += [None] * (3 - len(cols))
+            scenes.append(Scene(cols[0], cols[1] or None, cols[2] or None))
+
+    return scenes
+
+
+def find_scenes(inputs):
+    """
+    Expand directories, glob patterns and manifests into a list of scenes.
+
+    Directories are searched (not recursively) for scene QA bands (see
+    scene_info.detect_scene_band), so outputs written next to the scenes
+    are not taken for scenes on later runs.
+
+    :param inputs: <list> Directories, glob patterns, manifests or rasters.
+    :return: <list> Scene objects.
+    """
+    scenes = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for fname in sorted(os.listdir(item)):
+                if fname.endswith(raster_exts) and \
+                        scene_info.detect_scene_band(fname):
+                    scenes.append(Scene(os.path.join(item, fname)))
+
+        elif os.path.isfile(item) and item.endswith(manifest_exts):
+            scenes.extend(read_manifest(item))
+
+        elif os.path.isfile(item):
+            scenes.append(Scene(item))
+
+        else:
+            scenes.extend(Scene(p) for p in sorted(glob.glob(item)))
+
+    return scenes
+
+
+def _products(scene_path, basename, targets, combine_layers, extract_opts):
+    # (key, flags) of each extracted product; flags written to separate
+    #   rasters are separate products, so each is redone on its own
+    if combine_layers or extract_opts.get("stack"):
+        groups = [targets]
+    else:
+        groups = [[f] for f in targets]
+
+    mode = sorted(k for k, v in extract_opts.items() if v)
+    if combine_layers:
+        mode.append("combine")
+
+    return [({"kind": "extract", "input": os.path.abspath(scene_path),
+              "basename": os.path.abspath(basename), "flags": g,
+              "mode": mode}, g) for g in groups]
+
+
+def process_scene(scene, decode=True, flags=None, combine_layers=False,
+                  out_dir=None, rm_low=False, backend=None, options=None,
+                  manifest=None):
+    """
+    Decode and/or extract a single scene.
+
+    Any error is caught and returned in the result, so one bad scene does not
+    stop a batch.
+
+    With a manifest, products (the attribute table, and the output(s) of each
+    flag) whose input content, flag definitions and options are unchanged
+    since they were recorded are skipped, and only the others are redone.
+    Products whose recorded outputs (including attribute table sidecars, see
+    qa_decode.attr_table_files) are missing are redone as well.
+
+    :param scene: <Scene> Scene to process.
+    :param decode: <bool> Build attribute table.
+    :param flags: <list> Flag names to extract (default: none). Flags not
+                         defined for the scene's band are skipped.
+    :param combine_layers: <bool> Combine all extracted bits to single band.
+    :param out_dir: <str> Directory for extracted bands (default: next to
+                          input raster).
+    :param rm_low: <bool> Remove (True) or keep (False) 'low' labels.
+    :param backend: <str> Backend name (default: as extract_bands).
+    :param options: <dict> Backend specific options; those in
+                           extract_options are only passed to extraction.
+    :param manifest: <str> Output manifest directory (default: none, redo
+                           everything).
+    :return: <dict> Result of scene; "skipped" lists up to date products
+                    ("decode", or flag names).
+    """
+    import qa_api
+
+    result = {"path": scene.path, "sensor": scene.sensor, "band": scene.band,
+              "status": "ok", "error": None, "outputs": [], "skipped": []}
+    options = dict(options or {})
+    extract_opts = dict((k, options.pop(k)) for k in extract_options
+                        if k in options)
+    t0 = time.time()
+
+    try:
+        store = None
+        if manifest:
+            import output_manifest
+
+            store = output_manifest.Manifest(manifest)
+            sens, band = qa_api.resolve_scene(scene.path, scene.sensor,
+                                              scene.band)
+            content = store.input_hash(scene.path)
+
+            def signature(flag_names, **settings):
+                # only settings changing the product's outputs
+                settings.update({"input": content, "band": band,
+                                 "sensor": sens,
+                                 "flags": output_manifest.flag_version(
+                                     band, sens, flag_names)})
+                return settings
+
+        if decode:
+            import qa_decode
+
+            key = {"kind": "decode", "input": os.path.abspath(scene.path)}
+            if store:
+                settings = signature(None, rm_low=bool(rm_low))
+            if store and store.is_current(key, settings):
+                result["skipped"].append("decode")
+            else:
+                qa_api.decode(scene.path, scene.sensor, scene.band, rm_low,
+                              backend=backend, **options)
+                if store:
+                    # tables held in the raster itself (e.g. .img) change
+                    #   the input, but not the products made from it
+                    store.keep_input_hash(scene.path, content)
+                    store.record(key, settings, qa_decode.attr_table_files(
+                        scene.path, backend))
+
+        names = qa_api.flag_names(scene.path, scene.sensor, scene.band)
+        targets = [f for f in (flags or []) if f in names]
+        if targets:
+            basename = os.path.splitext(scene.path)[0]
+            if out_dir:
+                basename = os.path.join(out_dir, os.path.basename(basename))
+            options.update(extract_opts)
+
+            products = _products(scene.path, basename, targets,
+                                 combine_layers, extract_opts)
+            stale = products
+            mode = {"combine_layers": bool(combine_layers),
+                    "options": sorted(k for k, v in extract_opts.items()
+                                      if v)}
+            if store:
+                stale = []
+                for key, group in products:
+                    if store.is_current(key, signature(group, **mode)):
+                        result["skipped"].extend(group)
+                        result["outputs"].extend(store.outputs(key))
+                    else:
+                        stale.append((key, group))
+
+            if stale:
+                outputs = qa_api.extract(scene.path,
+                                         [f for _, g in stale for f in g],
+                                         basename, scene.sensor, scene.band,
+                                         combine_layers, backend=backend,
+                                         **options) or []
+                result["outputs"].extend(outputs)
+
+                # one output per flag, unless combined or stacked; products
+                #   whose outputs are not known are left unrecorded (stale),
+                #   as a record without outputs would never be redone
+                if store and outputs and \
+                        (len(stale) == 1 or len(outputs) == len(stale)):
+                    for i, (key, group) in enumerate(stale):
+                        store.record(key, signature(group, **mode),
+                                     outputs[i:i + 1] if len(stale) > 1
+                                     else outputs)
+
+    except (Exception, SystemExit) as e:
+        result["status"] = "failed"
+        result["error"] = "{0}: {1}".format(type(e).__name__, e)
+        result["traceback"] = traceback.format_exc()
+
+    result["seconds"] = round(time.time() - t0, 3)
+
+    return result
+
+
+def _process_scene(args):
+    # unpack arguments for Pool.imap_unordered
+    scene, kwargs = args
+    return process_scene(scene, **kwargs)
+
+
+def run_batch(scenes, workers=None, **kwargs):
+    """
+    Process many scenes over a pool of worker processes.
+
+    On Windows, call from within an `if __name__ == "__main__":` block.
+
+    :param scenes: <list> Scene objects, as returned by find_scenes().
+    :param workers: <int> Number of worker processes (default: number of
+                          CPUs). 1 processes all scenes in this process.
+    :param kwargs: Arguments passed on to process_scene().
+    :return: <dict> Summary report.
+    """
+    workers = workers or multiprocessing.cpu_count()
+    t0 = time.time()
+
+    tasks = [(s, kwargs) for s in scenes]
+    if workers == 1 or len(tasks) <= 1:
+        results = [_process_scene(t) for t in tasks]
+    else:
+        pool = multiprocessing.Pool(workers)
+        try:
+            results = list(pool.imap_unordered(_process_scene, tasks))
+        finally:
+            pool.close()
+            pool.join()
+
+    # report in input order, not completion order
+    order = dict((s.path, i) for i, s in enumerate(scenes))
+    results.sort(key=lambda r: order[r["path"]])
+
+    failed = [r for r in results if r["status"] != "ok"]
+    skipped = [r for r in results if r["skipped"]]
+
+    return {"scenes": len(results),
+            "succeeded": len(results) - len(failed),
+            "failed": len(failed),
+            "skipped": len(skipped),
+            "workers": workers,
+            "seconds": round(time.time() - t0, 3),
+            "results": results}
+
+
+def write_report(summary, path):
+    """
+    Write batch summary report to a JSON file.
+
+    :param summary: <dict> As returned by run_batch().
+    :param path: <str> Path to report.
+    :return:
+    """
+    with open(path, "w") as f:
+        json.dump(summary, f, indent=2, sort_keys=True)
@@ -0,0 +1,149 @@
+"""
+This software has been approved for release by the U.S. Geological Survey
+(USGS). Although the software has been subjected to rigorous review, the USGS
+reserves the right to update the software as needed pursuant to further
+analysis and review. No warranty, expressed or implied, is made by the USGS or
+the U.S. Government as to the functionality of the software and related
+material nor shall the fact of release constitute any such warranty.
+Furthermore, the software is released on condition that neither the USGS nor
+the U.S. Government shall be held liable for any damages resulting from its
+authorized or unauthorized use.
+
+Created:        17 Oct 2026
+Version:        1.1
+
+Changelog
+1.0     17 Oct 2026     Original development. Array-based decoding of QA
+                        values, moved out of qa_decode.build_attr_table.
+1.1     17 Oct 2026     Uses compiled flags from flag_registry.
+"""
+import numpy as np
+import flag_registry
+
+
+def flag_hits(values, flags):
+    """
+    Test every value against every flag.
+
+    A flag is hit when all of its bits are set in the value.
+
+    :param values: <numpy.ndarray> 1-D array of integer QA values.
+    :param flags: <FlagSet> Compiled flags, from flag_registry.get_flags().
+    :return: <numpy.ndarray> Boolean array, shape (len(values), len(flags)).
+    """
+    return (values[:, None] & flags.masks) == flags.values
+
+
+def label_flags(values, flags):
+    """
+    Return the flags used to label each value.
+
+    Same as flag_hits(), except that single bit flags are dropped when their
+    bit is part of a multi-bit flag that is also hit (e.g. "Low Cloud
+    Confidence" and "Medium Cloud Confidence" are dropped when "High Cloud
+    Confidence" is set), otherwise the descriptions duplicate themselves.
+
+    :param values: <numpy.ndarray> 1-D array of integer QA values.
+    :param flags: <FlagSet> Compiled flags, from flag_registry.get_flags().
+    :return: <numpy.ndarray> Boolean array, shape (len(values), len(flags)).
+    """
+    hits = flag_hits(values, flags)
+
+    # flags overruled by a multi-bit flag that is also set
+    suppressed = hits.astype(np.uint8).dot(flags.suppress.astype(np.uint8))
+
+    return hits & (suppressed == 0)
+
+
+def get_label(true_flags, band, rm_low=False):
+    """
+    Generate label for value in attribute table.
+
+    :param true_flags: <list> Flag objects set in the value, in bit order.
+    :param band: <str> Band type.
+    :param rm_low: <bool> Remove (True) or keep (False) 'low' labels.
+    :return: <str> Attribute label
+    """
+    if len(true_flags) == 0:
+        if band == 'radsat_qa':
+            return 'No Saturation'
+
+        elif band == 'sr_cloud_qa' or band == 'sr_aerosol':
+            return 'None'
+
+        elif band == 'BQA':
+            return 'Not Determined'
+
+    # build description from all bits represented in value
+    desc = []
+    for i, flag in enumerate(true_flags):
+        k = flag.name
+
+        # if 'low' labels are disabled, do not add them here
+        if rm_low and band != 'BQA' and 'low' in k.lower():
+            continue
+
+        # if last check, and not radiometric sat, set to 'clear'
+        elif rm_low and band == 'BQA' and 'low' in k.lower() and \
+                i == len(true_flags) - 1 and \
+                'radiometric' not in k.lower() and not desc:
+            k = 'Clear'
+
+        # if BQA and bit is low radiometric sat, keep it
+        elif rm_low and band == 'BQA' and 'low' in k.lower():
+            if 'radiometric' not in k.lower():
+                continue
+
+        # if radsat_qa, handle differently to make display cleaner
+        if band == 'radsat_qa':
+            if not desc:
+                desc = "Band {0} Data Saturation".format(flag.bits[0])
+
+            else:
+                desc = "{0},{1} Data Saturation".format(
+                    desc[:desc.find('Data') - 1], flag.bits[0])
+
+        # string creation for all other bands
+        else:
+            if not desc:
+                desc = "{0}".format(k)
+
+            else:
+                desc += ", {0}".format(k)
+
+    # final check to make sure something was set
+    if not desc:
+        desc = 'ERROR: bit set incorrectly'
+
+    return desc
+
+
+def decode_values(values, band, sens, rm_low=False):
+    """
+    Decode an array of QA values into attribute labels.
+
+    Values sharing the same set of flags are labelled once, so the cost of
+    building strings scales with the number of distinct flag combinations,
+    not with the number of values.
+
+    :param values: <array_like> Integer QA values.
+    :param band: <str> Band type.
+    :param sens: <str> Sensor type, as either "L8" or "L47".
+    :param rm_low: <bool> Remove (True) or keep (False) 'low' labels (excludes
+                          sr_aerosol, radiometric sat. in BQA)
+    :return: <numpy.ndarray> Object array of labels, same length as values.
+    """
+    values = np.asarray(values, dtype=np.int64).ravel()
+    flags = flag_registry.get_flags(band, sens)
+
+    # pack the flags set in each value into a single integer key
+    keys = label_flags(values, flags).astype(np.int64).dot(flags.weights)
+
+    # label each distinct key once, then broadcast back to the values
+    uniq, inverse = np.unique(keys, return_inverse=True)
+    labels = np.empty(len(uniq), dtype=object)
+    for j, key in enumerate(uniq.tolist()):
+        true_flags = [f for f in flags if key >> f.index & 1]
+        labels[j] = get_label(true_flags, band, rm_low)
+
+    return labels[inverse.ravel()]
@@ -13,20 +13,69 @@ Author:         Steve Foga
 Affiliation:    SGT Inc., contractor to USGS EROS Center
 Contact:        steven.foga.ctr@usgs.gov
 Created:        20 June 2017
-Version:        2.0
+Version:        3.7
 
 Changelog
 1.0     15 May 2017     DNE in this release.
 2.0     20 Jun 2017     Original development.
+2.1     17 Oct 2026     Flag matches read from cached lookup tables.
+2.2     17 Oct 2026     Added NumPy backend, which does not require ArcGIS.
+2.3     17 Oct 2026     NumPy backend streams input and output by block.
+2.4     17 Oct 2026     All masks computed from one table lookup per block,
+                        optional multi-band (stack) output.
+2.5     17 Oct 2026     ArcPy only imported by the arcpy backend.
+2.6     17 Oct 2026     Unique values read from cached counts (hist_cache).
+2.7     17 Oct 2026     Optional 1-bit packed mask output.
+2.8     17 Oct 2026     Masks of blocks optionally computed on threads.
+2.9     17 Oct 2026     Stage timings and counters (instrument).
+3.0     17 Oct 2026     Extraction of boolean flag expressions (flag_expr).
+3.1     17 Oct 2026     Multi-bit fields extracted as level rasters.
+3.2     17 Oct 2026     Optional run-length encoded (sparse) mask output.
+3.3     17 Oct 2026     Saturated band counts of radsat_qa in one pass.
+3.4     17 Oct 2026     Optional pipelined reading, computing and writing.
+3.5     17 Oct 2026     Masks optionally computed by worker processes over
+                        memory-mapped tiles (shared_tiles).
+3.6     17 Oct 2026     Output paths returned by the arcpy backend too.
+3.7     17 Oct 2026     Bytes written counted for sparse masks.
 """
 import sys
 import os
-import arcpy
-import lookup_dict
+import numpy as np
+import lut_cache
+import qa_backend
+import flag_registry
+import instrument
+
+
+def clean_flag_name(bv):
+    """
+    Clean up double quotes from flag name, if necessary.
+
+    :param bv: <str> Flag name, as passed by Arc Toolbox.
+    :return: <str>
+    """
+    if bv.startswith('"') and bv.endswith('"'):
+        bv = bv[1:-1]
+
+    return bv
+
+
+def output_name(basename, bv, input_ext):
+    """
+    Create output raster name for a single flag.
+
+    :param basename: <str> Base filename for output data.
+    :param bv: <str> Flag name.
+    :param input_ext: <str> Extension of input raster.
+    :return: <str>
+    """
+    # "/" (e.g. "Snow/Ice") would otherwise be read as a directory
+    return basename + "_" + bv.lower().replace(' ', '_').replace('/', '_') + \
+        input_ext
 
 
 def extract_bits_from_band(raster_in, sensor, band, output_bands, basename,
-                           combine_layers=False):
+                           combine_layers=False, backend=None, **options):
     """
     Pull specific class(es) from bit-packed band, return discrete band(s).
 
@@ -36,42 +85,68 @@ def extract_bits_from_band(raster_in, sensor, band, output_bands, basename,
     :param output_bands: <list> Name(s) of bit(s) to be extracted.
     :param basename: <str> Base filename for output data.
     :param combine_layers: <bool> Combine all extracted bits to single band.
+    :param backend: <str> Name of backend in backends (default: "arcpy" if
+                          ArcPy is available, otherwise "numpy").
+    :param options: Backend specific options (e.g. block_rows, block_cols for
+                    the "numpy" backend).
 
-    :return:
+    :return: <list> Paths of output rasters.
     """
+    if backend is None:
+        backend = qa_backend.default_backend()
 
-    def con_raster(in_raster, out_raster, out_values):
-        """
-        Create binary raster based on occurrence of specific value(s).
+    try:
+        func = backends[backend]
+    except KeyError:
+        sys.exit("{0} is not a valid backend. Potential options: {1}"
+                 .format(backend, " | ".join(sorted(backends))))
 
-        :param in_raster: <Raster> Single band in ArcGIS Raster format.
-        :param out_raster: <str> Path + filename for output raster.
-        :param out_values: <list> Values to produce a positive result.
-        :return:
-        """
+    with instrument.run("extract_bits_from_band"):
+        return func(raster_in, sensor, band, output_bands, basename,
+                    combine_layers, **options)
 
-        def build_con_statement(values):
-            """
-            Create SQL string with multiple conditions for arcpy.sa.Con().
 
-            :param values: <list> List of integers to be extracted.
-            :return: <str> SQL string to be passed to conditional function.
-            """
-            str_out = ""
-            for vv in range(len(values)):
-                if vv < max(range(len(values))):
-                    str_out += "Value = {0} Or ".format(values[vv])
-                else:
-                    str_out += "Value = {0}".format(values[vv])
+def con_raster(in_raster, out_raster, out_values):
+    """
+    Create binary raster based on occurrence of specific value(s).
+
+    :param in_raster: <Raster> Single band in ArcGIS Raster format.
+    :param out_raster: <str> Path + filename for output raster.
+    :param out_values: <list> Values to produce a positive result.
+    :return:
+    """
+    import arcpy
 
-            return str_out
+    def build_con_statement(values):
+        """
+        Create SQL string with multiple conditions for arcpy.sa.Con().
+
+        :param values: <list> List of integers to be extracted.
+        :return: <str> SQL string to be passed to conditional function.
+        """
+        return " Or ".join("Value = {0}".format(v) for v in values)
 
-        # use conditional function to make binary raster
+    # use conditional function to make binary raster
+    with instrument.stage("Con"):
         out = arcpy.sa.Con(in_raster, 1, 0, build_con_statement(out_values))
 
-        # set pixel depth to 8-bit unsigned and save to file
+    # set pixel depth to 8-bit unsigned and save to file
+    with instrument.stage("CopyRaster"):
         arcpy.CopyRaster_management(out, out_raster,
                                     pixel_type="8_BIT_UNSIGNED")
+    instrument.add("outputs")
+
+
+def unique_values_arcpy(raster_in):
+    """
+    Check out Spatial Analyst, check the input data type and return the
+    distinct values of a raster.
+
+    :param raster_in: <str> Path to input raster.
+    :return: <list> Distinct raster values.
+    """
+    import arcpy
+    import hist_cache
 
     # verify Spatial Analyst licence is available
     class LicenseError(Exception):
@@ -89,93 +164,843 @@ def extract_bits_from_band(raster_in, sensor, band, output_bands, basename,
     except arcpy.ExecuteError:
         print(arcpy.GetMessages(2))
 
-    # read lookup dictionary
-    bit_flags = lookup_dict.bit_flags
-
     # read raster
     r_in = arcpy.Raster(raster_in)
 
     # check to ensure raster is not floating/double/complex
-    vt = int(str(arcpy.GetRasterProperties_management(r_in, "VALUETYPE")))
+    with instrument.stage("GetRasterProperties"):
+        vt = int(str(arcpy.GetRasterProperties_management(r_in,
+                                                          "VALUETYPE")))
     if vt >= 9:
         arcpy.AddError("ERROR: Data type of input raster must be integer.")
         sys.exit()
 
-    # determine input band extension
-    input_ext = os.path.splitext(raster_in)[-1]
+    # get unique values, from cached counts if the raster is unchanged
+    cached = hist_cache.load(raster_in)
+    if cached is not None:
+        unique_vals = cached[0].tolist()
+        instrument.add("hist_cache_hits")
+
+    else:
+        # build attribute table
+        with instrument.stage("BuildRasterAttributeTable"):
+            arcpy.BuildRasterAttributeTable_management(r_in)
+
+        unique_vals = []
+        unique_counts = []
+        with instrument.stage("SearchCursor"):
+            with arcpy.da.SearchCursor(raster_in,
+                                       ("Value", "Count")) as cursor:
+                for row in cursor:
+                    unique_vals.append(row[0])
+                    unique_counts.append(row[1])
+
+        hist_cache.save(raster_in, unique_vals, unique_counts)
+
+    instrument.add("unique_values", len(unique_vals))
+
+    return unique_vals
+
+
+def extract_bits_arcpy(raster_in, sensor, band, output_bands, basename,
+                       combine_layers=False):
+    """
+    Pull specific class(es) from bit-packed band using Spatial Analyst.
 
-    # build attribute table
-    arcpy.BuildRasterAttributeTable_management(r_in)
+    :param raster_in: <str> Path to input raster.
+    :param sensor: <str> Sensor type, as either "L8" or "L47".
+    :param band: <str> Band type.
+    :param output_bands: <list> Name(s) of bit(s) to be extracted.
+    :param basename: <str> Base filename for output data.
+    :param combine_layers: <bool> Combine all extracted bits to single band.
 
-    # get unique values
-    unique_vals = []
-    with arcpy.da.SearchCursor(raster_in, ("Value")) as cursor:
-        for row in cursor:
-            unique_vals.append(row[0])
+    :return: <list> Paths of output rasters.
+    """
+    import arcpy
+
+    unique_vals = unique_values_arcpy(raster_in)
+
+    # determine input band extension
+    input_ext = os.path.splitext(raster_in)[-1]
 
     # pull target values from each requested output band
     output_vals_all = []
+    outputs = []
     for bv in output_bands:
         # clean up double quotes from bv, if necessary
-        if bv.startswith('"') and bv.endswith('"'):
-            bv = bv[1:-1]
-
-        # get bit value
-        bit_value = bit_flags[band][sensor][bv]
-
-        # use bit logic to return only target values
-        bit_bool = []
-        for v in unique_vals:
-            if len(bit_value) == 1:  # single bit
-                bit_bool.append(v & 1 << bit_value[0] > 0)
-
-            elif len(bit_value) > 1:  # 2+ bits
-                bits = []
-                for b in bit_value:
-                    bits.append(v & 1 << b > 0)
-                if all(item == True for item in bits):
-                    bit_bool.append(True)
-                else:
-                    bit_bool.append(False)
+        bv = clean_flag_name(bv)
 
-            else:
-                sys.exit("No valid bits found for target band.")
-
-        # return raster values that match bit(s)
-        output_vals = [i for (i, bl) in zip(unique_vals, bit_bool) if bl]
+        # use lookup table to return only target values
+        with instrument.stage("lookup_flag"):
+            bit_bool = lut_cache.lookup_flag(unique_vals, band, sensor, bv)
+            output_vals = [i for (i, bl) in zip(unique_vals, bit_bool)
+                           if bl]
 
         if combine_layers:
             output_vals_all.extend(output_vals)
 
         else:  # write out raster now, instead of single raster later
             # create output raster name
-            raster_out = basename + "_" + bv.lower().replace(' ', '_') + \
-                         input_ext
+            raster_out = output_name(basename, bv, input_ext)
 
             # generate new raster
             con_raster(raster_in, raster_out, output_vals)
+            outputs.append(raster_out)
 
     # use all output values to create single binary band
     if combine_layers:
         # create output raster name
         raster_out = basename + "_combine" + input_ext
 
-        # generate new raster
-        con_raster(raster_in, raster_out, output_vals_all)
+        # generate new raster; values hit by several flags are listed once
+        con_raster(raster_in, raster_out, sorted(set(output_vals_all)))
+        outputs.append(raster_out)
 
         # if running in ArcMap, load band to current Data Frame
-        try:
-            mxd = arcpy.mapping.MapDocument("CURRENT")
-        except RuntimeError:
-            pass
-        else:
-            # get current (active) data frame
-            df = mxd.activeDataFrame
+        with instrument.stage("layer_refresh"):
+            try:
+                mxd = arcpy.mapping.MapDocument("CURRENT")
+            except RuntimeError:
+                pass
+            else:
+                # get current (active) data frame
+                df = mxd.activeDataFrame
 
-            # add new layer
-            arcpy.mapping.AddLayer(df, raster_out, "AUTO_ARRANGE")
+                # add new layer
+                arcpy.mapping.AddLayer(df, raster_out, "AUTO_ARRANGE")
 
-            arcpy.RefreshTOC()
+                arcpy.RefreshTOC()
 
         print(arcpy.GetMessages())
         arcpy.GetMessages()
+
+    return outputs
+
+
+def flag_masks(qa, band, sensor, targets, combine_layers=False):
+    """
+    Compute binary mask of each target flag for a block of QA values.
+
+    For 8 and 16-bit input, every pixel is looked up once in the flag table
+    of lut_cache, and all masks are split out of that single lookup.
+
+    :param qa: <numpy.ndarray> Integer QA values.
+    :param band: <str> Band type.
+    :param sensor: <str> Sensor type, as either "L8" or "L47".
+    :param targets: <list> Flag objects, from flag_registry.
+    :param combine_layers: <bool> Combine all masks to a single mask.
+    :return: <list> uint8 arrays, shaped like qa.
+    """
+    if qa.dtype in (np.uint8, np.uint16):
+        flag_mask = lut_cache.get_table(band, sensor).flag_mask[qa]
+
+        if combine_layers:
+            bits = sum(1 << f.index for f in targets)
+            return [((flag_mask & bits) != 0).astype(np.uint8)]
+
+        return [((flag_mask >> f.index) & 1).astype(np.uint8)
+                for f in targets]
+
+    # other integer types may hold values outside of the lookup tables
+    masks = [((qa & f.mask) == f.value).astype(np.uint8) for f in targets]
+
+    if combine_layers:
+        combined = np.zeros(qa.shape, dtype=np.uint8)
+        for m in masks:
+            combined |= m
+        masks = [combined]
+
+    return masks
+
+
+def tile_masks(qa, band, sensor, names, combine_layers=False):
+    """
+    Compute flag masks of a tile, given flag names (see flag_masks).
+
+    Used by worker processes of shared_tiles, which are sent names rather
+    than flag objects.
+
+    :param qa: <numpy.ndarray> Integer QA values.
+    :param band: <str> Band type.
+    :param sensor: <str> Sensor type, as either "L8" or "L47".
+    :param names: <list> Flag names.
+    :param combine_layers: <bool> Combine all masks to a single mask.
+    :return: <list> uint8 arrays, shaped like qa.
+    """
+    flags = flag_registry.get_flags(band, sensor)
+
+    return flag_masks(qa, band, sensor, [flags[n] for n in names],
+                      combine_layers)
+
+
+def extract_bits_numpy(raster_in, sensor, band, output_bands, basename,
+                       combine_layers=False, stack=False, packed=False,
+                       sparse=False, block_rows=None, block_cols=None,
+                       threads=None, pipeline=False, processes=None,
+                       scratch=None):
+    """
+    Pull specific class(es) from bit-packed band using NumPy and GDAL.
+
+    Each output is computed directly from the QA values, without ArcGIS or a
+    Spatial Analyst license. The input is read once, one block at a time, and
+    all requested masks are computed from each block and written before the
+    next block is read. Peak memory is set by the block size rather than by
+    the size of the raster.
+
+    :param raster_in: <str> Path to input raster.
+    :param sensor: <str> Sensor type, as either "L8" or "L47".
+    :param band: <str> Band type.
+    :param output_bands: <list> Name(s) of bit(s) to be extracted.
+    :param basename: <str> Base filename for output data.
+    :param combine_layers: <bool> Combine all extracted bits to single band.
+    :param stack: <bool> Write all extracted bits as bands of a single raster
+                         (basename_stack), in the order of output_bands.
+                         Ignored if combine_layers is set.
+    :param packed: <bool> Write 1 bit per pixel packed masks (see
+                          packed_mask) instead of 8-bit rasters.
+    :param sparse: <bool> Write run-length encoded masks (see sparse_mask),
+                          for flags set on few pixels. Ignored if packed is
+                          set.
+    :param block_rows: <int> Rows per block (default: all rows).
+    :param block_cols: <int> Columns per block (default: all columns).
+    :param threads: <int> Compute masks of blocks on this many threads
+                          (default: 1). Output is identical whatever the
+                          number of threads; blocks are written in order.
+    :param pipeline: <bool> Read, mask and write blocks concurrently (see
+                           raster_io.pipeline_blocks).
+    :param processes: <int> Compute masks of tiles on this many worker
+                            processes, sharing the input and masks through
+                            memory-mapped files (see shared_tiles) rather
+                            than copying them (default: 1, no workers).
+                            Output is identical to a single process.
+    :param scratch: <str> Directory for scratch files of processes
+                          (default: system temporary directory).
+
+    :return: <list> Paths of output rasters.
+    """
+    import raster_io
+
+    flags = flag_registry.get_flags(band, sensor)
+    targets = [flags[clean_flag_name(bv)] for bv in output_bands]
+
+    # determine input band extension
+    input_ext = os.path.splitext(raster_in)[-1]
+
+    # create output raster name(s), and (raster, band) of each mask
+    if combine_layers:
+        outputs = [basename + "_combine" + input_ext]
+        slots = [(0, 1)]
+    elif stack:
+        outputs = [basename + "_stack" + input_ext]
+        slots = [(0, i + 1) for i in range(len(targets))]
+    else:
+        outputs = [output_name(basename, f.name, input_ext) for f in targets]
+        slots = [(i, 1) for i in range(len(targets))]
+
+    if packed:
+        import packed_mask
+        outputs = [packed_mask.packed_name(r) for r in outputs]
+        create = packed_mask.create_mask
+    elif sparse:
+        import sparse_mask
+        outputs = [sparse_mask.sparse_name(r) for r in outputs]
+        create = sparse_mask.create_mask
+    else:
+        create = lambda r, like, count: raster_io.create_raster(
+            r, like, "uint8", count)
+
+    with raster_io.open_raster(raster_in) as r_in:
+        # check to ensure raster is not floating/double/complex
+        if r_in.dtype is None or r_in.dtype.kind not in "iu":
+            sys.exit("ERROR: Data type of input raster must be integer.")
+
+        count = len(slots) if stack and not combine_layers else 1
+        writers = [create(r, r_in, count) for r in outputs]
+
+        # load lookup table before any threads start
+        lut_cache.get_table(band, sensor)
+
+        def block_masks(qa):
+            with instrument.stage("flag_masks"):
+                masks = flag_masks(qa, band, sensor, targets, combine_layers)
+            instrument.add("pixels", qa.size)
+            instrument.add("bytes_read", qa.nbytes)
+            return masks
+
+        if processes and processes > 1:
+            import shared_tiles
+            blocks = shared_tiles.map_tiles(
+                tile_masks, (band, sensor, [f.name for f in targets],
+                             combine_layers),
+                r_in, block_rows, block_cols, processes, len(slots),
+                scratch=scratch)
+        else:
+            blocks = raster_io.map_blocks(block_masks, r_in, block_rows,
+                                          block_cols, threads, pipeline)
+
+        try:
+            for (row_off, _, col_off, _), masks in blocks:
+                with instrument.stage("write"):
+                    for (i, b), out in zip(slots, masks):
+                        writers[i].write(out, row_off, col_off, b)
+                if not sparse:
+                    nbytes = sum(m.nbytes for m in masks)
+                    instrument.add("bytes_written",
+                                   nbytes // 8 if packed else nbytes)
+        finally:
+            for r_out in writers:
+                r_out.close()
+
+    # runs are only encoded to the file when it is closed
+    if sparse:
+        instrument.add("bytes_written",
+                       sum(os.path.getsize(p) for p in outputs))
+
+    return outputs
+
+
+# backend name: extraction function, all taking the same arguments
+backends = {
+    "arcpy": extract_bits_arcpy,
+    "numpy": extract_bits_numpy
+}
+
+
+def extract_expression_arcpy(raster_in, sensor, band, expression,
+                             raster_out):
+    """
+    Extract pixels matching a flag expression using Spatial Analyst.
+
+    The expression is tested against the distinct values of the raster, and
+    the matching values passed to a single Con().
+
+    :param raster_in: <str> Path to input raster.
+    :param sensor: <str> Sensor type, as either "L8" or "L47".
+    :param band: <str> Band type.
+    :param expression: <str> Flag expression (see flag_expr).
+    :param raster_out: <str> Path to output raster.
+    :return: <str> raster_out
+    """
+    import flag_expr
+
+    expr = flag_expr.compile_expr(expression, band, sensor)
+    unique_vals = unique_values_arcpy(raster_in)
+
+    with instrument.stage("lookup_flag"):
+        output_vals = expr.matching_values(unique_vals)
+
+    con_raster(raster_in, raster_out, output_vals)
+
+    return raster_out
+
+
+def extract_expression_numpy(raster_in, sensor, band, expression,
+                             raster_out, packed=False, sparse=False,
+                             block_rows=None, block_cols=None, threads=None,
+                             pipeline=False):
+    """
+    Extract pixels matching a flag expression using NumPy.
+
+    The input is read once, block by block, and each block tested with one
+    lookup per pixel in the truth table of the expression.
+
+    :param raster_in: <str> Path to input raster.
+    :param sensor: <str> Sensor type, as either "L8" or "L47".
+    :param band: <str> Band type.
+    :param expression: <str> Flag expression (see flag_expr).
+    :param raster_out: <str> Path to output raster.
+    :param packed: <bool> Write a 1 bit per pixel packed mask (see
+                          packed_mask) instead of an 8-bit raster.
+    :param sparse: <bool> Write a run-length encoded mask (see
+                          sparse_mask). Ignored if packed is set.
+    :param block_rows: <int> Rows per block (default: all rows).
+    :param block_cols: <int> Columns per block (default: all columns).
+    :param threads: <int> Test blocks on this many threads (default: 1).
+    :param pipeline: <bool> Read, test and write blocks concurrently (see
+                           raster_io.pipeline_blocks).
+    :return: <str> Path of output raster.
+    """
+    import raster_io
+    import flag_expr
+
+    expr = flag_expr.compile_expr(expression, band, sensor)
+
+    if packed:
+        import packed_mask
+        raster_out = packed_mask.packed_name(raster_out)
+        create = packed_mask.create_mask
+    elif sparse:
+        import sparse_mask
+        raster_out = sparse_mask.sparse_name(raster_out)
+        create = sparse_mask.create_mask
+    else:
+        create = lambda r, like, count: raster_io.create_raster(
+            r, like, "uint8", count)
+
+    def block_mask(qa):
+        with instrument.stage("evaluate"):
+            mask = expr.evaluate(qa).view(np.uint8)
+        instrument.add("pixels", qa.size)
+        instrument.add("bytes_read", qa.nbytes)
+        return mask
+
+    with raster_io.open_raster(raster_in) as r_in:
+        # check to ensure raster is not floating/double/complex
+        if r_in.dtype is None or r_in.dtype.kind not in "iu":
+            sys.exit("ERROR: Data type of input raster must be integer.")
+
+        with create(raster_out, r_in, 1) as r_out:
+            for (row_off, _, col_off, _), mask in raster_io.map_blocks(
+                    block_mask, r_in, block_rows, block_cols, threads,
+                    pipeline):
+                with instrument.stage("write"):
+                    r_out.write(mask, row_off, col_off)
+
+    return raster_out
+
+
+# backend name: expression extraction function, all taking the same
+#   arguments
+expression_backends = {
+    "arcpy": extract_expression_arcpy,
+    "numpy": extract_expression_numpy
+}
+
+
+def extract_expression(raster_in, sensor, band, expression, raster_out,
+                       backend=None, **options):
+    """
+    Extract pixels matching a boolean expression of flags to a binary band,
+    e.g. "Cloud AND NOT Cloud Shadow" (see flag_expr).
+
+    :param raster_in: <str> Path to input raster.
+    :param sensor: <str> Sensor type, as either "L8" or "L47".
+    :param band: <str> Band type.
+    :param expression: <str> Flag expression.
+    :param raster_out: <str> Path to output raster.
+    :param backend: <str> Name of backend in expression_backends (default:
+                          "arcpy" if ArcPy is available, otherwise "numpy").
+    :param options: Backend specific options (e.g. block_rows, packed for
+                    the "numpy" backend).
+    :return: <str> Path of output raster.
+    """
+    if backend is None:
+        backend = qa_backend.default_backend()
+
+    try:
+        func = expression_backends[backend]
+    except KeyError:
+        sys.exit("{0} is not a valid backend. Potential options: {1}"
+                 .format(backend, " | ".join(sorted(expression_backends))))
+
+    with instrument.run("extract_expression"):
+        return func(raster_in, sensor, band, expression, raster_out,
+                    **options)
+
+
+def get_fields(sensor, band, fields=None):
+    """
+    Return multi-bit fields of a band, by name.
+
+    :param sensor: <str> Sensor type, as either "L8" or "L47".
+    :param band: <str> Band type.
+    :param fields: <list> Field names (default: all fields of the band).
+    :return: <list> Field objects, from flag_registry.
+    """
+    flags = flag_registry.get_flags(band, sensor)
+    if fields is None:
+        return list(flags.fields)
+
+    # match names ignoring case
+    by_lower = dict((f.name.lower(), f) for f in flags.fields)
+    targets = []
+    for name in fields:
+        name = clean_flag_name(name)
+        if name.lower() not in by_lower:
+            sys.exit("{0} is not a multi-bit field of {1}. Potential "
+                     "options: {2}".format(name, band, " | ".join(
+                         f.name for f in flags.fields)))
+        targets.append(by_lower[name.lower()])
+
+    return targets
+
+
+def field_levels(qa, fields):
+    """
+    Compute the level (0-3) of each field for a block of QA values.
+
+    :param qa: <numpy.ndarray> Integer QA values.
+    :param fields: <list> Field objects, from flag_registry.
+    :return: <list> uint8 arrays, shaped like qa.
+    """
+    return [((qa >> f.shift) & (f.levels - 1)).astype(np.uint8)
+            for f in fields]
+
+
+def extract_fields_arcpy(raster_in, sensor, band, fields, basename):
+    """
+    Extract multi-bit fields as level rasters using Spatial Analyst.
+
+    Each field is one BitwiseRightShift and BitwiseAnd over the raster.
+
+    :param raster_in: <str> Path to input raster.
+    :param sensor: <str> Sensor type, as either "L8" or "L47".
+    :param band: <str> Band type.
+    :param fields: <list> Field objects, from flag_registry.
+    :param basename: <str> Base filename for output data.
+    :return: <list> Paths of output rasters.
+    """
+    import arcpy
+
+    input_ext = os.path.splitext(raster_in)[-1]
+    r_in = arcpy.Raster(raster_in)
+
+    outputs = []
+    for f in fields:
+        raster_out = output_name(basename, f.name, input_ext)
+
+        with instrument.stage("Bitwise"):
+            out = arcpy.sa.BitwiseAnd(
+                arcpy.sa.BitwiseRightShift(r_in, f.shift), f.levels - 1)
+
+        with instrument.stage("CopyRaster"):
+            arcpy.CopyRaster_management(out, raster_out,
+                                        pixel_type="8_BIT_UNSIGNED")
+        instrument.add("outputs")
+        outputs.append(raster_out)
+
+    return outputs
+
+
+def extract_fields_numpy(raster_in, sensor, band, fields, basename,
+                         stack=False, block_rows=None, block_cols=None,
+                         threads=None, pipeline=False):
+    """
+    Extract multi-bit fields as level rasters using NumPy.
+
+    The input is read once, block by block, and all fields are shifted and
+    masked out of each block. Single band outputs get an attribute table
+    labelling each level, if GDAL is installed.
+
+    :param raster_in: <str> Path to input raster.
+    :param sensor: <str> Sensor type, as either "L8" or "L47".
+    :param band: <str> Band type.
+    :param fields: <list> Field objects, from flag_registry.
+    :param basename: <str> Base filename for output data.
+    :param stack: <bool> Write all fields as bands of a single raster
+                         (basename_levels), in the order of fields.
+    :param block_rows: <int> Rows per block (default: all rows).
+    :param block_cols: <int> Columns per block (default: all columns).
+    :param threads: <int> Compute levels of blocks on this many threads
+                          (default: 1).
+    :param pipeline: <bool> Read, shift and write blocks concurrently (see
+                           raster_io.pipeline_blocks).
+    :return: <list> Paths of output rasters.
+    """
+    import raster_io
+
+    input_ext = os.path.splitext(raster_in)[-1]
+    if stack:
+        outputs = [basename + "_levels" + input_ext]
+        slots = [(0, i + 1) for i in range(len(fields))]
+    else:
+        outputs = [output_name(basename, f.name, input_ext) for f in fields]
+        slots = [(i, 1) for i in range(len(fields))]
+
+    counts = np.zeros((len(fields), 4), dtype=np.int64)
+
+    def block_levels(qa):
+        with instrument.stage("field_levels"):
+            levels = field_levels(qa, fields)
+        instrument.add("pixels", qa.size)
+        instrument.add("bytes_read", qa.nbytes)
+        return levels
+
+    with raster_io.open_raster(raster_in) as r_in:
+        # check to ensure raster is not floating/double/complex
+        if r_in.dtype is None or r_in.dtype.kind not in "iu":
+            sys.exit("ERROR: Data type of input raster must be integer.")
+
+        count = len(fields) if stack else 1
+        writers = [raster_io.create_raster(r, r_in, "uint8", count)
+                   for r in outputs]
+        try:
+            for (row_off, _, col_off, _), levels in raster_io.map_blocks(
+                    block_levels, r_in, block_rows, block_cols, threads,
+                    pipeline):
+                with instrument.stage("write"):
+                    for i, ((j, b), out) in enumerate(zip(slots, levels)):
+                        writers[j].write(out, row_off, col_off, b)
+                        counts[i] += np.bincount(out.ravel(), minlength=4)
+        finally:
+            for r_out in writers:
+                r_out.close()
+
+    if not stack and raster_io.gdal is not None:
+        for f, path, c in zip(fields, outputs, counts):
+            levels, labels = zip(*f.legend)
+            raster_io.write_attr_table(path, levels, c[list(levels)], labels)
+
+    return outputs
+
+
+# backend name: field extraction function, all taking the same arguments
+field_backends = {
+    "arcpy": extract_fields_arcpy,
+    "numpy": extract_fields_numpy
+}
+
+
+def extract_fields(raster_in, sensor, band, fields, basename, backend=None,
+                   **options):
+    """
+    Extract multi-bit fields (e.g. "Cloud Confidence") as rasters of levels
+    0-3, one uint8 band per field, labelled as in Field.legend.
+
+    :param raster_in: <str> Path to input raster.
+    :param sensor: <str> Sensor type, as either "L8" or "L47".
+    :param band: <str> Band type.
+    :param fields: <list> Field names (default: all fields of the band).
+    :param basename: <str> Base filename for output data.
+    :param backend: <str> Name of backend in field_backends (default:
+                          "arcpy" if ArcPy is available, otherwise "numpy").
+    :param options: Backend specific options (e.g. block_rows, stack for
+                    the "numpy" backend).
+    :return: <list> Paths of output rasters.
+    """
+    if backend is None:
+        backend = qa_backend.default_backend()
+
+    try:
+        func = field_backends[backend]
+    except KeyError:
+        sys.exit("{0} is not a valid backend. Potential options: {1}"
+                 .format(backend, " | ".join(sorted(field_backends))))
+
+    targets = get_fields(sensor, band, fields)
+    if not targets:
+        sys.exit("ERROR: {0} has no multi-bit fields.".format(band))
+
+    with instrument.run("extract_fields"):
+        return func(raster_in, sensor, band, targets, basename, **options)
+
+
+# band holding one saturation bit per spectral band
+SATURATION_BAND = "radsat_qa"
+
+# (sensor, band): uint8 number of saturated bands of each 16-bit value
+_saturation_tables = {}
+
+
+def saturation_flags(sensor, band=SATURATION_BAND):
+    """
+    Return the per-band saturation flags of a band (all but Fill).
+
+    :param sensor: <str> Sensor type, as either "L8" or "L47".
+    :param band: <str> Band type.
+    :return: <list> Flag objects, from flag_registry.
+    """
+    if band != SATURATION_BAND:
+        sys.exit("ERROR: Saturated band counts require {0}, not {1}."
+                 .format(SATURATION_BAND, band))
+
+    return [f for f in flag_registry.get_flags(band, sensor)
+            if f.name.endswith("Data Saturation")]
+
+
+def saturation_count(qa, sensor, band=SATURATION_BAND):
+    """
+    Count the saturated bands of each pixel (Fill is not counted).
+
+    8 and 16-bit values are counted with one lookup per pixel in a table of
+    all 16-bit values, whatever the number of bands.
+
+    :param qa: <numpy.ndarray> Integer QA values.
+    :param sensor: <str> Sensor type, as either "L8" or "L47".
+    :param band: <str> Band type.
+    :return: <numpy.ndarray> uint8 array, shaped like qa.
+    """
+    key = (sensor, band)
+    if qa.dtype in (np.uint8, np.uint16):
+        if key not in _saturation_tables:
+            values = np.arange(lut_cache.LUT_SIZE, dtype=np.int64)
+            _saturation_tables[key] = saturation_count(values, sensor, band)
+        return _saturation_tables[key][qa]
+
+    fbits = lut_cache.lookup_flag_bits(qa, band, sensor)
+    count = np.zeros(qa.shape, dtype=np.uint8)
+    for f in saturation_flags(sensor, band):
+        count += ((fbits >> f.index) & 1).astype(np.uint8)
+
+    return count
+
+
+def saturation_outputs(basename, input_ext, any_mask=False):
+    """
+    Create output raster names of saturated band counts.
+
+    :param basename: <str> Base filename for output data.
+    :param input_ext: <str> Extension of input raster.
+    :param any_mask: <bool> Include the any-saturation mask.
+    :return: <list> Count raster, then mask if any_mask is set.
+    """
+    outputs = [basename + "_saturated_bands" + input_ext]
+    if any_mask:
+        outputs.append(basename + "_saturated" + input_ext)
+
+    return outputs
+
+
+def extract_saturation_arcpy(raster_in, sensor, band, basename,
+                             any_mask=False):
+    """
+    Count saturated bands per pixel using Spatial Analyst.
+
+    Counts are looked up for the distinct values of the raster, and written
+    with one Con() per distinct count rather than one per band.
+
+    :param raster_in: <str> Path to input raster.
+    :param sensor: <str> Sensor type, as either "L8" or "L47".
+    :param band: <str> Band type.
+    :param basename: <str> Base filename for output data.
+    :param any_mask: <bool> Also write a binary mask of pixels with any
+                            band saturated.
+    :return: <list> Paths of output rasters.
+    """
+    import arcpy
+
+    outputs = saturation_outputs(basename, os.path.splitext(raster_in)[-1],
+                                 any_mask)
+    unique_vals = unique_values_arcpy(raster_in)
+
+    with instrument.stage("lookup_flag"):
+        values = np.asarray(unique_vals, dtype=np.int64)
+        counts = saturation_count(values, sensor, band)
+
+    out = 0
+    for n in sorted(set(counts.tolist()) - set([0])):
+        where = " Or ".join("Value = {0}".format(v)
+                            for v in values[counts == n].tolist())
+        with instrument.stage("Con"):
+            out = arcpy.sa.Con(raster_in, n, out, where)
+
+    if not isinstance(out, arcpy.Raster):
+        # nothing saturated
+        with instrument.stage("Con"):
+            out = arcpy.sa.Con(raster_in, 0, 0)
+
+    with instrument.stage("CopyRaster"):
+        arcpy.CopyRaster_management(out, outputs[0],
+                                    pixel_type="8_BIT_UNSIGNED")
+    instrument.add("outputs")
+
+    if any_mask:
+        con_raster(raster_in, outputs[1], values[counts > 0].tolist())
+
+    return outputs
+
+
+def extract_saturation_numpy(raster_in, sensor, band, basename,
+                             any_mask=False, packed=False, block_rows=None,
+                             block_cols=None, threads=None, pipeline=False):
+    """
+    Count saturated bands per pixel using NumPy.
+
+    The input is read once, block by block; the count and the mask of each
+    block come from one table lookup per pixel.
+
+    :param raster_in: <str> Path to input raster.
+    :param sensor: <str> Sensor type, as either "L8" or "L47".
+    :param band: <str> Band type.
+    :param basename: <str> Base filename for output data.
+    :param any_mask: <bool> Also write a binary mask of pixels with any
+                            band saturated.
+    :param packed: <bool> Write the mask 1 bit per pixel (see packed_mask)
+                          instead of as an 8-bit raster.
+    :param block_rows: <int> Rows per block (default: all rows).
+    :param block_cols: <int> Columns per block (default: all columns).
+    :param threads: <int> Count blocks on this many threads (default: 1).
+    :param pipeline: <bool> Read, count and write blocks concurrently (see
+                           raster_io.pipeline_blocks).
+    :return: <list> Paths of output rasters.
+    """
+    import raster_io
+
+    outputs = saturation_outputs(basename, os.path.splitext(raster_in)[-1],
+                                 any_mask)
+    create = [lambda r, like: raster_io.create_raster(r, like, "uint8")] * 2
+    if any_mask and packed:
+        import packed_mask
+        outputs[1] = packed_mask.packed_name(outputs[1])
+        create[1] = packed_mask.create_mask
+
+    # build the table before any threads start
+    saturation_count(np.zeros(1, dtype=np.uint16), sensor, band)
+
+    def block_count(qa):
+        with instrument.stage("saturation_count"):
+            count = saturation_count(qa, sensor, band)
+        instrument.add("pixels", qa.size)
+        instrument.add("bytes_read", qa.nbytes)
+        return count
+
+    with raster_io.open_raster(raster_in) as r_in:
+        # check to ensure raster is not floating/double/complex
+        if r_in.dtype is None or r_in.dtype.kind not in "iu":
+            sys.exit("ERROR: Data type of input raster must be integer.")
+
+        writers = [c(r, r_in) for c, r in zip(create, outputs)]
+        try:
+            for (row_off, _, col_off, _), count in raster_io.map_blocks(
+                    block_count, r_in, block_rows, block_cols, threads,
+                    pipeline):
+                with instrument.stage("write"):
+                    writers[0].write(count, row_off, col_off)
+                    if any_mask:
+                        writers[1].write((count > 0).view(np.uint8),
+                                         row_off, col_off)
+        finally:
+            for r_out in writers:
+                r_out.close()
+
+    return outputs
+
+
+# backend name: saturation count function, all taking the same arguments
+saturation_backends = {
+    "arcpy": extract_saturation_arcpy,
+    "numpy": extract_saturation_numpy
+}
+
+
+def extract_saturation(raster_in, sensor, band, basename, any_mask=False,
+                       backend=None, **options):
+    """
+    Write the number of saturated bands of each pixel of a radsat_qa band
+    (uint8, 0 for Fill), and optionally a mask of pixels with any band
+    saturated, in one pass rather than one extraction per band.
+
+    :param raster_in: <str> Path to input raster.
+    :param sensor: <str> Sensor type, as either "L8" or "L47".
+    :param band: <str> Band type; must be radsat_qa.
+    :param basename: <str> Base filename for output data.
+    :param any_mask: <bool> Also write the any-saturation mask.
+    :param backend: <str> Name of backend in saturation_backends (default:
+                          "arcpy" if ArcPy is available, otherwise "numpy").
+    :param options: Backend specific options (e.g. block_rows, packed for
+                    the "numpy" backend).
+    :return: <list> Paths of output rasters; count, then mask.
+    """
+    if backend is None:
+        backend = qa_backend.default_backend()
+
+    try:
+        func = saturation_backends[backend]
+    except KeyError:
+        sys.exit("{0} is not a valid backend. Potential options: {1}"
+                 .format(backend, " | ".join(sorted(saturation_backends))))
+
+    saturation_flags(sensor, band)
+
+    with instrument.run("extract_saturation"):
+        return func(raster_in, sensor, band, basename, any_mask, **options)
@@ -13,29 +13,34 @@ Author:         Steve Foga
 Affiliation:    SGT Inc., contractor to USGS EROS Center
 Contact:        steven.foga.ctr@usgs.gov
 Created:        20 June 2017
-Version:        2.0
+Version:        2.3
 
 Changelog
 1.0     15 May 2017     DNE in this release.
 2.0     20 Jun 2017     Original development.
+2.1     17 Oct 2026     Sensor and band detection moved to scene_info.
+2.2     17 Oct 2026     Optional stage timings (instrument).
+2.3     17 Oct 2026     Faster parameter updates; processing modules
+                        imported when the tool runs. Fixed band list.
 """
+import os
 import sys
 import arcpy
-import extract_bands
+import scene_info
 import lookup_dict
 
+# (band, sensor display name): flag names sorted by bit position, built once
+#   rather than on every parameter change
+_bit_keys = {}
+
 
 class ExtractBands(object):
     def __init__(self):
         """
         Define the tool (tool name is the name of the class).
         """
-        #import lookup_dict
-        #self.bit_flags = lookup_dict.bit_flags
-
         self.label = "Extract QA Bands"
         self.description = ""
-        self.params = arcpy.GetParameterInfo()
         self.canRunInBackground = True
 
     def get_sensor(self, input_sen):
@@ -61,13 +66,17 @@ class ExtractBands(object):
         :param input_dict: <dict> Key:value pairs.
         :return: <list> Keys sorted by value.
         """
-        # convert input_sensor to input_dict's designation
-        in_sen = self.get_sensor(input_sensor)
+        key = (input_band, input_sensor)
+        if key not in _bit_keys:
+            # convert input_sensor to input_dict's designation
+            in_sen = self.get_sensor(input_sensor)
+
+            # get specific key:values
+            kv_pairs = input_dict[input_band][in_sen]
 
-        # get specific key:values
-        kv_pairs = input_dict[input_band][in_sen]
+            _bit_keys[key] = sorted(kv_pairs, key=kv_pairs.get)
 
-        return sorted(kv_pairs, key=kv_pairs.get)
+        return _bit_keys[key]
 
     def getParameterInfo(self):
         """
@@ -102,11 +111,7 @@ class ExtractBands(object):
             parameterType="Required",
             direction="Input")
         param2.filter.type = "ValueList"
-        param2.filter.list = ['BQA',
-                              'pixel_qa',
-                              'radsat_qa'
-                              'sr_aerosol',
-                              'sr_cloud_qa']
+        param2.filter.list = list(scene_info.band_names)
 
         # Fourth parameter (target QA layers, now empty)
         param3 = arcpy.Parameter(
@@ -143,58 +148,36 @@ class ExtractBands(object):
         :param parameters: <list> Input parameters
         :return:
         """
-        # read lookup dictionary
-        bit_flags = lookup_dict.bit_flags
+        # detect from the file name only; cached per name by scene_info
+        fname = os.path.basename(parameters[0].valueAsText or "")
 
         # Change sensor in drop-down
-        if parameters[0].valueAsText and not parameters[1].altered:
-            if [s for s in ['LE07', 'LT05', 'LT04'] if
-                s in parameters[0].valueAsText]:
-                parameters[1].value = 'Landsat 4-5, 7'
-
-            elif [s for s in ['LC08', 'LT08', 'LO08'] if
-                  s in parameters[0].valueAsText]:
-                parameters[1].value = 'Landsat 8'
+        if fname and not parameters[1].altered:
+            sensor = scene_info.detect_sensor(fname)
+            if sensor:
+                parameters[1].value = sensor
 
         # Restrict band options based upon sensor
         if parameters[1].valueAsText and not parameters[2].altered:
-            if parameters[1].value == 'Landsat 8':
-                parameters[2].filter.list = ['BQA',
-                                             'pixel_qa',
-                                             'radsat_qa',
-                                             'sr_aerosol']
-
-            elif parameters[1].value == 'Landsat 4-5, 7':
-                parameters[2].filter.list = ['BQA',
-                                             'pixel_qa',
-                                             'radsat_qa',
-                                             'sr_cloud_qa']
+            if parameters[1].value in scene_info.sensor_bands:
+                parameters[2].filter.list = \
+                    scene_info.sensor_bands[parameters[1].value]
 
         # Change band in drop-down
-        if parameters[0].valueAsText and not parameters[2].altered:
-            if [b for b in ['bqa', 'BQA'] if
-                b in parameters[0].valueAsText]:
-                parameters[2].value = 'BQA'
-            elif [b for b in ['pixel_qa', 'PIXELQA'] if
-                  b in parameters[0].valueAsText]:
-                parameters[2].value = 'pixel_qa'
-            elif [b for b in ['radsat_qa', 'RADSATQA'] if
-                  b in parameters[0].valueAsText]:
-                parameters[2].value = 'radsat_qa'
-            elif [b for b in ['sr_aerosol', 'SRAEROSOLQA'] if
-                  b in parameters[0].valueAsText]:
-                parameters[2].value = 'sr_aerosol'
-            elif [b for b in ['sr_cloud_qa', 'SRCLOUDQA'] if
-                  b in parameters[0].valueAsText]:
-                parameters[2].value = 'sr_cloud_qa'
+        if fname and not parameters[2].altered:
+            band = scene_info.detect_band(fname)
+            if band:
+                parameters[2].value = band
 
         # Populate QA Layers based upon band-sensor combination
-        if parameters[1].valueAsText and parameters[2].valueAsText:
+        band = parameters[2].value
+        sensor = parameters[1].value
+        if sensor in scene_info.sensor_codes and \
+                scene_info.sensor_codes[sensor] in \
+                lookup_dict.bit_flags.get(band, {}):
             parameters[3].enabled = True
-            bit_keys = self.get_bit_keys(parameters[2].value,
-                                         parameters[1].value,
-                                         bit_flags)
-            parameters[3].filter.list = bit_keys
+            parameters[3].filter.list = self.get_bit_keys(
+                band, sensor, lookup_dict.bit_flags)
 
         else:
             parameters[3].enabled = False
@@ -233,6 +216,10 @@ class ExtractBands(object):
 
             return val_list_noq
 
+        # imported here, so the dialog opens without loading NumPy
+        import extract_bands
+        import instrument
+
         in_raster = parameters[0].valueAsText
         sensor = self.get_sensor(parameters[1].valueAsText)
         band = parameters[2].valueAsText
@@ -240,6 +227,7 @@ class ExtractBands(object):
         basename = parameters[5].valueAsText
         combine = parameters[4].valueAsText
 
-        extract_bands.extract_bits_from_band(in_raster, sensor, band,
-                                             qa_layers, basename,
-                                             combine_layers=combine)
+        with instrument.run("Extract QA Bands"):
+            extract_bands.extract_bits_from_band(in_raster, sensor, band,
+                                                 qa_layers, basename,
+                                                 combine_layers=combine)
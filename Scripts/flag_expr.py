@@ -0,0 +1,262 @@
+"""
+This software has been approved for release by the U.S. Geological Survey
+(USGS). Although the software has been subjected to rigorous review, the USGS
+reserves the right to update the software as needed pursuant to further
+analysis and review. No warranty, expressed or implied, is made by the USGS or
+the U.S. Government as to the functionality of the software and related
+material nor shall the fact of release constitute any such warranty.
+Furthermore, the software is released on condition that neither the USGS nor
+the U.S. Government shall be held liable for any damages resulting from its
+authorized or unauthorized use.
+
+Created:        17 Oct 2026
+Version:        1.0
+
+Changelog
+1.0     17 Oct 2026     Original development. Boolean expressions of flags,
+                        compiled to a lookup table of QA values.
+
+Expressions combine flag names of lookup_dict.bit_flags with AND, OR, NOT
+(or &, |, ~) and parentheses, e.g.:
+
+    Cloud AND NOT Cloud Shadow
+    Clear AND NOT (High Cirrus Confidence OR Terrain Occlusion)
+
+Names may be double quoted, and are matched ignoring case. NOT binds
+tighter than AND, which binds tighter than OR. Fill pixels have no other
+flags set, so NOT expressions usually need "AND NOT Fill".
+"""
+import re
+import threading
+import numpy as np
+import lut_cache
+import flag_registry
+
+# operator keywords and symbols
+_ops = {"AND": "and", "&": "and", "OR": "or", "|": "or", "NOT": "not",
+        "~": "not", "!": "not"}
+
+_token = re.compile(r'\s*(\(|\)|"[^"]*"|[&|~!]|[^\s()"&|~!]+)')
+
+# (expression, band, sens): Expression
+_cache = {}
+_lock = threading.Lock()
+
+
+def tokenize(text):
+    """
+    Split an expression into operators, parentheses and flag names.
+
+    Consecutive words that are not operators form one flag name.
+
+    :param text: <str> Expression.
+    :return: <list> (kind, value) tuples; kind is "and", "or", "not", "(",
+                    ")" or "name".
+    """
+    tokens = []
+    pos = 0
+    word = False
+    text = text.rstrip()
+    while pos < len(text):
+        m = _token.match(text, pos)
+        if m is None:
+            raise ValueError("Unable to parse expression at: {0}"
+                             .format(text[pos:]))
+        pos = m.end()
+        tok = m.group(1)
+
+        if tok in "()":
+            tokens.append((tok, tok))
+        elif tok.upper() in _ops:
+            tokens.append((_ops[tok.upper()], tok))
+        elif tok.startswith('"'):
+            tokens.append(("name", tok[1:-1].strip()))
+        elif word:
+            # another word of the same name
+            tokens[-1] = ("name", tokens[-1][1] + " " + tok)
+        else:
+            tokens.append(("name", tok))
+
+        word = tokens[-1][0] == "name" and not tok.startswith('"')
+
+    return tokens
+
+
+def parse(text):
+    """
+    Parse an expression into a tree of nested tuples.
+
+    Nodes are ("name", flag name), ("not", node), ("and", [nodes]) and
+    ("or", [nodes]).
+
+    :param text: <str> Expression.
+    :return: <tuple>
+    """
+    tokens = tokenize(text)
+    pos = [0]
+
+    def peek():
+        return tokens[pos[0]][0] if pos[0] < len(tokens) else None
+
+    def take(kind):
+        if peek() != kind:
+            found = tokens[pos[0]][1] if pos[0] < len(tokens) else "end"
+            raise ValueError("Expected {0} in expression '{1}', found {2}"
+                             .format(kind, text, found))
+        pos[0] += 1
+        return tokens[pos[0] - 1][1]
+
+    def either():
+        terms = [both()]
+        while peek() == "or":
+            take("or")
+            terms.append(both())
+        return terms[0] if len(terms) == 1 else ("or", terms)
+
+    def both():
+        terms = [single()]
+        while peek() == "and":
+            take("and")
+            terms.append(single())
+        return terms[0] if len(terms) == 1 else ("and", terms)
+
+    def single():
+        if peek() == "not":
+            take("not")
+            return "not", single()
+        if peek() == "(":
+            take("(")
+            node = either()
+            take(")")
+            return node
+        return "name", take("name")
+
+    node = either()
+    if pos[0] != len(tokens):
+        raise ValueError("Unexpected {0} in expression '{1}'"
+                         .format(tokens[pos[0]][1], text))
+
+    return node
+
+
+def _names(node):
+    # flag names used in a tree
+    if node[0] == "name":
+        return [node[1]]
+    if node[0] == "not":
+        return _names(node[1])
+    return [n for child in node[1] for n in _names(child)]
+
+
+def _evaluate(node, test):
+    """
+    Evaluate a tree, given a function testing for a single flag.
+
+    :param node: <tuple> Tree, from parse().
+    :param test: <func> Function of a flag name, returning a boolean array.
+    :return: <numpy.ndarray> Boolean array.
+    """
+    kind = node[0]
+    if kind == "name":
+        return test(node[1])
+    if kind == "not":
+        return ~_evaluate(node[1], test)
+
+    out = _evaluate(node[1][0], test)
+    for child in node[1][1:]:
+        if kind == "and":
+            out &= _evaluate(child, test)
+        else:
+            out |= _evaluate(child, test)
+
+    return out
+
+
+def _rename(node, by_lower):
+    # replace names by the flag names they match
+    if node[0] == "name":
+        return "name", by_lower[node[1].lower()]
+    if node[0] == "not":
+        return "not", _rename(node[1], by_lower)
+    return node[0], [_rename(child, by_lower) for child in node[1]]
+
+
+class Expression(object):
+    def __init__(self, text, band, sens):
+        """
+        Expression compiled for one band/sensor.
+
+        Evaluated once over every 16-bit QA value into a truth table, so a
+        block of 8 or 16-bit QA values is tested with a single lookup per
+        pixel, however many flags and operators the expression has.
+
+        :param text: <str> Expression.
+        :param band: <str> Band type.
+        :param sens: <str> Sensor type, as either "L8" or "L47".
+        """
+        self.text = text
+        self.band = band
+        self.sens = sens
+        self.flags = flag_registry.get_flags(band, sens)
+
+        # resolve names ignoring case
+        by_lower = dict((n.lower(), n) for n in self.flags.names)
+        tree = parse(text)
+        for name in _names(tree):
+            if name.lower() not in by_lower:
+                raise ValueError("'{0}' is not a flag of {1} {2}. Potential "
+                                 "options: {3}".format(
+                                     name, band, sens,
+                                     " | ".join(self.flags.names)))
+        self.tree = _rename(tree, by_lower)
+
+        table = lut_cache.get_table(band, sens)
+        fm = table.flag_mask
+        self.table = _evaluate(
+            self.tree, lambda n: (fm & table.flag_bit(n)) != 0)
+
+    def evaluate(self, qa):
+        """
+        Test a block of QA values.
+
+        :param qa: <numpy.ndarray> Integer QA values.
+        :return: <numpy.ndarray> Boolean array, shaped like qa.
+        """
+        if qa.dtype in (np.uint8, np.uint16):
+            return self.table[qa]
+
+        # other integer types may hold values outside of the truth table
+        qa = qa.astype(np.int64)
+        flags = self.flags
+
+        return _evaluate(self.tree,
+                         lambda n: (qa & flags[n].mask) == flags[n].value)
+
+    def matching_values(self, values):
+        """
+        Return the values, of a list of distinct values, for which the
+        expression is true.
+
+        :param values: <list> Integer QA values.
+        :return: <list>
+        """
+        values = np.asarray(values, dtype=np.int64).ravel()
+
+        return values[self.evaluate(values)].tolist()
+
+
+def compile_expr(text, band, sens):
+    """
+    Compile an expression for a band/sensor, or return it from the cache.
+
+    :param text: <str> Expression.
+    :param band: <str> Band type.
+    :param sens: <str> Sensor type, as either "L8" or "L47".
+    :return: <Expression>
+    """
+    key = (" ".join(text.split()), band, sens)
+    with _lock:
+        if key not in _cache:
+            _cache[key] = Expression(text, band, sens)
+
+        return _cache[key]
@@ -0,0 +1,157 @@
+"""
+This software has been approved for release by the U.S. Geological Survey
+(USGS). Although the software has been subjected to rigorous review, the USGS
+reserves the right to update the software as needed pursuant to further
+analysis and review. No warranty, expressed or implied, is made by the USGS or
+the U.S. Government as to the functionality of the software and related
+material nor shall the fact of release constitute any such warranty.
+Furthermore, the software is released on condition that neither the USGS nor
+the U.S. Government shall be held liable for any damages resulting from its
+authorized or unauthorized use.
+
+Created:        17 Oct 2026
+Version:        1.1
+
+Changelog
+1.0     17 Oct 2026     Original development. Compiles lookup_dict.bit_flags
+                        into integer bitmasks, once, at import time.
+1.1     17 Oct 2026     Multi-bit confidence fields, with level legends.
+"""
+import numpy as np
+import lookup_dict
+
+# label of level 0 of a field, and of levels without a flag
+LEVEL_NONE = "Not Determined"
+LEVEL_RESERVED = "Reserved"
+
+
+class Flag(object):
+    def __init__(self, name, bits, index):
+        """
+        Single QA flag, compiled from its list of bit positions.
+
+        A QA value q has the flag set when (q & mask) == value.
+
+        :param name: <str> Flag name, as in lookup_dict.bit_flags.
+        :param bits: <list> Bit position(s) of the flag.
+        :param index: <int> Position of the flag in its FlagSet.
+        """
+        if len(bits) == 0:
+            raise ValueError("No valid bits found for flag '{0}'."
+                             .format(name))
+
+        self.name = name
+        self.bits = list(bits)
+        self.index = index
+        self.mask = sum(1 << b for b in bits)
+        self.value = self.mask
+        self.multi = len(bits) > 1
+
+
+class Field(object):
+    def __init__(self, flag, flags):
+        """
+        Multi-bit field (e.g. cloud confidence), read as an integer level.
+
+        Defined by a multi-bit flag (e.g. "High Cloud Confidence", bits
+        [6, 7]); the level of a QA value q is (q >> shift) & (mask >> shift),
+        and each level is labelled with the flag having exactly its bits.
+
+        :param flag: <Flag> Multi-bit flag, setting all bits of the field.
+        :param flags: <list> All Flag objects of the band/sensor.
+        """
+        words = flag.name.split(" ", 1)
+        self.name = words[1] if words[0] == "High" and len(words) > 1 \
+            else flag.name
+        self.bits = sorted(flag.bits)
+        self.shift = self.bits[0]
+        self.mask = flag.mask
+        self.levels = 1 << len(self.bits)
+
+        by_mask = dict((f.mask, f.name) for f in flags
+                       if set(f.bits) <= set(self.bits))
+        self.legend = [(0, LEVEL_NONE)] + [
+            (v, by_mask.get(v << self.shift, LEVEL_RESERVED))
+            for v in range(1, self.levels)]
+
+
+class FlagSet(object):
+    def __init__(self, band, sens, flags):
+        """
+        All flags of one band/sensor, sorted by bit position(s).
+
+        :param band: <str> Band type.
+        :param sens: <str> Sensor type, as either "L8" or "L47".
+        :param flags: <dict> Flag name: bit position(s) pairs.
+        """
+        self.band = band
+        self.sens = sens
+
+        ordered = sorted(flags.items(), key=lambda kv: kv[1])
+        self.flags = [Flag(k, v, i) for i, (k, v) in enumerate(ordered)]
+        self.names = [f.name for f in self.flags]
+
+        # reverse indices
+        self.by_name = dict((f.name, f) for f in self.flags)
+        self.by_mask = dict((f.mask, f.name) for f in self.flags)
+
+        # array forms, for testing many values at once
+        self.masks = np.array([f.mask for f in self.flags], dtype=np.int64)
+        self.values = np.array([f.value for f in self.flags], dtype=np.int64)
+        self.multi = np.array([f.multi for f in self.flags], dtype=bool)
+        self.weights = np.left_shift(1, np.arange(len(self.flags),
+                                                  dtype=np.int64))
+
+        # suppress[j, i] is True when multi-bit flag j includes the bit of
+        #   single bit flag i, so i is not labelled when j is set
+        self.suppress = np.zeros((len(self.flags), len(self.flags)),
+                                 dtype=bool)
+        for j in self.flags:
+            for i in self.flags:
+                if j.multi and not i.multi and i.bits[0] in j.bits:
+                    self.suppress[j.index, i.index] = True
+
+        # multi-bit fields, in bit order
+        self.fields = [Field(f, self.flags)
+                       for f in sorted(self.flags, key=lambda f: f.bits)
+                       if f.multi]
+        self.field_by_name = dict((f.name, f) for f in self.fields)
+
+    def __len__(self):
+        return len(self.flags)
+
+    def __iter__(self):
+        return iter(self.flags)
+
+    def __getitem__(self, name):
+        return self.by_name[name]
+
+
+def _compile(bit_flags):
+    """
+    Compile every band/sensor in a bit flag dictionary.
+
+    :param bit_flags: <dict> Nested dictionary, as lookup_dict.bit_flags.
+    :return: <dict> (band, sens): FlagSet pairs.
+    """
+    return dict(((band, sens), FlagSet(band, sens, flags))
+                for band in bit_flags
+                for sens, flags in bit_flags[band].items())
+
+
+flag_sets = _compile(lookup_dict.bit_flags)
+
+
+def get_flags(band, sens):
+    """
+    Return compiled flags for a band/sensor.
+
+    :param band: <str> Band type.
+    :param sens: <str> Sensor type, as either "L8" or "L47".
+    :return: <FlagSet>
+    """
+    try:
+        return flag_sets[(band, sens)]
+    except KeyError:
+        raise KeyError("No QA flags defined for band {0}, sensor {1}."
+                       .format(band, sens))
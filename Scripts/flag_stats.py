@@ -0,0 +1,98 @@
+"""
+This software has been approved for release by the U.S. Geological Survey
+(USGS). Although the software has been subjected to rigorous review, the USGS
+reserves the right to update the software as needed pursuant to further
+analysis and review. No warranty, expressed or implied, is made by the USGS or
+the U.S. Government as to the functionality of the software and related
+material nor shall the fact of release constitute any such warranty.
+Furthermore, the software is released on condition that neither the USGS nor
+the U.S. Government shall be held liable for any damages resulting from its
+authorized or unauthorized use.
+
+Created:        17 Oct 2026
+Version:        1.2
+
+Changelog
+1.0     17 Oct 2026     Original development. Per-flag pixel counts and
+                        fractions from a histogram of QA values.
+1.1     17 Oct 2026     Optional thread count.
+1.2     17 Oct 2026     scene_stats removed; use qa_api.stats.
+"""
+import csv
+import numpy as np
+import decode_engine
+import flag_registry
+
+# name of the flag marking pixels outside of the scene
+FILL = "Fill"
+
+# columns of CSV output
+csv_fields = ("path", "sensor", "band", "flag", "count", "fraction",
+              "count_valid", "fraction_valid")
+
+
+def _fraction(count, total):
+    return float(count) / total if total else 0.0
+
+
+def flag_counts(values, counts, band, sens):
+    """
+    Count pixels having each flag set, from the value counts of a raster.
+
+    Each distinct value is tested against every flag once, so the cost is
+    set by the number of distinct values (at most 65,536 for QA bands), not
+    by the number of pixels.
+
+    :param values: <array_like> Distinct integer QA values.
+    :param counts: <array_like> Pixel count of each value.
+    :param band: <str> Band type.
+    :param sens: <str> Sensor type, as either "L8" or "L47".
+    :return: <dict> Totals, and count and fraction of each flag, both of all
+                    pixels and of pixels that are not Fill ("valid").
+    """
+    values = np.asarray(values, dtype=np.int64).ravel()
+    counts = np.asarray(counts, dtype=np.int64).ravel()
+    flags = flag_registry.get_flags(band, sens)
+
+    hits = decode_engine.flag_hits(values, flags)
+
+    # bands without a Fill flag (e.g. sr_cloud_qa) have only valid pixels
+    if FILL in flags.by_name:
+        fill = hits[:, flags[FILL].index]
+    else:
+        fill = np.zeros(len(values), dtype=bool)
+
+    flag_total = counts.dot(hits.astype(np.int64))
+    flag_valid = counts.dot((hits & ~fill[:, None]).astype(np.int64))
+
+    total = int(counts.sum())
+    valid = total - int(counts[fill].sum())
+
+    return {"pixels": total,
+            "valid_pixels": valid,
+            "flags": [{"flag": f.name,
+                       "count": int(flag_total[f.index]),
+                       "fraction": _fraction(flag_total[f.index], total),
+                       "count_valid": int(flag_valid[f.index]),
+                       "fraction_valid": _fraction(flag_valid[f.index],
+                                                   valid)}
+                      for f in flags]}
+
+
+def write_csv(results, f):
+    """
+    Write flag statistics as CSV, one row per scene and flag.
+
+    :param results: <list> Dictionaries, as returned by qa_api.stats().
+    :param f: <file> Open, writable file object.
+    :return:
+    """
+    writer = csv.writer(f)
+    writer.writerow(csv_fields)
+
+    for r in results:
+        for row in r.get("flags", []):
+            writer.writerow([r["path"], r["sensor"], r["band"], row["flag"],
+                             row["count"], "{0:.6f}".format(row["fraction"]),
+                             row["count_valid"],
+                             "{0:.6f}".format(row["fraction_valid"])])
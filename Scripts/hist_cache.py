@@ -0,0 +1,97 @@
+"""
+This software has been approved for release by the U.S. Geological Survey
+(USGS). Although the software has been subjected to rigorous review, the USGS
+reserves the right to update the software as needed pursuant to further
+analysis and review. No warranty, expressed or implied, is made by the USGS or
+the U.S. Government as to the functionality of the software and related
+material nor shall the fact of release constitute any such warranty.
+Furthermore, the software is released on condition that neither the USGS nor
+the U.S. Government shall be held liable for any damages resulting from its
+authorized or unauthorized use.
+
+Created:        17 Oct 2026
+Version:        1.0
+
+Changelog
+1.0     17 Oct 2026     Original development. Value counts of rasters,
+                        cached on disk by file identity.
+"""
+import os
+import hashlib
+import tempfile
+import numpy as np
+import lut_cache
+
+# bump when the layout of the cached counts changes
+HIST_FORMAT = 1
+
+
+def file_key(path):
+    """
+    Return a key identifying the current contents of a raster file.
+
+    The key is built from the absolute path, size and modification time of
+    the file, so rewriting the raster (or touching it) gives a new key.
+
+    :param path: <str> Path to raster.
+    :return: <str> Hex digest.
+    """
+    st = os.stat(path)
+    mtime = getattr(st, "st_mtime_ns", int(st.st_mtime * 1e9))
+    ident = "{0}|{1}|{2}|{3}".format(HIST_FORMAT, os.path.abspath(path),
+                                     st.st_size, mtime)
+
+    return hashlib.sha1(ident.encode("utf-8")).hexdigest()
+
+
+def _cache_file(path):
+    return os.path.join(lut_cache.cache_dir(), "hist",
+                        "hist_{0}.npz".format(file_key(path)))
+
+
+def load(path):
+    """
+    Return cached value counts of a raster, if up to date.
+
+    :param path: <str> Path to raster.
+    :return: <tuple> (values, counts) arrays, or None if not cached.
+    """
+    try:
+        fname = _cache_file(path)
+        with np.load(fname) as npz:
+            return npz["values"], npz["counts"]
+    except (IOError, OSError, ValueError, KeyError):
+        return None
+
+
+def save(path, values, counts):
+    """
+    Cache value counts of a raster.
+
+    Failures to write (e.g. a read-only cache directory) are ignored, as the
+    counts can always be computed again.
+
+    :param path: <str> Path to raster.
+    :param values: <array_like> Distinct integer values.
+    :param counts: <array_like> Pixel count of each value.
+    :return:
+    """
+    try:
+        fname = _cache_file(path)
+        dname = os.path.dirname(fname)
+        if not os.path.isdir(dname):
+            os.makedirs(dname)
+
+        # write to a temporary file first, so readers never see partial counts
+        fd, tmp = tempfile.mkstemp(suffix=".tmp", dir=dname)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, values=np.asarray(values, dtype=np.int64),
+                         counts=np.asarray(counts, dtype=np.int64))
+            os.rename(tmp, fname)
+        except OSError:
+            # another process may have written the same counts first
+            if os.path.exists(tmp):
+                os.remove(tmp)
+    except (IOError, OSError):
+        pass
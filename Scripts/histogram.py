@@ -0,0 +1,117 @@
+"""
+This software has been approved for release by the U.S. Geological Survey
+(USGS). Although the software has been subjected to rigorous review, the USGS
+reserves the right to update the software as needed pursuant to further
+analysis and review. No warranty, expressed or implied, is made by the USGS or
+the U.S. Government as to the functionality of the software and related
+material nor shall the fact of release constitute any such warranty.
+Furthermore, the software is released on condition that neither the USGS nor
+the U.S. Government shall be held liable for any damages resulting from its
+authorized or unauthorized use.
+
+Created:        17 Oct 2026
+Version:        1.2
+
+Changelog
+1.0     17 Oct 2026     Original development. Value counts accumulated
+                        block by block.
+1.1     17 Oct 2026     Histograms can be rebuilt from cached counts.
+1.2     17 Oct 2026     Histograms of separate blocks can be merged.
+"""
+import numpy as np
+
+# QA bands fit in 16 bits, so their counts are kept in a fixed-size array
+DENSE_SIZE = 1 << 16
+
+
+class Histogram(object):
+    def __init__(self):
+        """
+        Running count of each integer value seen in a raster.
+        """
+        self.dense = np.zeros(DENSE_SIZE, dtype=np.int64)
+        self.sparse = {}
+
+    @classmethod
+    def from_counts(cls, values, counts):
+        """
+        Create histogram from previously counted values.
+
+        :param values: <array_like> Distinct integer values.
+        :param counts: <array_like> Pixel count of each value.
+        :return: <Histogram>
+        """
+        hist = cls()
+        values = np.asarray(values, dtype=np.int64).ravel()
+        counts = np.asarray(counts, dtype=np.int64).ravel()
+
+        ok = (values >= 0) & (values < DENSE_SIZE)
+        hist.dense[values[ok]] = counts[ok]
+        hist.sparse = dict(zip(values[~ok].tolist(), counts[~ok].tolist()))
+
+        return hist
+
+    def add(self, block):
+        """
+        Add the values of one block to the counts.
+
+        :param block: <numpy.ndarray> Integer array of any shape.
+        :return:
+        """
+        block = np.asarray(block).ravel()
+        if block.size == 0:
+            return
+
+        if block.dtype in (np.uint8, np.uint16):
+            self.dense += np.bincount(block, minlength=DENSE_SIZE)
+            return
+
+        block = block.astype(np.int64)
+        ok = (block >= 0) & (block < DENSE_SIZE)
+        self.dense += np.bincount(block[ok], minlength=DENSE_SIZE)
+
+        if not ok.all():
+            values, counts = np.unique(block[~ok], return_counts=True)
+            for v, c in zip(values.tolist(), counts.tolist()):
+                self.sparse[v] = self.sparse.get(v, 0) + c
+
+    def merge(self, other):
+        """
+        Add the counts of another histogram (e.g. of another block).
+
+        :param other: <Histogram>
+        :return:
+        """
+        self.dense += other.dense
+        for v, c in other.sparse.items():
+            self.sparse[v] = self.sparse.get(v, 0) + c
+
+    def values(self):
+        """
+        Return values present in raster, in ascending order.
+
+        :return: <numpy.ndarray>
+        """
+        return self.counts()[0]
+
+    def counts(self):
+        """
+        Return values present in raster and their pixel counts.
+
+        :return: <tuple> (values, counts) arrays, in ascending value order.
+        """
+        values = np.flatnonzero(self.dense).astype(np.int64)
+        counts = self.dense[values]
+
+        if self.sparse:
+            extra = sorted(self.sparse.items())
+            values = np.concatenate([values, [v for v, _ in extra]])
+            counts = np.concatenate([counts, [c for _, c in extra]])
+            order = np.argsort(values, kind="mergesort")
+            values, counts = values[order], counts[order]
+
+        return values.astype(np.int64), counts.astype(np.int64)
+
+    @property
+    def total(self):
+        return int(self.dense.sum()) + sum(self.sparse.values())
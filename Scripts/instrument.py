@@ -0,0 +1,235 @@
+"""
+This software has been approved for release by the U.S. Geological Survey
+(USGS). Although the software has been subjected to rigorous review, the USGS
+reserves the right to update the software as needed pursuant to further
+analysis and review. No warranty, expressed or implied, is made by the USGS or
+the U.S. Government as to the functionality of the software and related
+material nor shall the fact of release constitute any such warranty.
+Furthermore, the software is released on condition that neither the USGS nor
+the U.S. Government shall be held liable for any damages resulting from its
+authorized or unauthorized use.
+
+Created:        17 Oct 2026
+Version:        1.1
+
+Changelog
+1.0     17 Oct 2026     Original development. Per-stage timings and
+                        counters, reported through ArcGIS or as JSON.
+1.1     17 Oct 2026     Runs on several threads reported separately.
+
+Disabled unless the LANDSAT_QA_PROFILE environment variable is set (or
+enable() is called). When disabled, stage() returns a shared do-nothing
+context manager and add() returns at once, so instrumented code pays one
+function call per stage or counter.
+
+Reports go to arcpy.AddMessage when ArcPy is loaded, otherwise one JSON
+line per run is appended to the file named by LANDSAT_QA_PROFILE_FILE, or
+written to standard error.
+"""
+import os
+import sys
+import json
+import time
+import threading
+
+_enabled = [bool(os.environ.get("LANDSAT_QA_PROFILE"))]
+
+# stage name: [calls, seconds]
+_stages = {}
+
+# counter name: total
+_counters = {}
+
+# nesting depth of run(), per thread
+_local = threading.local()
+
+# outermost runs in progress, on all threads
+_active = [0]
+
+_lock = threading.Lock()
+
+
+def enable(on=True):
+    """
+    Turn instrumentation on or off.
+
+    :param on: <bool>
+    :return:
+    """
+    _enabled[0] = bool(on)
+
+
+def is_enabled():
+    return _enabled[0]
+
+
+def reset():
+    """
+    Clear all recorded stages and counters.
+
+    :return:
+    """
+    with _lock:
+        _stages.clear()
+        _counters.clear()
+
+
+def add(name, n=1):
+    """
+    Add to a counter (e.g. "pixels", "bytes_read", "unique_values").
+
+    :param name: <str> Counter name.
+    :param n: <int> Amount to add.
+    :return:
+    """
+    if not _enabled[0]:
+        return
+
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + int(n)
+
+
+class _Null(object):
+    # stand-in for _Stage when disabled
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+_null = _Null()
+
+
+class _Stage(object):
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.time()
+        return self
+
+    def __exit__(self, *args):
+        dt = time.time() - self.t0
+        with _lock:
+            rec = _stages.setdefault(self.name, [0, 0.0])
+            rec[0] += 1
+            rec[1] += dt
+        return False
+
+
+def stage(name):
+    """
+    Time a stage of work, as a context manager.
+
+    Stages timed on several threads at once add up their wall times.
+
+    :param name: <str> Stage name (e.g. "Con", "lookup_labels").
+    :return: <context manager>
+    """
+    if not _enabled[0]:
+        return _null
+
+    return _Stage(name)
+
+
+class _Run(_Stage):
+    def __enter__(self):
+        depth = getattr(_local, "depth", 0)
+        _local.depth = depth + 1
+        if depth == 0:
+            with _lock:
+                self.since = _snapshot()
+                _active[0] += 1
+        return _Stage.__enter__(self)
+
+    def __exit__(self, *args):
+        _Stage.__exit__(self, *args)
+        _local.depth -= 1
+        if _local.depth == 0:
+            emit(self.name, self.since)
+            with _lock:
+                _active[0] -= 1
+                if _active[0] == 0:
+                    _stages.clear()
+                    _counters.clear()
+        return False
+
+
+def _snapshot():
+    # copy of stages and counters, taken under _lock
+    return (dict((k, list(v)) for k, v in _stages.items()),
+            dict(_counters))
+
+
+def run(name):
+    """
+    Time a whole operation, and report all stages and counters when the
+    outermost run (of the calling thread) ends.
+
+    Runs on several threads at once are reported separately, each with the
+    stages and counters recorded while it ran; as these are shared, a run
+    also includes work done meanwhile by the others.
+
+    :param name: <str> Operation name (e.g. "build_attr_table").
+    :return: <context manager>
+    """
+    if not _enabled[0]:
+        return _null
+
+    return _Run(name)
+
+
+def report(name=None, since=None):
+    """
+    Return recorded stages and counters.
+
+    :param name: <str> Name of the run.
+    :param since: <tuple> Stages and counters to subtract, as recorded when
+                          a run started (default: none).
+    :return: <dict>
+    """
+    stages0, counters0 = since or ({}, {})
+    with _lock:
+        stages = dict((k, (v[0] - stages0.get(k, [0, 0.0])[0],
+                           v[1] - stages0.get(k, [0, 0.0])[1]))
+                      for k, v in _stages.items())
+        counters = dict((k, v - counters0.get(k, 0))
+                        for k, v in _counters.items())
+
+    return {"run": name,
+            "stages": dict((k, {"calls": v[0], "seconds": round(v[1], 6)})
+                           for k, v in stages.items() if v[0]),
+            "counters": dict((k, v) for k, v in counters.items()
+                             if v or k not in counters0)}
+
+
+def emit(name=None, since=None):
+    """
+    Report recorded stages and counters.
+
+    :param name: <str> Name of the run.
+    :param since: <tuple> As report().
+    :return:
+    """
+    rep = report(name, since)
+
+    if "arcpy" in sys.modules:
+        arcpy = sys.modules["arcpy"]
+        arcpy.AddMessage("Timing of {0}:".format(name))
+        for k, v in sorted(rep["stages"].items(),
+                           key=lambda kv: -kv[1]["seconds"]):
+            arcpy.AddMessage("  {0}: {1:.3f} s ({2} calls)"
+                             .format(k, v["seconds"], v["calls"]))
+        for k, v in sorted(rep["counters"].items()):
+            arcpy.AddMessage("  {0}: {1}".format(k, v))
+        return
+
+    line = json.dumps(rep, sort_keys=True)
+    fname = os.environ.get("LANDSAT_QA_PROFILE_FILE")
+    if fname:
+        with _lock:
+            with open(fname, "a") as f:
+                f.write(line + "\n")
+    else:
+        sys.stderr.write(line + "\n")
@@ -0,0 +1,274 @@
+"""
+This software has been approved for release by the U.S. Geological Survey
+(USGS). Although the software has been subjected to rigorous review, the USGS
+reserves the right to update the software as needed pursuant to further
+analysis and review. No warranty, expressed or implied, is made by the USGS or
+the U.S. Government as to the functionality of the software and related
+material nor shall the fact of release constitute any such warranty.
+Furthermore, the software is released on condition that neither the USGS nor
+the U.S. Government shall be held liable for any damages resulting from its
+authorized or unauthorized use.
+
+Created:        17 Oct 2026
+Version:        1.3
+
+Changelog
+1.0     17 Oct 2026     Original development. Full-domain (16-bit) label and
+                        flag lookup tables, cached on disk.
+1.1     17 Oct 2026     Uses compiled flags from flag_registry.
+1.2     17 Oct 2026     Tables loaded once when used from several threads.
+1.3     17 Oct 2026     Flag bits of arrays of any shape (lookup_flag_bits).
+"""
+import os
+import json
+import hashlib
+import tempfile
+import threading
+import numpy as np
+import lookup_dict
+import decode_engine
+import flag_registry
+
+# bump when the layout of the cached tables changes
+LUT_FORMAT = 1
+
+# every QA band fits in 16 bits
+LUT_SIZE = 1 << 16
+
+# tables already loaded by this process, keyed by (band, sens, rm_low)
+_tables = {}
+_version = []
+
+# held while a table is loaded or built, so threads build each table once
+_lock = threading.Lock()
+
+
+class LookupTable(object):
+    def __init__(self, band, sens, rm_low, labels, label_index, flag_mask):
+        """
+        Value -> label and value -> flag lookups for one band/sensor.
+
+        :param band: <str> Band type.
+        :param sens: <str> Sensor type, as either "L8" or "L47".
+        :param rm_low: <bool> Whether 'low' labels were removed.
+        :param labels: <list> Distinct labels.
+        :param label_index: <numpy.ndarray> Index into labels for each value.
+        :param flag_mask: <numpy.ndarray> Bit i set if flag i is set in value.
+        """
+        self.band = band
+        self.sens = sens
+        self.rm_low = rm_low
+        self.flags = flag_registry.get_flags(band, sens)
+        self.labels = np.asarray(labels, dtype=object)
+        self.label_index = label_index
+        self.flag_mask = flag_mask
+
+    def flag_bit(self, flag):
+        """
+        Return the bit representing a flag in flag_mask.
+
+        :param flag: <str> Flag name, as in lookup_dict.bit_flags.
+        :return: <int>
+        """
+        return 1 << self.flags[flag].index
+
+
+def table_version():
+    """
+    Return a digest identifying lookup_dict.bit_flags and the cache format.
+
+    :return: <str>
+    """
+    if not _version:
+        flags = json.dumps(lookup_dict.bit_flags, sort_keys=True)
+        digest = hashlib.sha1(flags.encode("utf-8")).hexdigest()
+        _version.append("{0}-{1}".format(LUT_FORMAT, digest[:16]))
+
+    return _version[0]
+
+
+def cache_dir():
+    """
+    Return directory holding cached tables.
+
+    Set the LANDSAT_QA_CACHE environment variable to override the default
+    location (~/.landsat_qa_cache).
+
+    :return: <str>
+    """
+    return os.environ.get("LANDSAT_QA_CACHE",
+                          os.path.join(os.path.expanduser("~"),
+                                       ".landsat_qa_cache"))
+
+
+def _cache_file(band, sens, rm_low):
+    fname = "lut_{0}_{1}_{2}_{3}.npz".format(band, sens, int(rm_low),
+                                             table_version())
+    return os.path.join(cache_dir(), "lut", fname)
+
+
+def build_table(band, sens, rm_low=False):
+    """
+    Decode every possible 16-bit value for a band/sensor.
+
+    :param band: <str> Band type.
+    :param sens: <str> Sensor type, as either "L8" or "L47".
+    :param rm_low: <bool> Remove (True) or keep (False) 'low' labels.
+    :return: <LookupTable>
+    """
+    flags = flag_registry.get_flags(band, sens)
+    if len(flags) > 32:
+        raise ValueError("Too many flags for {0} {1}.".format(band, sens))
+
+    values = np.arange(LUT_SIZE, dtype=np.int64)
+
+    hits = decode_engine.flag_hits(values, flags)
+    flag_mask = hits.astype(np.int64).dot(flags.weights).astype(np.uint32)
+
+    labels = decode_engine.decode_values(values, band, sens, rm_low)
+    uniq, label_index = np.unique(labels.astype(np.str_),
+                                  return_inverse=True)
+
+    return LookupTable(band, sens, rm_low, uniq.tolist(),
+                       label_index.ravel().astype(np.uint16), flag_mask)
+
+
+def _load(fname, band, sens, rm_low):
+    with np.load(fname) as npz:
+        return LookupTable(band, sens, rm_low, npz["labels"].tolist(),
+                           npz["label_index"], npz["flag_mask"])
+
+
+def _save(fname, table):
+    dname = os.path.dirname(fname)
+    if not os.path.isdir(dname):
+        os.makedirs(dname)
+
+    # write to a temporary file first, so readers never see partial tables
+    fd, tmp = tempfile.mkstemp(suffix=".tmp", dir=dname)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, labels=table.labels.astype(np.str_),
+                     label_index=table.label_index,
+                     flag_mask=table.flag_mask)
+        os.rename(tmp, fname)
+    except OSError:
+        # another process may have written the same table first
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def get_table(band, sens, rm_low=False):
+    """
+    Return lookup table for a band/sensor, building it on first use.
+
+    Tables are held in memory for the life of the process, and in the cache
+    directory between processes. Cached files are named after
+    table_version(), so editing lookup_dict invalidates them.
+
+    :param band: <str> Band type.
+    :param sens: <str> Sensor type, as either "L8" or "L47".
+    :param rm_low: <bool> Remove (True) or keep (False) 'low' labels.
+    :return: <LookupTable>
+    """
+    key = (band, sens, bool(rm_low))
+    if key in _tables:
+        return _tables[key]
+
+    with _lock:
+        if key in _tables:
+            return _tables[key]
+
+        fname = _cache_file(*key)
+        table = None
+
+        if os.path.isfile(fname):
+            try:
+                table = _load(fname, *key)
+            except (IOError, OSError, ValueError, KeyError):
+                table = None
+
+        if table is None:
+            table = build_table(*key)
+            try:
+                _save(fname, table)
+            except (IOError, OSError):
+                pass
+
+        _tables[key] = table
+
+    return _tables[key]
+
+
+def _in_domain(values):
+    return (values >= 0) & (values < LUT_SIZE)
+
+
+def lookup_labels(values, band, sens, rm_low=False):
+    """
+    Look up attribute labels for an array of QA values.
+
+    :param values: <array_like> Integer QA values.
+    :param band: <str> Band type.
+    :param sens: <str> Sensor type, as either "L8" or "L47".
+    :param rm_low: <bool> Remove (True) or keep (False) 'low' labels.
+    :return: <numpy.ndarray> Object array of labels, same length as values.
+    """
+    values = np.asarray(values, dtype=np.int64).ravel()
+    table = get_table(band, sens, rm_low)
+
+    ok = _in_domain(values)
+    if ok.all():
+        return table.labels[table.label_index[values]]
+
+    # values outside of 16 bits are decoded directly
+    out = np.empty(len(values), dtype=object)
+    out[ok] = table.labels[table.label_index[values[ok]]]
+    out[~ok] = decode_engine.decode_values(values[~ok], band, sens, rm_low)
+
+    return out
+
+
+def lookup_flag(values, band, sens, flag):
+    """
+    Test an array of QA values for a single flag.
+
+    :param values: <array_like> Integer QA values.
+    :param band: <str> Band type.
+    :param sens: <str> Sensor type, as either "L8" or "L47".
+    :param flag: <str> Flag name, as in lookup_dict.bit_flags.
+    :return: <numpy.ndarray> Boolean array, same length as values.
+    """
+    values = np.asarray(values, dtype=np.int64).ravel()
+    table = get_table(band, sens)
+    bit = table.flag_bit(flag)
+
+    ok = _in_domain(values)
+    out = np.zeros(len(values), dtype=bool)
+    out[ok] = (table.flag_mask[values[ok]] & bit) > 0
+
+    if not ok.all():
+        f = table.flags[flag]
+        out[~ok] = (values[~ok] & f.mask) == f.value
+
+    return out
+
+
+def lookup_flag_bits(qa, band, sens):
+    """
+    Look up the flags set in an array of QA values, one bit per flag (bit i
+    for the flag with index i in flag_registry).
+
+    :param qa: <numpy.ndarray> Integer QA values, of any shape.
+    :param band: <str> Band type.
+    :param sens: <str> Sensor type, as either "L8" or "L47".
+    :return: <numpy.ndarray> Integer array, shaped like qa.
+    """
+    if qa.dtype in (np.uint8, np.uint16):
+        return get_table(band, sens).flag_mask[qa]
+
+    # other integer types may hold values outside of the lookup tables
+    flags = flag_registry.get_flags(band, sens)
+    hits = decode_engine.flag_hits(qa.astype(np.int64).ravel(), flags)
+
+    return hits.astype(np.int64).dot(flags.weights).reshape(qa.shape)
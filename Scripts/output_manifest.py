@@ -0,0 +1,232 @@
+"""
+This software has been approved for release by the U.S. Geological Survey
+(USGS). Although the software has been subjected to rigorous review, the USGS
+reserves the right to update the software as needed pursuant to further
+analysis and review. No warranty, expressed or implied, is made by the USGS or
+the U.S. Government as to the functionality of the software and related
+material nor shall the fact of release constitute any such warranty.
+Furthermore, the software is released on condition that neither the USGS nor
+the U.S. Government shall be held liable for any damages resulting from its
+authorized or unauthorized use.
+
+Created:        17 Oct 2026
+Version:        1.2
+
+Changelog
+1.0     17 Oct 2026     Original development. Record of the inputs and
+                        settings of each output, for incremental re-runs.
+1.1     17 Oct 2026     Entries replaced on Python 2 on Windows too.
+1.2     17 Oct 2026     Input hash kept across changes made by products
+                        themselves (keep_input_hash).
+
+A manifest is a directory holding one small JSON file per product (an
+attribute table, or the output(s) of one flag), named after the digest of
+the product's key (kind, input and output paths, flags). Each file records
+the product's signature: the content hash of the input raster, band,
+sensor, the definitions in lookup_dict of the flags used, and the options.
+A product is up to date when its signature is unchanged and its outputs
+exist.
+
+Files are written to a temporary name and renamed, so workers of a batch
+may share a manifest: readers never see partial entries, and two workers
+redoing the same product both write a valid entry.
+"""
+import os
+import json
+import hashlib
+import tempfile
+import lookup_dict
+import lut_cache
+import hist_cache
+
+# bump when the layout of entries, or the outputs for given settings, change
+MANIFEST_FORMAT = 1
+
+# bytes read at a time when hashing a raster
+HASH_CHUNK = 1 << 22
+
+
+def _replace(src, dst):
+    # os.rename does not overwrite on Windows, and Python 2 has no os.replace
+    if hasattr(os, "replace"):
+        os.replace(src, dst)
+        return
+
+    try:
+        os.rename(src, dst)
+    except OSError:
+        try:
+            os.remove(dst)
+        except OSError:
+            # removed by another worker in the meantime
+            pass
+        os.rename(src, dst)
+
+
+def content_hash(path):
+    """
+    Return the SHA-1 digest of the contents of a file.
+
+    :param path: <str> Path to file.
+    :return: <str> Hex digest.
+    """
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def flag_version(band, sens, flags=None):
+    """
+    Return a digest of the lookup_dict definitions of flags of a
+    band/sensor, so products are only redone when flags they use change.
+
+    :param band: <str> Band type.
+    :param sens: <str> Sensor type, as either "L8" or "L47".
+    :param flags: <list> Flag names (default: all flags of the band).
+    :return: <str> Hex digest.
+    """
+    defs = lookup_dict.bit_flags.get(band, {}).get(sens, {})
+    if flags is not None:
+        defs = dict((f, defs.get(f)) for f in flags)
+
+    text = json.dumps([lut_cache.LUT_FORMAT, defs], sort_keys=True)
+
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _digest(obj):
+    text = json.dumps(obj, sort_keys=True)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class Manifest(object):
+    def __init__(self, path):
+        """
+        Output manifest stored in a directory.
+
+        :param path: <str> Directory (created on first write).
+        """
+        self.path = path
+
+    def _file(self, kind, key):
+        return os.path.join(self.path, kind, _digest(key) + ".json")
+
+    def _read(self, fname):
+        try:
+            with open(fname) as f:
+                return json.load(f)
+        except (IOError, OSError, ValueError):
+            return None
+
+    def _write(self, fname, entry):
+        dname = os.path.dirname(fname)
+        if not os.path.isdir(dname):
+            try:
+                os.makedirs(dname)
+            except OSError:
+                # created by another worker in the meantime
+                if not os.path.isdir(dname):
+                    raise
+
+        # write to a temporary file first, so readers never see partial
+        #   entries
+        fd, tmp = tempfile.mkstemp(suffix=".tmp", dir=dname)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(entry, f, indent=1, sort_keys=True)
+            _replace(tmp, fname)
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            # another worker wrote the same entry first (e.g. held open on
+            #   Windows while being replaced)
+            if not os.path.exists(fname):
+                raise
+
+    def input_hash(self, path):
+        """
+        Return the content hash of an input raster.
+
+        Hashes are kept in the manifest by file identity (path, size and
+        modification time; see hist_cache.file_key), so unchanged rasters
+        are read once, not on every run.
+
+        :param path: <str> Path to raster.
+        :return: <str> Hex digest.
+        """
+        fname = self._input_file(path)
+
+        entry = self._read(fname)
+        if entry and entry.get("format") == MANIFEST_FORMAT:
+            return entry["hash"]
+
+        digest = content_hash(path)
+        self.keep_input_hash(path, digest)
+
+        return digest
+
+    def keep_input_hash(self, path, digest):
+        """
+        Record the content hash of an input raster under its current file
+        identity.
+
+        Used after a product modifies its own input (e.g. an attribute table
+        held in an Erdas Imagine raster), so the input keeps the hash it had
+        before, and its products are not redone on every run.
+
+        :param path: <str> Path to raster.
+        :param digest: <str> Hex digest, as returned by input_hash().
+        :return:
+        """
+        self._write(self._input_file(path),
+                    {"format": MANIFEST_FORMAT,
+                     "path": os.path.abspath(path), "hash": digest})
+
+    def _input_file(self, path):
+        return os.path.join(self.path, "inputs",
+                            hist_cache.file_key(path) + ".json")
+
+    def is_current(self, key, signature):
+        """
+        Test whether a product is up to date.
+
+        :param key: <dict> Product identity (kind, paths, flags).
+        :param signature: <dict> Inputs and settings of the product.
+        :return: <bool> True if recorded with the same signature, and all
+                        its recorded outputs exist.
+        """
+        entry = self._read(self._file("products", key))
+        if not entry or entry.get("format") != MANIFEST_FORMAT:
+            return False
+        if entry.get("signature") != _digest(signature):
+            return False
+
+        return all(os.path.exists(p) for p in entry.get("outputs", []))
+
+    def outputs(self, key):
+        """
+        Return the recorded outputs of a product.
+
+        :param key: <dict> Product identity.
+        :return: <list> Paths, empty if not recorded.
+        """
+        entry = self._read(self._file("products", key))
+
+        return entry.get("outputs", []) if entry else []
+
+    def record(self, key, signature, outputs):
+        """
+        Record a product as made.
+
+        :param key: <dict> Product identity.
+        :param signature: <dict> Inputs and settings of the product.
+        :param outputs: <list> Paths of output files.
+        :return:
+        """
+        self._write(self._file("products", key),
+                    {"format": MANIFEST_FORMAT, "key": key,
+                     "signature": _digest(signature), "settings": signature,
+                     "outputs": list(outputs)})
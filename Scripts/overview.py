@@ -0,0 +1,220 @@
+"""
+This software has been approved for release by the U.S. Geological Survey
+(USGS). Although the software has been subjected to rigorous review, the USGS
+reserves the right to update the software as needed pursuant to further
+analysis and review. No warranty, expressed or implied, is made by the USGS or
+the U.S. Government as to the functionality of the software and related
+material nor shall the fact of release constitute any such warranty.
+Furthermore, the software is released on condition that neither the USGS nor
+the U.S. Government shall be held liable for any damages resulting from its
+authorized or unauthorized use.
+
+Created:        17 Oct 2026
+Version:        1.1
+
+Changelog
+1.0     17 Oct 2026     Original development. Coarse per-flag fraction or
+                        count rasters, and pyramids of them, in one pass.
+1.1     17 Oct 2026     Optional pipelined reading and counting.
+
+Each output cell covers cell x cell pixels of the QA band. Band 1 of every
+overview is the valid (not Fill) fraction of the cell's pixels, and the
+following bands are the flags, as the fraction of the cell's valid pixels
+having the flag set (NaN where a cell has no valid pixels). With counts, the
+bands hold pixel counts instead.
+"""
+import os
+import numpy as np
+import lut_cache
+import flag_registry
+import extract_bands
+import instrument
+
+# name of the flag marking pixels outside of the scene
+FILL = "Fill"
+
+# name of the first band of each overview
+VALID = "Valid"
+
+# cell size (pixels) of the first level, when not given
+DEFAULT_CELL = 32
+
+# rows read at a time, rounded to whole cells
+OVERVIEW_BLOCK_ROWS = 1024
+
+
+class _Grid(object):
+    # size and georeferencing of an overview, for raster_io writers
+    def __init__(self, like, cell):
+        rows, cols = like.shape
+        self.shape = (-(-rows // cell), -(-cols // cell))
+        self.projection = like.projection
+
+        gt = like.geotransform
+        self.geotransform = (gt[0], gt[1] * cell, gt[2] * cell, gt[3],
+                             gt[4] * cell, gt[5] * cell) if gt else None
+
+
+def cell_sums(array, cell):
+    """
+    Sum an array over cells of cell x cell elements; cells at the right and
+    bottom edges may be partial.
+
+    :param array: <numpy.ndarray> 2-D array.
+    :param cell: <int> Cell size, in elements.
+    :return: <numpy.ndarray> int64 array, shape divided by cell (rounded up).
+    """
+    nrows, ncols = array.shape
+    out_rows, out_cols = -(-nrows // cell), -(-ncols // cell)
+
+    padded = np.zeros((out_rows * cell, out_cols * cell), dtype=np.int64)
+    padded[:nrows, :ncols] = array
+
+    return padded.reshape(out_rows, cell, out_cols, cell).sum(axis=(1, 3))
+
+
+def block_counts(qa, band, sens, bits, fill, cell):
+    """
+    Count pixels, valid pixels and valid pixels of each flag in each cell of
+    a block.
+
+    :param qa: <numpy.ndarray> Integer QA values; rows a multiple of cell,
+                               unless at the bottom of the raster.
+    :param band: <str> Band type.
+    :param sens: <str> Sensor type, as either "L8" or "L47".
+    :param bits: <list> Flag bit (lut_cache.lookup_flag_bits) of each flag.
+    :param fill: <int> Fill bit, or 0 if the band has no Fill flag.
+    :param cell: <int> Cell size, in pixels.
+    :return: <numpy.ndarray> int64 array, shape (2 + len(bits), cell rows,
+                             cell columns): pixels, valid, then flags.
+    """
+    fbits = lut_cache.lookup_flag_bits(qa, band, sens)
+    valid = (fbits & fill) == 0
+
+    return np.array([cell_sums(np.ones(qa.shape, dtype=np.int8), cell),
+                     cell_sums(valid, cell)] +
+                    [cell_sums(((fbits & b) != 0) & valid, cell)
+                     for b in bits])
+
+
+def _reduce(counts):
+    # next level of a pyramid: sums of 2 x 2 cells
+    _, rows, cols = counts.shape
+    padded = np.zeros((len(counts), rows + rows % 2, cols + cols % 2),
+                      dtype=counts.dtype)
+    padded[:, :rows, :cols] = counts
+
+    return padded[:, 0::2, 0::2] + padded[:, 1::2, 0::2] + \
+        padded[:, 0::2, 1::2] + padded[:, 1::2, 1::2]
+
+
+def _bands(counts, as_counts):
+    # output bands of an overview, from pixel, valid and flag counts
+    if as_counts:
+        return counts[1:].astype(np.uint32)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        valid = counts[1] / counts[0].astype(np.float64)
+        flags = counts[2:] / counts[1].astype(np.float64)
+
+    return np.concatenate([valid[None], flags]).astype(np.float32)
+
+
+def flag_overview(raster_in, sensor, band, flags, basename, cell=None,
+                  levels=1, counts=False, block_rows=None, block_cols=None,
+                  threads=None, pipeline=False):
+    """
+    Write coarse rasters of flag fractions (or counts) per cell of pixels,
+    reading the QA band once and without writing full resolution masks.
+
+    Counts of the first level are kept in memory (one value per cell and
+    flag); each further level sums 2 x 2 cells of the one before, so a
+    pyramid costs no more reading.
+
+    :param raster_in: <str> Path to input raster.
+    :param sensor: <str> Sensor type, as either "L8" or "L47".
+    :param band: <str> Band type.
+    :param flags: <list> Flag names (default: every flag but Fill).
+    :param basename: <str> Base filename for output data.
+    :param cell: <int> Cell size of the first level, in pixels (default:
+                       DEFAULT_CELL).
+    :param levels: <int> Number of levels; level k has cells of
+                         cell * 2 ** k pixels.
+    :param counts: <bool> Write pixel counts (uint32) instead of fractions
+                          (float32).
+    :param block_rows: <int> Rows read at a time (rounded up to whole
+                             cells; default: OVERVIEW_BLOCK_ROWS).
+    :param block_cols: <int> Columns read at a time (rounded up to whole
+                             cells; default: all columns).
+    :param threads: <int> Count blocks on this many threads (default: 1).
+    :param pipeline: <bool> Read and count blocks concurrently (see
+                           raster_io.pipeline_blocks).
+    :return: <dict> Band names, and (cell size, path) of each level.
+    """
+    import raster_io
+
+    cell = int(cell or DEFAULT_CELL)
+    if cell < 2 or levels < 1:
+        raise ValueError("Cell size must be at least 2 pixels, and levels "
+                         "at least 1.")
+
+    flag_set = flag_registry.get_flags(band, sensor)
+    if flags is None:
+        flags = [f.name for f in flag_set if f.name != FILL]
+    targets = [flag_set[extract_bands.clean_flag_name(f)] for f in flags]
+
+    bits = [1 << f.index for f in targets]
+    fill = 1 << flag_set[FILL].index if FILL in flag_set.by_name else 0
+
+    block_rows = block_rows or OVERVIEW_BLOCK_ROWS
+    block_rows = -(-block_rows // cell) * cell
+    if block_cols:
+        block_cols = -(-block_cols // cell) * cell
+
+    input_ext = os.path.splitext(raster_in)[-1]
+    names = [VALID] + [f.name for f in targets]
+
+    def count_block(qa):
+        with instrument.stage("cell_counts"):
+            out = block_counts(qa, band, sensor, bits, fill, cell)
+        instrument.add("pixels", qa.size)
+        instrument.add("bytes_read", qa.nbytes)
+        return out
+
+    with instrument.run("flag_overview"):
+        with raster_io.open_raster(raster_in) as r_in:
+            # check to ensure raster is not floating/double/complex
+            if r_in.dtype is None or r_in.dtype.kind not in "iu":
+                raise ValueError("Data type of input raster must be "
+                                 "integer.")
+
+            # load lookup table before any threads start
+            lut_cache.get_table(band, sensor)
+
+            grid = _Grid(r_in, cell)
+            level = np.zeros((2 + len(targets),) + grid.shape,
+                             dtype=np.int64)
+            for (row_off, _, col_off, _), c in raster_io.map_blocks(
+                    count_block, r_in, block_rows, block_cols, threads,
+                    pipeline):
+                i, j = row_off // cell, col_off // cell
+                level[:, i:i + c.shape[1], j:j + c.shape[2]] = c
+
+            outputs = []
+            for k in range(levels):
+                size = cell * 2 ** k
+                if k:
+                    level = _reduce(level)
+                    grid = _Grid(r_in, size)
+
+                path = "{0}_overview_{1}{2}".format(basename, size,
+                                                    input_ext)
+                out = _bands(level, counts)
+                with instrument.stage("write"):
+                    with raster_io.create_raster(path, grid, out.dtype.name,
+                                                 len(out)) as r_out:
+                        for i, b in enumerate(out, 1):
+                            r_out.write(b, 0, 0, i)
+                outputs.append((size, path))
+
+    return {"bands": names, "levels": outputs}
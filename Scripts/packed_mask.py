@@ -0,0 +1,301 @@
+"""
+This software has been approved for release by the U.S. Geological Survey
+(USGS). Although the software has been subjected to rigorous review, the USGS
+reserves the right to update the software as needed pursuant to further
+analysis and review. No warranty, expressed or implied, is made by the USGS or
+the U.S. Government as to the functionality of the software and related
+material nor shall the fact of release constitute any such warranty.
+Furthermore, the software is released on condition that neither the USGS nor
+the U.S. Government shall be held liable for any damages resulting from its
+authorized or unauthorized use.
+
+Created:        17 Oct 2026
+Version:        1.0
+
+Changelog
+1.0     17 Oct 2026     Original development. 1-bit packed mask rasters,
+                        with bitwise operations on the packed bytes.
+
+File layout:
+    MAGIC
+    header length   <uint32, little endian>
+    header          <JSON: rows, cols, count, row_bytes, geotransform,
+                     projection>
+    bands           <count x rows x row_bytes bytes, one bit per pixel,
+                     most significant bit first, each row padded to a
+                     whole byte>
+"""
+import os
+import json
+import struct
+import numpy as np
+
+MAGIC = b"LSQAMSK1"
+
+# extension of packed mask files
+PACKED_EXT = ".qamask"
+
+# rows per block in bitwise operations between masks
+OP_BLOCK_ROWS = 1024
+
+
+def _row_bytes(cols):
+    return (cols + 7) // 8
+
+
+def _write_header(path, rows, cols, count, geotransform, projection):
+    header = {"rows": rows, "cols": cols, "count": count,
+              "row_bytes": _row_bytes(cols),
+              "geotransform": list(geotransform) if geotransform else None,
+              "projection": projection or ""}
+    raw = json.dumps(header, sort_keys=True).encode("utf-8")
+
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(raw)))
+        f.write(raw)
+        offset = f.tell()
+        f.truncate(offset + count * rows * header["row_bytes"])
+
+    return offset
+
+
+def _read_header(path):
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise IOError("{0} is not a packed mask".format(path))
+        size = struct.unpack("<I", f.read(4))[0]
+        header = json.loads(f.read(size).decode("utf-8"))
+        offset = f.tell()
+
+    return header, offset
+
+
+class PackedMask(object):
+    def __init__(self, path, mode="r"):
+        """
+        Packed mask file, memory-mapped.
+
+        :param path: <str> Path to mask.
+        :param mode: <str> "r" to read, "r+" to read and write.
+        """
+        self.path = path
+        header, offset = _read_header(path)
+
+        self.rows = header["rows"]
+        self.cols = header["cols"]
+        self.count = header["count"]
+        self.row_bytes = header["row_bytes"]
+        self.geotransform = tuple(header["geotransform"]) \
+            if header["geotransform"] else None
+        self.projection = header["projection"]
+        self.dtype = np.dtype("uint8")
+        self.nodata = None
+
+        self.bits = np.memmap(path, dtype=np.uint8, mode=mode, offset=offset,
+                              shape=(self.count, self.rows, self.row_bytes))
+
+    @property
+    def shape(self):
+        return self.rows, self.cols
+
+    def read_packed(self, row_off=0, nrows=None, band=1):
+        """
+        Read rows of one band without unpacking them.
+
+        :param row_off: <int> First row.
+        :param nrows: <int> Number of rows (default: to last row).
+        :param band: <int> Band number (starting at 1).
+        :return: <numpy.ndarray> uint8 array, shape (nrows, row_bytes).
+        """
+        if nrows is None:
+            nrows = self.rows - row_off
+
+        return np.asarray(self.bits[band - 1, row_off:row_off + nrows])
+
+    def read(self, row_off=0, nrows=None, col_off=0, ncols=None, band=1):
+        """
+        Read a window of one band, unpacked to 0/1 values.
+
+        Only the bytes covering the window are unpacked.
+
+        :param row_off: <int> First row of window.
+        :param nrows: <int> Number of rows (default: to last row).
+        :param col_off: <int> First column of window.
+        :param ncols: <int> Number of columns (default: to last column).
+        :param band: <int> Band number (starting at 1).
+        :return: <numpy.ndarray> 2-D uint8 array.
+        """
+        if ncols is None:
+            ncols = self.cols - col_off
+
+        b0 = col_off // 8
+        b1 = _row_bytes(col_off + ncols)
+        packed = self.read_packed(row_off, nrows, band)[:, b0:b1]
+        start = col_off - b0 * 8
+
+        return np.unpackbits(packed, axis=1)[:, start:start + ncols]
+
+    def close(self):
+        if self.bits is not None and self.bits.mode != "r":
+            self.bits.flush()
+        self.bits = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class PackedMaskWriter(PackedMask):
+    def __init__(self, path, like, count=1):
+        """
+        Packed mask opened for writing, georeferenced like an input raster.
+
+        Has the same write() interface as raster_io.RasterWriter.
+
+        :param path: <str> Path to output mask.
+        :param like: <RasterReader> Raster providing size and georeferencing.
+        :param count: <int> Number of bands.
+        """
+        rows, cols = like.shape
+        _write_header(path, rows, cols, count, like.geotransform,
+                      like.projection)
+
+        super(PackedMaskWriter, self).__init__(path, "r+")
+
+    def write(self, array, row_off=0, col_off=0, band=1):
+        """
+        Write a window of one band.
+
+        :param array: <numpy.ndarray> 2-D array, non-zero values are set.
+        :param row_off: <int> First row of window.
+        :param col_off: <int> First column of window.
+        :param band: <int> Band number (starting at 1).
+        :return:
+        """
+        nrows, ncols = array.shape
+        bits = (np.asarray(array) != 0).astype(np.uint8)
+        out = self.bits[band - 1, row_off:row_off + nrows]
+
+        if col_off == 0 and ncols == self.cols:
+            out[:] = np.packbits(bits, axis=1)
+            return
+
+        # windows not aligned to whole bytes share bytes with their
+        #   neighbours, so merge with what was already written
+        b0 = col_off // 8
+        b1 = _row_bytes(col_off + ncols)
+        start = col_off - b0 * 8
+
+        merged = np.unpackbits(out[:, b0:b1], axis=1)
+        merged[:, start:start + ncols] = bits
+        out[:, b0:b1] = np.packbits(merged, axis=1)
+
+
+def open_mask(path):
+    """
+    Open a packed mask for reading.
+
+    :param path: <str> Path to mask.
+    :return: <PackedMask>
+    """
+    return PackedMask(path)
+
+
+def create_mask(path, like, count=1):
+    """
+    Create a packed mask georeferenced like an input raster.
+
+    :param path: <str> Path to output mask.
+    :param like: <RasterReader> Raster providing size and georeferencing.
+    :param count: <int> Number of bands.
+    :return: <PackedMaskWriter>
+    """
+    return PackedMaskWriter(path, like, count)
+
+
+def _combine(op, paths, out_path, bands=None):
+    """
+    Combine packed masks byte by byte, block of rows by block of rows.
+
+    :param op: <func> Function of a list of packed arrays.
+    :param paths: <list> Paths to input masks, all of the same size.
+    :param out_path: <str> Path to output mask.
+    :param bands: <list> Band number of each input (default: 1).
+    :return: <str> out_path
+    """
+    masks = [open_mask(p) for p in paths]
+    bands = bands or [1] * len(masks)
+    try:
+        first = masks[0]
+        for m in masks[1:]:
+            if m.shape != first.shape:
+                raise ValueError("Masks differ in size: {0} and {1}"
+                                 .format(first.path, m.path))
+
+        with create_mask(out_path, first) as out:
+            for row_off in range(0, first.rows, OP_BLOCK_ROWS):
+                nrows = min(OP_BLOCK_ROWS, first.rows - row_off)
+                out.bits[0, row_off:row_off + nrows] = op(
+                    [m.read_packed(row_off, nrows, b)
+                     for m, b in zip(masks, bands)])
+
+            # keep the padding bits at the end of each row clear
+            pad = first.row_bytes * 8 - first.cols
+            if pad:
+                out.bits[0, :, -1] &= np.uint8((0xFF << pad) & 0xFF)
+    finally:
+        for m in masks:
+            m.close()
+
+    return out_path
+
+
+def mask_and(paths, out_path, bands=None):
+    """
+    Pixels set in all of the input masks, computed without unpacking.
+
+    :param paths: <list> Paths to input masks.
+    :param out_path: <str> Path to output mask.
+    :param bands: <list> Band number of each input (default: 1).
+    :return: <str> out_path
+    """
+    return _combine(lambda a: np.bitwise_and.reduce(a), paths, out_path,
+                    bands)
+
+
+def mask_or(paths, out_path, bands=None):
+    """
+    Pixels set in any of the input masks, computed without unpacking.
+
+    :param paths: <list> Paths to input masks.
+    :param out_path: <str> Path to output mask.
+    :param bands: <list> Band number of each input (default: 1).
+    :return: <str> out_path
+    """
+    return _combine(lambda a: np.bitwise_or.reduce(a), paths, out_path,
+                    bands)
+
+
+def mask_not(path, out_path, band=1):
+    """
+    Pixels not set in the input mask, computed without unpacking.
+
+    :param path: <str> Path to input mask.
+    :param out_path: <str> Path to output mask.
+    :param band: <int> Band number of input.
+    :return: <str> out_path
+    """
+    return _combine(lambda a: np.invert(a[0]), [path], out_path, [band])
+
+
+def packed_name(path):
+    """
+    Return the packed mask name for an output raster name.
+
+    :param path: <str> Output raster name (e.g. basename_cloud.tif).
+    :return: <str>
+    """
+    return os.path.splitext(path)[0] + PACKED_EXT
@@ -0,0 +1,324 @@
+"""
+This software has been approved for release by the U.S. Geological Survey
+(USGS). Although the software has been subjected to rigorous review, the USGS
+reserves the right to update the software as needed pursuant to further
+analysis and review. No warranty, expressed or implied, is made by the USGS or
+the U.S. Government as to the functionality of the software and related
+material nor shall the fact of release constitute any such warranty.
+Furthermore, the software is released on condition that neither the USGS nor
+the U.S. Government shall be held liable for any damages resulting from its
+authorized or unauthorized use.
+
+Created:        17 Oct 2026
+Version:        2.1
+
+Changelog
+1.0     17 Oct 2026     Original development. Python interface to the QA
+                        tools, for use outside of Arc Toolbox.
+1.1     17 Oct 2026     Per-flag counts and fractions in stats.
+1.2     17 Oct 2026     Optional thread count in stats.
+1.3     17 Oct 2026     Stage timings in stats (instrument).
+1.4     17 Oct 2026     Time series observation counts (accumulate).
+1.5     17 Oct 2026     Extraction of flag expressions (mask).
+1.6     17 Oct 2026     Multi-bit fields as level rasters (levels).
+1.7     17 Oct 2026     Flag fraction overviews and pyramids (overview).
+1.8     17 Oct 2026     Saturated band counts of radsat_qa (saturation).
+1.9     17 Oct 2026     Optional pipelined reading in stats.
+2.0     17 Oct 2026     Optional worker processes in stats.
+2.1     17 Oct 2026     Output paths of extract returned by every backend.
+"""
+import os
+import scene_info
+
+
+def resolve_scene(raster, sensor=None, band=None):
+    """
+    Determine sensor and band of a raster, from its file name if not given.
+
+    :param raster: <str> Path to raster.
+    :param sensor: <str> Sensor, as display name ("Landsat 8") or qa_values
+                         name ("L8") (default: from file name).
+    :param band: <str> Band type (default: from file name).
+    :return: <tuple> (sensor qa_values name, band)
+    """
+    fname = os.path.basename(raster)
+    sensor = sensor or scene_info.detect_sensor(fname)
+    band = band or scene_info.detect_band(fname)
+
+    sens = scene_info.sensor_codes.get(sensor, sensor)
+    if sens not in scene_info.sensor_codes.values():
+        raise ValueError("Unable to determine sensor of {0}; set it to one "
+                         "of: {1}".format(raster, " | ".join(
+                             sorted(scene_info.sensor_codes))))
+
+    if band is None:
+        raise ValueError("Unable to determine band of {0}; set it to one "
+                         "of: {1}".format(raster, " | ".join(
+                             b for b, _ in scene_info.band_ids)))
+
+    return sens, band
+
+
+def decode(raster, sensor=None, band=None, rm_low=False, backend=None,
+           **options):
+    """
+    Build attribute table describing each value of a QA raster.
+
+    :param raster: <str> Path to raster.
+    :param sensor: <str> Sensor type (default: from file name).
+    :param band: <str> Band type (default: from file name).
+    :param rm_low: <bool> Remove (True) or keep (False) 'low' labels.
+    :param backend: <str> "arcpy" or "numpy" (default: "arcpy" if ArcPy is
+                          installed, otherwise "numpy").
+    :param options: Backend specific options (e.g. block_rows).
+    :return: <list> (value, count, label) tuples ("numpy" backend only).
+    """
+    import qa_decode
+
+    sens, band = resolve_scene(raster, sensor, band)
+
+    return qa_decode.build_attr_table(raster, sens, band, rm_low,
+                                      backend=backend, **options)
+
+
+def extract(raster, flags, basename=None, sensor=None, band=None,
+            combine_layers=False, backend=None, **options):
+    """
+    Extract flag(s) of a QA raster to binary raster(s).
+
+    :param raster: <str> Path to raster.
+    :param flags: <list> Flag names, as in lookup_dict.bit_flags.
+    :param basename: <str> Base filename for output data (default: input
+                           path without extension).
+    :param sensor: <str> Sensor type (default: from file name).
+    :param band: <str> Band type (default: from file name).
+    :param combine_layers: <bool> Combine all extracted bits to single band.
+    :param backend: <str> "arcpy" or "numpy" (default: "arcpy" if ArcPy is
+                          installed, otherwise "numpy").
+    :param options: Backend specific options (e.g. block_rows, stack).
+    :return: <list> Paths of output rasters.
+    """
+    import extract_bands
+
+    sens, band = resolve_scene(raster, sensor, band)
+    basename = basename or os.path.splitext(raster)[0]
+
+    return extract_bands.extract_bits_from_band(raster, sens, band, flags,
+                                                basename, combine_layers,
+                                                backend=backend, **options)
+
+
+def mask(raster, expression, raster_out=None, sensor=None, band=None,
+         backend=None, **options):
+    """
+    Extract pixels matching a boolean expression of flags (e.g. "Cloud AND
+    NOT Cloud Shadow") to a binary raster, in one pass over the input.
+
+    :param raster: <str> Path to raster.
+    :param expression: <str> Flag expression (see flag_expr).
+    :param raster_out: <str> Path to output raster (default: input path with
+                             "_mask" added).
+    :param sensor: <str> Sensor type (default: from file name).
+    :param band: <str> Band type (default: from file name).
+    :param backend: <str> "arcpy" or "numpy" (default: "arcpy" if ArcPy is
+                          installed, otherwise "numpy").
+    :param options: Backend specific options (e.g. block_rows, packed).
+    :return: <str> Path of output raster.
+    """
+    import extract_bands
+
+    sens, band = resolve_scene(raster, sensor, band)
+    if raster_out is None:
+        root, ext = os.path.splitext(raster)
+        raster_out = root + "_mask" + ext
+
+    return extract_bands.extract_expression(raster, sens, band, expression,
+                                            raster_out, backend=backend,
+                                            **options)
+
+
+def levels(raster, fields=None, basename=None, sensor=None, band=None,
+           backend=None, **options):
+    """
+    Extract multi-bit fields (e.g. "Cloud Confidence") of a QA raster as
+    rasters of levels 0-3, all in one pass over the input.
+
+    :param raster: <str> Path to raster.
+    :param fields: <list> Field names (default: all fields of the band).
+    :param basename: <str> Base filename for output data (default: input
+                           path without extension).
+    :param sensor: <str> Sensor type (default: from file name).
+    :param band: <str> Band type (default: from file name).
+    :param backend: <str> "arcpy" or "numpy" (default: "arcpy" if ArcPy is
+                          installed, otherwise "numpy").
+    :param options: Backend specific options (e.g. block_rows, stack).
+    :return: <dict> Paths of output rasters, and legend of each field.
+    """
+    import extract_bands
+
+    sens, band = resolve_scene(raster, sensor, band)
+    basename = basename or os.path.splitext(raster)[0]
+
+    outputs = extract_bands.extract_fields(raster, sens, band, fields,
+                                           basename, backend=backend,
+                                           **options)
+
+    return {"outputs": outputs,
+            "fields": [{"field": f.name,
+                        "legend": [{"level": v, "label": d}
+                                   for v, d in f.legend]}
+                       for f in extract_bands.get_fields(sens, band,
+                                                         fields)]}
+
+
+def saturation(raster, basename=None, sensor=None, band=None,
+               any_mask=False, backend=None, **options):
+    """
+    Count the saturated bands of each pixel of a radsat_qa raster, and
+    optionally mask pixels with any band saturated, in one pass.
+
+    :param raster: <str> Path to radsat_qa raster.
+    :param basename: <str> Base filename for output data (default: input
+                           path without extension).
+    :param sensor: <str> Sensor type (default: from file name).
+    :param band: <str> Band type (default: from file name).
+    :param any_mask: <bool> Also write the any-saturation mask.
+    :param backend: <str> "arcpy" or "numpy" (default: "arcpy" if ArcPy is
+                          installed, otherwise "numpy").
+    :param options: Backend specific options (e.g. block_rows, packed).
+    :return: <list> Paths of output rasters; count, then mask.
+    """
+    import extract_bands
+
+    sens, band = resolve_scene(raster, sensor, band)
+    basename = basename or os.path.splitext(raster)[0]
+
+    return extract_bands.extract_saturation(raster, sens, band, basename,
+                                            any_mask, backend=backend,
+                                            **options)
+
+
+def overview(raster, flags=None, basename=None, sensor=None, band=None,
+             cell=None, levels=1, counts=False, **options):
+    """
+    Write coarse rasters of the fraction (or count) of pixels of each flag
+    per cell (e.g. 32 x 32 pixels), and optionally a pyramid of them, in one
+    pass over the input.
+
+    :param raster: <str> Path to raster.
+    :param flags: <list> Flag names (default: all flags but Fill).
+    :param basename: <str> Base filename for output data (default: input
+                           path without extension).
+    :param sensor: <str> Sensor type (default: from file name).
+    :param band: <str> Band type (default: from file name).
+    :param cell: <int> Cell size of the first level, in pixels.
+    :param levels: <int> Number of pyramid levels, each of cells twice the
+                         size of the one before.
+    :param counts: <bool> Write pixel counts instead of fractions.
+    :param options: Options of overview.flag_overview (e.g. block_rows).
+    :return: <dict> Band names, and cell size and path of each level.
+    """
+    import overview as ov
+
+    sens, band = resolve_scene(raster, sensor, band)
+    basename = basename or os.path.splitext(raster)[0]
+
+    out = ov.flag_overview(raster, sens, band, flags, basename, cell,
+                           levels, counts, **options)
+
+    return {"bands": out["bands"],
+            "levels": [{"cell": size, "path": path}
+                       for size, path in out["levels"]]}
+
+
+def flag_names(raster=None, sensor=None, band=None):
+    """
+    List flags that can be extracted from a raster (or band and sensor).
+
+    :param raster: <str> Path to raster (optional if sensor and band given).
+    :param sensor: <str> Sensor type (default: from file name).
+    :param band: <str> Band type (default: from file name).
+    :return: <list> Flag names, sorted by bit position.
+    """
+    import flag_registry
+
+    sens, band = resolve_scene(raster or "", sensor, band)
+
+    return list(flag_registry.get_flags(band, sens).names)
+
+
+def stats(raster, sensor=None, band=None, rm_low=False, block_rows=None,
+          block_cols=None, threads=None, pipeline=False, processes=None,
+          scratch=None):
+    """
+    Count pixels of each value and each flag of a QA raster, without writing
+    anything.
+
+    The raster is read once; flag counts and fractions (of all pixels, and
+    of pixels that are not Fill) are derived from its value counts.
+
+    :param raster: <str> Path to raster.
+    :param sensor: <str> Sensor type (default: from file name).
+    :param band: <str> Band type (default: from file name).
+    :param rm_low: <bool> Remove (True) or keep (False) 'low' labels.
+    :param block_rows: <int> Rows per block (default: all rows).
+    :param block_cols: <int> Columns per block (default: all columns).
+    :param threads: <int> Count blocks on this many threads (default: 1).
+    :param pipeline: <bool> Read and count blocks concurrently.
+    :param processes: <int> Count tiles on this many worker processes
+                            (default: 1).
+    :param scratch: <str> Directory for scratch files of processes.
+    :return: <dict> Scene description, per-value counts and labels, and
+                    per-flag statistics (see flag_stats.flag_counts).
+    """
+    import qa_decode
+    import lut_cache
+    import flag_stats
+    import instrument
+
+    sens, band = resolve_scene(raster, sensor, band)
+
+    with instrument.run("stats"):
+        with instrument.stage("count_values"):
+            values, counts = qa_decode.count_values(
+                raster, block_rows, block_cols, threads=threads,
+                pipeline=pipeline, processes=processes,
+                scratch=scratch).counts()
+        with instrument.stage("lookup_labels"):
+            labels = lut_cache.lookup_labels(values, band, sens, rm_low)
+
+        out = {"path": raster, "sensor": sens, "band": band,
+               "values": [{"value": v, "count": c, "label": d}
+                          for v, c, d in zip(values.tolist(),
+                                             counts.tolist(),
+                                             labels.tolist())]}
+        with instrument.stage("flag_counts"):
+            out.update(flag_stats.flag_counts(values, counts, band, sens))
+
+    return out
+
+
+def accumulate(rasters, basename, counters=None, sensor=None, band=None,
+               block_rows=None, block_cols=None):
+    """
+    Count clear, cloud, shadow, snow, ... and valid observations of each
+    pixel over a time series of QA rasters of one grid.
+
+    :param rasters: <list> Paths to rasters, all of the same band and size.
+    :param basename: <str> Base filename for output data.
+    :param counters: <list> (counter name, flag names) pairs (default: as
+                            time_series.default_counters).
+    :param sensor: <str> Sensor type (default: from each file name).
+    :param band: <str> Band type (default: from file names).
+    :param block_rows: <int> Rows per block.
+    :param block_cols: <int> Columns per block.
+    :return: <dict> Number of rasters and output raster of each counter.
+    """
+    import time_series
+
+    outputs = time_series.accumulate(rasters, basename, counters, sensor,
+                                     band, block_rows, block_cols)
+
+    return {"rasters": len(rasters),
+            "outputs": [{"counter": name, "path": path}
+                        for name, path in outputs]}
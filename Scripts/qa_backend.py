@@ -0,0 +1,53 @@
+"""
+This software has been approved for release by the U.S. Geological Survey
+(USGS). Although the software has been subjected to rigorous review, the USGS
+reserves the right to update the software as needed pursuant to further
+analysis and review. No warranty, expressed or implied, is made by the USGS or
+the U.S. Government as to the functionality of the software and related
+material nor shall the fact of release constitute any such warranty.
+Furthermore, the software is released on condition that neither the USGS nor
+the U.S. Government shall be held liable for any damages resulting from its
+authorized or unauthorized use.
+
+Created:        17 Oct 2026
+Version:        1.0
+
+Changelog
+1.0     17 Oct 2026     Original development. Backend selection without
+                        importing ArcPy.
+"""
+_available = {}
+
+
+def arcpy_available():
+    """
+    Check whether ArcPy can be imported, without importing it.
+
+    Importing ArcPy starts up ArcGIS and checks out a license, which is only
+    worth paying for when the "arcpy" backend is actually used.
+
+    :return: <bool>
+    """
+    if "arcpy" not in _available:
+        try:
+            from importlib.util import find_spec
+        except ImportError:  # Python 2
+            import imp
+            try:
+                imp.find_module("arcpy")
+                _available["arcpy"] = True
+            except ImportError:
+                _available["arcpy"] = False
+        else:
+            _available["arcpy"] = find_spec("arcpy") is not None
+
+    return _available["arcpy"]
+
+
+def default_backend():
+    """
+    Return "arcpy" if ArcPy is installed, otherwise "numpy".
+
+    :return: <str>
+    """
+    return "arcpy" if arcpy_available() else "numpy"
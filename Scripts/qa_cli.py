@@ -0,0 +1,510 @@
+"""
+This software has been approved for release by the U.S. Geological Survey
+(USGS). Although the software has been subjected to rigorous review, the USGS
+reserves the right to update the software as needed pursuant to further
+analysis and review. No warranty, expressed or implied, is made by the USGS or
+the U.S. Government as to the functionality of the software and related
+material nor shall the fact of release constitute any such warranty.
+Furthermore, the software is released on condition that neither the USGS nor
+the U.S. Government shall be held liable for any damages resulting from its
+authorized or unauthorized use.
+
+Created:        17 Oct 2026
+Version:        2.2
+
+Changelog
+1.0     17 Oct 2026     Original development. Command line interface to
+                        decode, extract and stats, without Arc Toolbox.
+1.1     17 Oct 2026     Per-flag statistics, as JSON or CSV.
+1.2     17 Oct 2026     Packed output and thread count options.
+1.3     17 Oct 2026     Profile option.
+1.4     17 Oct 2026     Time series observation counts.
+1.5     17 Oct 2026     Flag expression masks.
+1.6     17 Oct 2026     Multi-bit fields as level rasters.
+1.7     17 Oct 2026     Sparse (run-length encoded) mask output.
+1.8     17 Oct 2026     Flag fraction overviews.
+1.9     17 Oct 2026     Output manifest option, skipping up to date
+                        products.
+2.0     17 Oct 2026     Saturated band counts.
+2.1     17 Oct 2026     Pipeline option.
+2.2     17 Oct 2026     Worker processes per scene (decode, extract, stats).
+
+Usage:
+    python qa_cli.py decode [options] INPUT [INPUT ...]
+    python qa_cli.py extract -f FLAG [-f FLAG ...] [options] INPUT [...]
+    python qa_cli.py stats [--format csv] [options] INPUT [INPUT ...]
+    python qa_cli.py mask -e EXPRESSION [options] INPUT [INPUT ...]
+    python qa_cli.py levels [-F FIELD ...] [options] INPUT [INPUT ...]
+    python qa_cli.py saturation [--any] [options] INPUT [INPUT ...]
+    python qa_cli.py overview [-f FLAG ...] [options] INPUT [INPUT ...]
+    python qa_cli.py timeseries --basename BASE [options] INPUT [...]
+    python qa_cli.py flags INPUT
+
+INPUT may be a raster, a directory, a glob pattern or a manifest (see
+batch.find_scenes). All inputs are processed in one process, unless
+--workers is set.
+"""
+import sys
+import json
+import argparse
+import batch
+
+
+def _add_common(p):
+    # arguments shared by every command
+    p.add_argument("inputs", nargs="+", metavar="INPUT",
+                   help="Raster(s), directories, glob patterns or "
+                        "manifests.")
+    p.add_argument("-s", "--sensor",
+                   help="Sensor ('Landsat 8', 'Landsat 4-5, 7', 'L8' or "
+                        "'L47'). Default: from file name.")
+    p.add_argument("-b", "--band",
+                   help="Band type (e.g. pixel_qa). Default: from file "
+                        "name.")
+    p.add_argument("--block-rows", type=int,
+                   help="Rows per block (numpy backend).")
+    p.add_argument("--block-cols", type=int,
+                   help="Columns per block (numpy backend).")
+    p.add_argument("-t", "--threads", type=int,
+                   help="Threads per scene (numpy backend).")
+    p.add_argument("--pipeline", action="store_true",
+                   help="Read, process and write blocks concurrently "
+                        "(numpy backend).")
+    p.add_argument("-o", "--output",
+                   help="Write report to file instead of stdout.")
+    p.add_argument("--profile", action="store_true",
+                   help="Report stage timings and counters (see "
+                        "instrument).")
+
+
+def _add_processes(p):
+    # arguments of commands splitting one scene over processes
+    p.add_argument("-P", "--processes", type=int,
+                   help="Worker processes per scene, sharing it through "
+                        "memory-mapped files (numpy backend; for very "
+                        "large mosaics, with --workers 1).")
+    p.add_argument("--scratch", metavar="DIR",
+                   help="Directory for scratch files of --processes.")
+
+
+def _add_batch(p):
+    # arguments of commands run through batch
+    p.add_argument("--rm-low", action="store_true",
+                   help="Remove 'low' labels.")
+    p.add_argument("--backend", choices=("arcpy", "numpy"),
+                   help="Default: arcpy if installed, otherwise numpy.")
+    p.add_argument("-w", "--workers", type=int, default=1,
+                   help="Number of worker processes (default: 1).")
+    _add_processes(p)
+    p.add_argument("-m", "--manifest", metavar="DIR",
+                   help="Output manifest directory; products whose input, "
+                        "flag definitions and options are unchanged are "
+                        "skipped (see output_manifest).")
+
+
+def build_parser():
+    """
+    Build command line parser.
+
+    :return: <argparse.ArgumentParser>
+    """
+    parser = argparse.ArgumentParser(
+        description="Decode and extract Landsat QA bands.")
+    sub = parser.add_subparsers(dest="command")
+
+    p = sub.add_parser("decode", help="Build attribute table(s).")
+    _add_common(p)
+    _add_batch(p)
+
+    p = sub.add_parser("extract", help="Extract flag(s) to binary "
+                                       "raster(s).")
+    _add_common(p)
+    _add_batch(p)
+    p.add_argument("-f", "--flag", dest="flags", action="append",
+                   required=True,
+                   help="Flag name, as in lookup_dict (repeatable).")
+    p.add_argument("-c", "--combine", action="store_true",
+                   help="Combine all flags to a single band.")
+    p.add_argument("--stack", action="store_true",
+                   help="Write all flags as bands of a single raster "
+                        "(numpy backend).")
+    p.add_argument("--packed", action="store_true",
+                   help="Write 1 bit per pixel packed masks (.qamask, "
+                        "numpy backend).")
+    p.add_argument("--sparse", action="store_true",
+                   help="Write run-length encoded masks (.qarle, numpy "
+                        "backend), for flags set on few pixels.")
+    p.add_argument("-d", "--out-dir",
+                   help="Output directory (default: next to input).")
+
+    p = sub.add_parser("stats", help="Count pixels of each value and "
+                                     "flag.")
+    _add_common(p)
+    p.add_argument("--rm-low", action="store_true",
+                   help="Remove 'low' labels.")
+    p.add_argument("--format", choices=("json", "csv"), default="json",
+                   help="Report format (csv: one row per scene and flag).")
+    _add_processes(p)
+
+    p = sub.add_parser("mask", help="Extract pixels matching a flag "
+                                    "expression to a binary raster.")
+    _add_common(p)
+    p.add_argument("-e", "--expression", required=True,
+                   help="Flag expression, e.g. 'Cloud AND NOT Cloud "
+                        "Shadow' (see flag_expr).")
+    p.add_argument("-n", "--name", default="mask",
+                   help="Output name suffix (default: mask).")
+    p.add_argument("--backend", choices=("arcpy", "numpy"),
+                   help="Default: arcpy if installed, otherwise numpy.")
+    p.add_argument("--packed", action="store_true",
+                   help="Write a 1 bit per pixel packed mask (.qamask, "
+                        "numpy backend).")
+    p.add_argument("--sparse", action="store_true",
+                   help="Write a run-length encoded mask (.qarle, numpy "
+                        "backend).")
+    p.add_argument("-d", "--out-dir",
+                   help="Output directory (default: next to input).")
+
+    p = sub.add_parser("levels", help="Extract multi-bit fields (e.g. "
+                                      "cloud confidence) as 0-3 levels.")
+    _add_common(p)
+    p.add_argument("-F", "--field", dest="fields", action="append",
+                   help="Field name, e.g. 'Cloud Confidence' (repeatable; "
+                        "default: all fields of the band).")
+    p.add_argument("--backend", choices=("arcpy", "numpy"),
+                   help="Default: arcpy if installed, otherwise numpy.")
+    p.add_argument("--stack", action="store_true",
+                   help="Write all fields as bands of a single raster "
+                        "(numpy backend).")
+    p.add_argument("-d", "--out-dir",
+                   help="Output directory (default: next to input).")
+
+    p = sub.add_parser("saturation", help="Count saturated bands of each "
+                                          "radsat_qa pixel.")
+    _add_common(p)
+    p.add_argument("--any", dest="any_mask", action="store_true",
+                   help="Also write a mask of pixels with any band "
+                        "saturated.")
+    p.add_argument("--backend", choices=("arcpy", "numpy"),
+                   help="Default: arcpy if installed, otherwise numpy.")
+    p.add_argument("--packed", action="store_true",
+                   help="Write the mask 1 bit per pixel (.qamask, numpy "
+                        "backend).")
+    p.add_argument("-d", "--out-dir",
+                   help="Output directory (default: next to input).")
+
+    p = sub.add_parser("overview", help="Write coarse rasters of flag "
+                                        "fractions per cell of pixels.")
+    _add_common(p)
+    p.add_argument("-f", "--flag", dest="flags", action="append",
+                   help="Flag name, as in lookup_dict (repeatable; "
+                        "default: all flags but Fill).")
+    p.add_argument("--cell", type=int,
+                   help="Cell size in pixels (default: 32).")
+    p.add_argument("--levels", type=int, default=1,
+                   help="Pyramid levels, each of cells twice the size of "
+                        "the one before (default: 1).")
+    p.add_argument("--counts", action="store_true",
+                   help="Write pixel counts instead of fractions.")
+    p.add_argument("-d", "--out-dir",
+                   help="Output directory (default: next to input).")
+
+    p = sub.add_parser("timeseries", help="Count observations of each "
+                                          "pixel over many dates.")
+    _add_common(p)
+    p.add_argument("--basename", required=True,
+                   help="Base filename for count rasters.")
+    p.add_argument("--counter", dest="counters", action="append",
+                   metavar="NAME=FLAG[,FLAG]",
+                   help="Count pixels having any of the flags set "
+                        "(repeatable; default: as time_series).")
+
+    p = sub.add_parser("flags", help="List flags of a raster's band.")
+    p.add_argument("input", metavar="INPUT", help="Raster.")
+    p.add_argument("-s", "--sensor", help="Default: from file name.")
+    p.add_argument("-b", "--band", help="Default: from file name.")
+
+    return parser
+
+
+def _scenes(args):
+    scenes = batch.find_scenes(args.inputs)
+    for s in scenes:
+        s.sensor = args.sensor or s.sensor
+        s.band = args.band or s.band
+
+    return scenes
+
+
+def _options(args):
+    options = {}
+    if args.block_rows:
+        options["block_rows"] = args.block_rows
+    if args.block_cols:
+        options["block_cols"] = args.block_cols
+    if args.threads:
+        options["threads"] = args.threads
+    if args.pipeline:
+        options["pipeline"] = True
+    if getattr(args, "processes", None):
+        options["processes"] = args.processes
+    if getattr(args, "scratch", None):
+        options["scratch"] = args.scratch
+
+    return options
+
+
+def run_stats(scenes, args):
+    """
+    Count values of each scene, isolating errors per scene.
+
+    :param scenes: <list> Scene objects.
+    :param args: <argparse.Namespace> Parsed command line.
+    :return: <dict> Report.
+    """
+    import qa_api
+
+    results = []
+    for s in scenes:
+        try:
+            results.append(qa_api.stats(s.path, s.sensor, s.band, args.rm_low,
+                                        **_options(args)))
+        except (Exception, SystemExit) as e:
+            results.append({"path": s.path, "status": "failed",
+                            "error": "{0}: {1}".format(type(e).__name__, e)})
+
+    failed = [r for r in results if r.get("status") == "failed"]
+
+    return {"scenes": len(results),
+            "succeeded": len(results) - len(failed),
+            "failed": len(failed),
+            "results": results}
+
+
+def _run_each(scenes, args, func):
+    # run func(scene, root, ext) on each scene, isolating errors per scene
+    import os
+
+    results = []
+    for s in scenes:
+        root, ext = os.path.splitext(s.path)
+        if args.out_dir:
+            root = os.path.join(args.out_dir, os.path.basename(root))
+        result = {"path": s.path, "status": "ok", "error": None}
+        try:
+            result.update(func(s, root, ext))
+        except (Exception, SystemExit) as e:
+            result.update({"status": "failed", "error": "{0}: {1}".format(
+                type(e).__name__, e)})
+        results.append(result)
+
+    failed = [r for r in results if r["status"] == "failed"]
+
+    return {"scenes": len(results),
+            "succeeded": len(results) - len(failed),
+            "failed": len(failed),
+            "results": results}
+
+
+def run_mask(scenes, args):
+    """
+    Extract a flag expression from each scene, isolating errors per scene.
+
+    :param scenes: <list> Scene objects.
+    :param args: <argparse.Namespace> Parsed command line.
+    :return: <dict> Report.
+    """
+    import qa_api
+
+    options = _options(args)
+    if args.packed:
+        options["packed"] = True
+    if args.sparse:
+        options["sparse"] = True
+
+    def mask(s, root, ext):
+        return {"output": qa_api.mask(s.path, args.expression,
+                                      root + "_" + args.name + ext,
+                                      s.sensor, s.band,
+                                      backend=args.backend, **options)}
+
+    return _run_each(scenes, args, mask)
+
+
+def run_levels(scenes, args):
+    """
+    Extract multi-bit fields from each scene, isolating errors per scene.
+
+    :param scenes: <list> Scene objects.
+    :param args: <argparse.Namespace> Parsed command line.
+    :return: <dict> Report.
+    """
+    import qa_api
+
+    options = _options(args)
+    if args.stack:
+        options["stack"] = True
+
+    def levels(s, root, ext):
+        return qa_api.levels(s.path, args.fields, root, s.sensor, s.band,
+                             backend=args.backend, **options)
+
+    return _run_each(scenes, args, levels)
+
+
+def run_saturation(scenes, args):
+    """
+    Count saturated bands of each scene, isolating errors per scene.
+
+    :param scenes: <list> Scene objects.
+    :param args: <argparse.Namespace> Parsed command line.
+    :return: <dict> Report.
+    """
+    import qa_api
+
+    options = _options(args)
+    if args.packed:
+        options["packed"] = True
+
+    def saturation(s, root, ext):
+        return {"outputs": qa_api.saturation(s.path, root, s.sensor,
+                                             s.band, args.any_mask,
+                                             backend=args.backend,
+                                             **options)}
+
+    return _run_each(scenes, args, saturation)
+
+
+def run_overview(scenes, args):
+    """
+    Write flag fraction overviews of each scene, isolating errors per scene.
+
+    :param scenes: <list> Scene objects.
+    :param args: <argparse.Namespace> Parsed command line.
+    :return: <dict> Report.
+    """
+    import qa_api
+
+    options = _options(args)
+
+    def overview(s, root, ext):
+        return qa_api.overview(s.path, args.flags, root, s.sensor, s.band,
+                               args.cell, args.levels, args.counts,
+                               **options)
+
+    return _run_each(scenes, args, overview)
+
+
+def run_timeseries(scenes, args):
+    """
+    Count observations of each pixel over all scenes.
+
+    :param scenes: <list> Scene objects, of one grid and band.
+    :param args: <argparse.Namespace> Parsed command line.
+    :return: <dict> Report.
+    """
+    import qa_api
+    import time_series
+
+    counters = None
+    if args.counters:
+        counters = [time_series.parse_counter(c) for c in args.counters]
+
+    options = _options(args)
+    options.pop("threads", None)
+    options.pop("pipeline", None)
+
+    try:
+        result = qa_api.accumulate([s.path for s in scenes], args.basename,
+                                   counters, args.sensor, args.band,
+                                   **options)
+        result.update({"status": "ok", "failed": 0})
+    except (Exception, SystemExit) as e:
+        result = {"rasters": len(scenes), "status": "failed", "failed": 1,
+                  "error": "{0}: {1}".format(type(e).__name__, e)}
+
+    return result
+
+
+def main(argv=None):
+    """
+    Run command line interface.
+
+    :param argv: <list> Arguments (default: sys.argv[1:]).
+    :return: <int> Exit status; 1 if any input failed.
+    """
+    args = build_parser().parse_args(argv)
+
+    if args.command is None:
+        build_parser().print_help()
+        return 2
+
+    if args.command == "flags":
+        import qa_api
+        for name in qa_api.flag_names(args.input, args.sensor, args.band):
+            print(name)
+        return 0
+
+    if args.profile:
+        import os
+        import instrument
+        # also seen by worker processes
+        os.environ["LANDSAT_QA_PROFILE"] = "1"
+        instrument.enable()
+
+    scenes = _scenes(args)
+
+    if args.command == "stats":
+        report = run_stats(scenes, args)
+
+    elif args.command == "mask":
+        report = run_mask(scenes, args)
+
+    elif args.command == "levels":
+        report = run_levels(scenes, args)
+
+    elif args.command == "saturation":
+        report = run_saturation(scenes, args)
+
+    elif args.command == "overview":
+        report = run_overview(scenes, args)
+
+    elif args.command == "timeseries":
+        report = run_timeseries(scenes, args)
+
+    else:
+        options = _options(args)
+        if args.command == "extract" and args.stack:
+            options["stack"] = True
+        if args.command == "extract" and args.packed:
+            options["packed"] = True
+        if args.command == "extract" and args.sparse:
+            options["sparse"] = True
+
+        report = batch.run_batch(
+            scenes, workers=args.workers,
+            decode=args.command == "decode",
+            flags=args.flags if args.command == "extract" else None,
+            combine_layers=getattr(args, "combine", False),
+            out_dir=getattr(args, "out_dir", None),
+            rm_low=args.rm_low, backend=args.backend, options=options,
+            manifest=args.manifest)
+
+    if args.command == "stats" and args.format == "csv":
+        import flag_stats
+        if args.output:
+            with open(args.output, "w") as f:
+                flag_stats.write_csv(report["results"], f)
+        else:
+            flag_stats.write_csv(report["results"], sys.stdout)
+    elif args.output:
+        batch.write_report(report, args.output)
+    else:
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+        sys.stdout.write("\n")
+
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -13,21 +13,52 @@ Author:         Steve Foga
 Affiliation:    SGT Inc., contractor to USGS EROS Center
 Contact:        steven.foga.ctr@usgs.gov
 Created:        15 May 2017
-Version:        1.2
+Version:        2.2
 
 Changelog
 1.0     15 May 2017     Original development with Python 2.7.10 and
                         ArcGIS 10.4.1.
 1.1     09 Aug 2017     Update to handle any L8 pixel_qa terrain occlusion.
 1.2     21 Aug 2017     Now decodes bits directly, instead of lookup table.
+1.3     17 Oct 2026     Labels decoded in one pass by decode_engine.
+1.4     17 Oct 2026     Labels read from cached lookup tables (lut_cache).
+1.5     17 Oct 2026     Added NumPy backend, streaming the raster by block.
+1.6     17 Oct 2026     ArcPy only imported by the arcpy backend. Value
+                        counting split out to count_values.
+1.7     17 Oct 2026     Value counts cached by file identity (hist_cache).
+1.8     17 Oct 2026     Blocks optionally counted on a pool of threads.
+1.9     17 Oct 2026     Stage timings and counters (instrument).
+2.0     17 Oct 2026     Optional pipelined reading and counting.
+2.1     17 Oct 2026     Values optionally counted by worker processes over
+                        memory-mapped tiles (shared_tiles).
+2.2     17 Oct 2026     Files written by each backend listed
+                        (attr_table_files).
 """
 import sys
 import os
-import arcpy
-import lookup_dict
+import lut_cache
+import qa_backend
+import instrument
 
 
-def build_attr_table(raster_in, sensor, band, rm_low=False):
+def get_sensor(sensor):
+    """
+    Re-map input sensor name to qa_values sensor name.
+
+    :param sensor: <str> Sensor type, as display name ("Landsat 8") or
+                         qa_values name ("L8").
+    :return: <str> qa_values sensor name, or None if not recognized.
+    """
+    if sensor in ('Landsat 4-5, 7', 'L47'):
+        return 'L47'
+    elif sensor in ('Landsat 8', 'L8'):
+        return 'L8'
+    else:
+        return None
+
+
+def build_attr_table(raster_in, sensor, band, rm_low=False, backend=None,
+                     **options):
     """
     Build attribute table for thematic raster using pre-defined dictionary.
 
@@ -36,185 +67,298 @@ def build_attr_table(raster_in, sensor, band, rm_low=False):
     :param band: <str> Band type.
     :param rm_low: <bool> Remove (True) or keep (False) 'low' values (excludes
                           sr_aerosol, radiometric sat. in BQA)
+    :param backend: <str> Name of backend in backends (default: "arcpy" if
+                          ArcPy is available, otherwise "numpy").
+    :param options: Backend specific options (e.g. block_rows, block_cols for
+                    the "numpy" backend).
     :return:
     """
-    # read lookup dictionary
-    bit_flags = lookup_dict.bit_flags
+    if backend is None:
+        backend = qa_backend.default_backend()
+
+    try:
+        func = backends[backend]
+    except KeyError:
+        sys.exit("{0} is not a valid backend. Potential options: {1}"
+                 .format(backend, " | ".join(sorted(backends))))
+
+    with instrument.run("build_attr_table"):
+        return func(raster_in, sensor, band, rm_low, **options)
+
+
+def build_attr_table_arcpy(raster_in, sensor, band, rm_low=False):
+    """
+    Build attribute table for thematic raster with ArcGIS.
+
+    :param raster_in: <str> Path to target raster.
+    :param sensor: <str> Sensor type.
+    :param band: <str> Band type.
+    :param rm_low: <bool> Remove (True) or keep (False) 'low' values (excludes
+                          sr_aerosol, radiometric sat. in BQA)
+    :return:
+    """
+    import arcpy
+    import hist_cache
 
     # check to ensure raster is not floating/double/complex
-    vt = int(str(arcpy.GetRasterProperties_management(raster_in, "VALUETYPE")))
+    with instrument.stage("GetRasterProperties"):
+        vt = int(str(arcpy.GetRasterProperties_management(raster_in,
+                                                          "VALUETYPE")))
     if vt >= 9:
         arcpy.AddError("ERROR: Data type of input raster must be integer.")
         sys.exit()
 
     # build attribute table
-    arcpy.BuildRasterAttributeTable_management(raster_in, "Overwrite")
+    with instrument.stage("BuildRasterAttributeTable"):
+        arcpy.BuildRasterAttributeTable_management(raster_in, "Overwrite")
 
     # add description field to table
-    arcpy.AddField_management(raster_in, "Descr", "TEXT", "", "", 120)
+    with instrument.stage("AddField"):
+        arcpy.AddField_management(raster_in, "Descr", "TEXT", "", "", 120)
     fields = ("Value", "Descr")
 
     # re-map input sensor name to qa_values sensor name
-    if sensor == 'Landsat 4-5, 7':
-        sens = 'L47'
-    elif sensor == 'Landsat 8':
-        sens = 'L8'
-    else:
+    sens = get_sensor(sensor)
+    if sens is None:
         arcpy.AddError("ERROR: Incorrect sensor provided. Input: {0}; "
                        "Potential options: Landsat 4-5, 7 | Landsat 8"
                        .format(sensor))
+        sys.exit()
+
+    # decode all values in the attribute table in a single pass
+    with instrument.stage("TableToNumPyArray"):
+        table = arcpy.da.TableToNumPyArray(raster_in, ("Value", "Count"))
+    values = table["Value"]
+    instrument.add("unique_values", len(values))
+    instrument.add("pixels", table["Count"].sum())
+
+    with instrument.stage("lookup_labels"):
+        labels = dict(zip(values.tolist(),
+                          lut_cache.lookup_labels(values, band, sens,
+                                                  rm_low).tolist()))
 
     # assign values to attribute table
-    with arcpy.da.UpdateCursor(raster_in, fields) as cursor:
-        for row in cursor:
-            # check all possible bits for match with target value (row[0])
-            bit_values = sorted(bit_flags[band][sens].values())
-            bit_bool = []
-            for bv in bit_values:
-                if len(bv) == 1:  # single bit
-                    bit_bool.append(row[0] & 1 << bv[0] > 0)
-
-                elif len(bv) > 1:  # 2+ bits
-                    bits = []
-                    for b in bv:
-                        bits.append(row[0] & 1 << b > 0)
-                    if all(item == True for item in bits):
-                        bit_bool.append(True)
-                    else:
-                        bit_bool.append(False)
-
-                else:
-                    sys.exit("No valid bits found for target band.")
-
-            # create description of each value based upon all possible bits
-            true_bits = [i for (i, bb) in zip(bit_values, bit_bool) if bb]
-
-            # if double bits exist, eliminate single bit descriptions,
-            #   otherwise, the descriptions will duplicate themselves.
-            bb_double = [len(i) > 1 for i in true_bits]
-            if any(bb_double):
-                # get only the double bits
-                dbit_nest = [i for (i, db) in zip(true_bits, bb_double) if db]
-
-                # collapse the bits into a single list
-                dbits = [item for sublist in dbit_nest for item in sublist]
-
-                # remove matching single bits out of true_bits list
-                tbo = []
-                for t in true_bits:
-                    tb_out = []
-                    for d in dbits:
-                        if t[0] != d or len(t) > 1:
-                            tb_out.append(True)
-                        else:
-                            tb_out.append(False)
-                    if all(tb_out):
-                        tbo.append(t)
-
-                # replace true_bits with filtered list
-                true_bits = tbo
-
-            def get_label(bits):
-                """
-                Generate label for value in attribute table.
-
-                :param bits: <list> List of True or False for bit position
-                :return: <str> Attribute label
-                """
-                if len(bits) == 0:
-                    if band == 'radsat_qa':
-                        return 'No Saturation'
-
-                    elif band == 'sr_cloud_qa' or band == 'sr_aerosol':
-                        return 'None'
-
-                    elif band == 'BQA':
-                        return 'Not Determined'
-
-                # build description from all bits represented in value
-                desc = []
-                for tb in bits:
-                    k = next(key for key, value in
-                             bit_flags[band][sens].items() if value == tb)
-
-                    # if 'low' labels are disabled, do not add them here
-                    if rm_low and band != 'BQA' and 'low' in k.lower():
-                        continue
-
-                    # if last check, and not radiometric sat, set to 'clear'
-                    elif rm_low and band == 'BQA' and 'low' in k.lower() and \
-                                    tb == bits[-1] and \
-                                    'radiometric' not in k.lower() and \
-                            not desc:
-                        k = 'Clear'
-
-                    # if BQA and bit is low radiometric sat, keep it
-                    elif rm_low and band == 'BQA' and 'low' in k.lower():
-                        if 'radiometric' not in k.lower():
-                            continue
-
-                    # if radsat_qa, handle differently to make display cleaner
-                    if band == 'radsat_qa':
-                        if not desc:
-                            desc = "Band {0} Data Saturation".format(tb[0])
-
-                        else:
-                            desc = "{0},{1} Data Saturation".format(
-                                desc[:desc.find('Data') - 1], tb[0])
-
-                    # string creation for all other bands
-                    else:
-                        if not desc:
-                            desc = "{0}".format(k)
-
-                        else:
-                            desc += ", {0}".format(k)
-
-                # final check to make sure something was set
-                if not desc:
-                    desc = 'ERROR: bit set incorrectly'
-
-                return desc
-
-            # add desc to row description (row[1])
-            try:
-                row[1] = get_label(true_bits)
-            except UnboundLocalError:
-                row[1] = 'ERROR: bit read incorrectly'
+    with instrument.stage("UpdateCursor"):
+        with arcpy.da.UpdateCursor(raster_in, fields) as cursor:
+            for row in cursor:
+                # add desc to row description (row[1])
+                row[1] = labels[row[0]]
 
-            # update table row
-            cursor.updateRow(row)
+                # update table row
+                cursor.updateRow(row)
+                instrument.add("rows")
 
-    # if running in ArcMap, refresh display in current mxd
-    try:
-        mxd = arcpy.mapping.MapDocument("CURRENT")
-    except RuntimeError:
-        pass
-    else:
-        # get current (active) data frame
-        df = mxd.activeDataFrame
+    # keep value counts for later extraction or statistics of this raster
+    hist_cache.save(raster_in, values, table["Count"])
 
-        # find source layer (if it exists)
+    # if running in ArcMap, refresh display in current mxd
+    with instrument.stage("layer_refresh"):
         try:
-            source_lyr = arcpy.mapping.ListLayers(mxd,
-                                                  raster_in.split(os.sep)[-1],
-                                                  df)[0]
-        except IndexError:
+            mxd = arcpy.mapping.MapDocument("CURRENT")
+        except RuntimeError:
             pass
+        else:
+            # get current (active) data frame
+            df = mxd.activeDataFrame
 
-        # create target layer
-        raster_fname, ext = os.path.splitext(raster_in.split(os.sep)[-1])
-        result = arcpy.MakeRasterLayer_management(raster_in,
-                                                  raster_fname + ext)
-        layer = result.getOutput(0)
+            # find source layer (if it exists)
+            try:
+                source_lyr = arcpy.mapping.ListLayers(
+                    mxd, raster_in.split(os.sep)[-1], df)[0]
+            except IndexError:
+                pass
 
-        # add new layer
-        arcpy.mapping.AddLayer(df, layer, "AUTO_ARRANGE")
+            # create target layer
+            raster_fname, ext = os.path.splitext(raster_in.split(os.sep)[-1])
+            result = arcpy.MakeRasterLayer_management(raster_in,
+                                                      raster_fname + ext)
+            layer = result.getOutput(0)
+
+            # add new layer
+            arcpy.mapping.AddLayer(df, layer, "AUTO_ARRANGE")
+
+            # remove old layer (if it exists)
+            try:
+                arcpy.mapping.RemoveLayer(df, source_lyr)
+            except (UnboundLocalError, NameError):
+                pass
+
+            arcpy.RefreshTOC()
+
+
+def tile_counts(qa):
+    """
+    Count values of a tile, in a worker process of shared_tiles.
+
+    :param qa: <numpy.ndarray> Integer QA values.
+    :return: <tuple> (values, counts) arrays.
+    """
+    import histogram
+
+    h = histogram.Histogram()
+    h.add(qa)
+
+    return h.counts()
+
+
+def count_values(raster_in, block_rows=None, block_cols=None,
+                 use_cache=True, threads=None, pipeline=False,
+                 processes=None, scratch=None):
+    """
+    Count pixels of each value in a raster with NumPy and GDAL.
+
+    The raster is read one block at a time, so peak memory is set by the
+    block size rather than by the size of the raster. Counts are cached by
+    file identity (see hist_cache), so later calls on an unchanged raster
+    do not read it again.
+
+    :param raster_in: <str> Path to raster.
+    :param block_rows: <int> Rows per block (default: all rows).
+    :param block_cols: <int> Columns per block (default: all columns).
+    :param use_cache: <bool> Read and write cached counts.
+    :param threads: <int> Count blocks on this many threads (default: 1).
+    :param pipeline: <bool> Read and count blocks concurrently (see
+                           raster_io.pipeline_blocks).
+    :param processes: <int> Count tiles on this many worker processes,
+                            sharing the input through a memory-mapped file
+                            (see shared_tiles) (default: 1, no workers).
+    :param scratch: <str> Directory for scratch files of processes
+                          (default: system temporary directory).
+    :return: <Histogram> Value counts, from histogram.
+    """
+    import raster_io
+    import histogram
+    import hist_cache
+
+    if use_cache:
+        cached = hist_cache.load(raster_in)
+        if cached is not None:
+            instrument.add("hist_cache_hits")
+            return histogram.Histogram.from_counts(*cached)
+
+    def block_counts(block):
+        h = histogram.Histogram()
+        with instrument.stage("histogram"):
+            h.add(block)
+        instrument.add("pixels", block.size)
+        instrument.add("bytes_read", block.nbytes)
+        return h
+
+    hist = histogram.Histogram()
+    with raster_io.open_raster(raster_in) as r_in:
+        # check to ensure raster is not floating/double/complex
+        if r_in.dtype is None or r_in.dtype.kind not in "iu":
+            sys.exit("ERROR: Data type of input raster must be integer.")
+
+        if processes and processes > 1:
+            import shared_tiles
+            for _, counts in shared_tiles.map_tiles(
+                    tile_counts, (), r_in, block_rows, block_cols, processes,
+                    scratch=scratch):
+                hist.merge(histogram.Histogram.from_counts(*counts))
+        elif pipeline or (threads and threads > 1):
+            for _, h in raster_io.map_blocks(block_counts, r_in, block_rows,
+                                             block_cols, threads, pipeline):
+                hist.merge(h)
+        else:
+            for _, block in raster_io.iter_blocks(r_in, block_rows,
+                                                  block_cols):
+                with instrument.stage("histogram"):
+                    hist.add(block)
+                instrument.add("pixels", block.size)
+                instrument.add("bytes_read", block.nbytes)
+
+    if use_cache:
+        hist_cache.save(raster_in, *hist.counts())
+
+    return hist
+
+
+def build_attr_table_numpy(raster_in, sensor, band, rm_low=False,
+                           block_rows=None, block_cols=None, threads=None,
+                           pipeline=False, processes=None, scratch=None):
+    """
+    Build attribute table for thematic raster with NumPy and GDAL.
+
+    Values are counted block by block (see count_values), and the table is
+    written as a GDAL raster attribute table.
+
+    :param raster_in: <str> Path to target raster.
+    :param sensor: <str> Sensor type.
+    :param band: <str> Band type.
+    :param rm_low: <bool> Remove (True) or keep (False) 'low' values (excludes
+                          sr_aerosol, radiometric sat. in BQA)
+    :param block_rows: <int> Rows per block (default: all rows).
+    :param block_cols: <int> Columns per block (default: all columns).
+    :param threads: <int> Count blocks on this many threads (default: 1).
+    :param pipeline: <bool> Read and count blocks concurrently (see
+                           raster_io.pipeline_blocks).
+    :param processes: <int> Count tiles on this many worker processes (see
+                            count_values).
+    :param scratch: <str> Directory for scratch files of processes.
+    :return: <list> (value, count, label) tuples.
+    """
+    import raster_io
+    import hist_cache
+
+    # re-map input sensor name to qa_values sensor name
+    sens = get_sensor(sensor)
+    if sens is None:
+        sys.exit("ERROR: Incorrect sensor provided. Input: {0}; "
+                 "Potential options: Landsat 4-5, 7 | Landsat 8"
+                 .format(sensor))
+
+    # decode all values in a single pass
+    with instrument.stage("count_values"):
+        values, counts = count_values(raster_in, block_rows, block_cols,
+                                      threads=threads, pipeline=pipeline,
+                                      processes=processes,
+                                      scratch=scratch).counts()
+    instrument.add("unique_values", len(values))
+
+    with instrument.stage("lookup_labels"):
+        labels = lut_cache.lookup_labels(values, band, sens, rm_low)
+
+    with instrument.stage("write_attr_table"):
+        raster_io.write_attr_table(raster_in, values, counts, labels)
+
+    # formats holding the table in the raster itself (e.g. .img) were just
+    #   modified, so cache the counts again under the new file identity
+    hist_cache.save(raster_in, values, counts)
+
+    return list(zip(values.tolist(), counts.tolist(), labels.tolist()))
+
+
+def attr_table_files(raster_in, backend=None):
+    """
+    List the files an attribute table is written to, besides the raster.
+
+    Erdas Imagine rasters hold the table themselves. Otherwise, GDAL ("numpy"
+    backend) writes it to an .aux.xml sidecar, and ArcGIS to a .vat.dbf.
+
+    :param raster_in: <str> Path to target raster.
+    :param backend: <str> Name of backend in backends (default: as
+                          build_attr_table).
+    :return: <list> Paths of sidecar files.
+    """
+    import raster_io
+
+    if backend is None:
+        backend = qa_backend.default_backend()
+
+    # .img without an ENVI header is Erdas Imagine
+    if os.path.splitext(raster_in)[-1].lower() == ".img" and \
+            raster_io.envi_header(raster_in) is None:
+        return []
+
+    if backend == "arcpy":
+        return [raster_in + ".vat.dbf"]
+
+    return [raster_in + ".aux.xml"]
 
-        # remove old layer (if it exists)
-        try:
-            arcpy.mapping.RemoveLayer(df, source_lyr)
-        except (UnboundLocalError, NameError):
-            pass
 
-        arcpy.RefreshTOC()
+# backend name: attribute table function, all taking the same arguments
+backends = {
+    "arcpy": build_attr_table_arcpy,
+    "numpy": build_attr_table_numpy
+}
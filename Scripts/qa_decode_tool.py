@@ -13,16 +13,21 @@ Author:         Steve Foga
 Affiliation:    SGT Inc., contractor to USGS EROS Center
 Contact:        steven.foga.ctr@usgs.gov
 Created:        15 May 2017
-Version:        1.2
+Version:        1.5
 
 Changelog
 1.0     15 May 2017     Original development with Python 2.7.10 and
                         ArcGIS 10.4.1.
 1.1     09 Aug 2017     Update to handle any L8 pixel_qa terrain occlusion.
 1.2     21 Aug 2017     Added ability to unpack bits to individual files.
+1.3     17 Oct 2026     Sensor and band detection moved to scene_info.
+1.4     17 Oct 2026     Optional stage timings (instrument).
+1.5     17 Oct 2026     Faster parameter updates; processing modules
+                        imported when the tool runs.
 """
+import os
 import arcpy
-import qa_decode
+import scene_info
 
 
 class DecodeQA(object):
@@ -32,7 +37,6 @@ class DecodeQA(object):
         """
         self.label = "Decode QA"
         self.description = ""
-        self.params = arcpy.GetParameterInfo()
         self.canRunInBackground = False
 
     def getParameterInfo(self):
@@ -68,11 +72,7 @@ class DecodeQA(object):
             parameterType="Required",
             direction="Input")
         param2.filter.type = "ValueList"
-        param2.filter.list = ['BQA',
-                              'pixel_qa',
-                              'radsat_qa',
-                              'sr_aerosol',
-                              'sr_cloud_qa']
+        param2.filter.list = list(scene_info.band_names)
 
         # Fourth parameter (keep or remove low)
         param3 = arcpy.Parameter(
@@ -92,47 +92,26 @@ class DecodeQA(object):
         :param parameters: <list> Input parameters
         :return:
         """
-        # Change sensor in drop-down
-        if parameters[0].valueAsText and not parameters[1].altered:
-            if [s for s in ['LE07', 'LT05', 'LT04'] if
-                s in parameters[0].valueAsText]:
-                parameters[1].value = 'Landsat 4-5, 7'
+        # detect from the file name only; cached per name by scene_info
+        fname = os.path.basename(parameters[0].valueAsText or "")
 
-            elif [s for s in ['LC08', 'LT08', 'LO08'] if
-                  s in parameters[0].valueAsText]:
-                parameters[1].value = 'Landsat 8'
+        # Change sensor in drop-down
+        if fname and not parameters[1].altered:
+            sensor = scene_info.detect_sensor(fname)
+            if sensor:
+                parameters[1].value = sensor
 
         # Restrict band options based upon sensor
         if parameters[1].valueAsText and not parameters[2].altered:
-            if parameters[1].value == 'Landsat 8':
-                parameters[2].filter.list = ['BQA',
-                                             'pixel_qa',
-                                             'radsat_qa',
-                                             'sr_aerosol']
-
-            elif parameters[1].value == 'Landsat 4-5, 7':
-                parameters[2].filter.list = ['BQA',
-                                             'pixel_qa',
-                                             'radsat_qa',
-                                             'sr_cloud_qa']
+            if parameters[1].value in scene_info.sensor_bands:
+                parameters[2].filter.list = \
+                    scene_info.sensor_bands[parameters[1].value]
 
         # Change band in drop-down
-        if parameters[0].valueAsText and not parameters[2].altered:
-            if [b for b in ['bqa', 'BQA'] if
-                b in parameters[0].valueAsText]:
-                parameters[2].value = 'BQA'
-            elif [b for b in ['pixel_qa', 'PIXELQA'] if
-                  b in parameters[0].valueAsText]:
-                parameters[2].value = 'pixel_qa'
-            elif [b for b in ['radsat_qa', 'RADSATQA'] if
-                  b in parameters[0].valueAsText]:
-                parameters[2].value = 'radsat_qa'
-            elif [b for b in ['sr_aerosol', 'SRAEROSOLQA'] if
-                  b in parameters[0].valueAsText]:
-                parameters[2].value = 'sr_aerosol'
-            elif [b for b in ['sr_cloud_qa', 'SRCLOUDQA'] if
-                  b in parameters[0].valueAsText]:
-                parameters[2].value = 'sr_cloud_qa'
+        if fname and not parameters[2].altered:
+            band = scene_info.detect_band(fname)
+            if band:
+                parameters[2].value = band
 
         return
 
@@ -153,9 +132,14 @@ class DecodeQA(object):
         :param messages:
         :return:
         """
+        # imported here, so the dialog opens without loading NumPy
+        import qa_decode
+        import instrument
+
         raster = parameters[0].valueAsText
         sensor = parameters[1].valueAsText
         band = parameters[2].valueAsText
         rm_low = parameters[3].valueAsText
 
-        qa_decode.build_attr_table(raster, sensor, band, rm_low)
+        with instrument.run("Decode QA"):
+            qa_decode.build_attr_table(raster, sensor, band, rm_low)
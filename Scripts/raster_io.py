@@ -0,0 +1,748 @@
+"""
+This software has been approved for release by the U.S. Geological Survey
+(USGS). Although the software has been subjected to rigorous review, the USGS
+reserves the right to update the software as needed pursuant to further
+analysis and review. No warranty, expressed or implied, is made by the USGS or
+the U.S. Government as to the functionality of the software and related
+material nor shall the fact of release constitute any such warranty.
+Furthermore, the software is released on condition that neither the USGS nor
+the U.S. Government shall be held liable for any damages resulting from its
+authorized or unauthorized use.
+
+Created:        17 Oct 2026
+Version:        1.7
+
+Changelog
+1.0     17 Oct 2026     Original development. GDAL raster reading and
+                        writing, for running without ArcGIS.
+1.1     17 Oct 2026     Block-wise reading, raster attribute tables.
+1.2     17 Oct 2026     Memory-mapped reading of ENVI (.img/.hdr) rasters.
+1.3     17 Oct 2026     Blocks processed on a pool of threads (map_blocks).
+1.4     17 Oct 2026     ENVI output without GDAL.
+1.5     17 Oct 2026     Pipelined reading, processing and writing of blocks.
+1.6     17 Oct 2026     Only ENVI extensions written without GDAL.
+1.7     17 Oct 2026     .img written as ENVI with GDAL too.
+"""
+import os
+import threading
+import collections
+import numpy as np
+from multiprocessing.pool import ThreadPool
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+try:
+    from osgeo import gdal
+except ImportError:
+    gdal = None
+
+# output driver by file extension, anything else is written as GeoTIFF;
+#   .img is ENVI (with a .hdr), like ESPA rasters, whether or not GDAL is
+#   installed (see EnviWriter)
+drivers = {
+    ".tif": "GTiff",
+    ".tiff": "GTiff",
+    ".img": "ENVI",
+    ".dat": "ENVI",
+    ".bin": "ENVI"
+}
+
+# extensions that can be written when GDAL is not installed
+envi_exts = (".img", ".dat", ".bin")
+
+# numpy dtype name: GDAL data type name
+gdal_types = {
+    "uint8": "Byte",
+    "uint16": "UInt16",
+    "int16": "Int16",
+    "uint32": "UInt32",
+    "int32": "Int32",
+    "float32": "Float32",
+    "float64": "Float64"
+}
+numpy_types = dict((v, np.dtype(k)) for k, v in gdal_types.items())
+
+# rows per tile when processing with threads and no block size is given
+THREAD_BLOCK_ROWS = 1024
+
+# blocks read ahead of the slowest pipeline stage
+PIPELINE_DEPTH = 4
+
+# seconds between checks for a failed stage, while a pipeline stage waits
+_POLL = 0.1
+
+
+# ENVI header data type code: numpy dtype
+envi_types = {
+    1: np.dtype("uint8"),
+    2: np.dtype("int16"),
+    3: np.dtype("int32"),
+    4: np.dtype("float32"),
+    5: np.dtype("float64"),
+    12: np.dtype("uint16"),
+    13: np.dtype("uint32"),
+    14: np.dtype("int64"),
+    15: np.dtype("uint64")
+}
+
+
+def _require_gdal():
+    if gdal is None:
+        raise ImportError("GDAL (osgeo) is required to read and write "
+                          "rasters without ArcGIS.")
+
+
+class RasterReader(object):
+    def __init__(self, path):
+        """
+        Single band raster opened for reading.
+
+        :param path: <str> Path to raster.
+        """
+        _require_gdal()
+
+        self.path = path
+        self.ds = gdal.Open(path)
+        if self.ds is None:
+            raise IOError("Unable to open raster {0}".format(path))
+
+        rb = self.ds.GetRasterBand(1)
+        self.rows = self.ds.RasterYSize
+        self.cols = self.ds.RasterXSize
+        self.dtype = numpy_types.get(gdal.GetDataTypeName(rb.DataType))
+        self.nodata = rb.GetNoDataValue()
+        self.geotransform = self.ds.GetGeoTransform()
+        self.projection = self.ds.GetProjection()
+
+    @property
+    def shape(self):
+        return self.rows, self.cols
+
+    def read(self, row_off=0, nrows=None, col_off=0, ncols=None):
+        """
+        Read a window of the band, or the whole band.
+
+        :param row_off: <int> First row of window.
+        :param nrows: <int> Number of rows (default: to last row).
+        :param col_off: <int> First column of window.
+        :param ncols: <int> Number of columns (default: to last column).
+        :return: <numpy.ndarray> 2-D array.
+        """
+        if nrows is None:
+            nrows = self.rows - row_off
+        if ncols is None:
+            ncols = self.cols - col_off
+
+        return self.ds.GetRasterBand(1).ReadAsArray(col_off, row_off,
+                                                    ncols, nrows)
+
+    def close(self):
+        self.ds = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def envi_header(path):
+    """
+    Return the ENVI header (.hdr) belonging to a raster, if it exists.
+
+    ESPA names headers either after the raster without its extension
+    (x_pixel_qa.hdr) or with .hdr appended (x_pixel_qa.img.hdr).
+
+    :param path: <str> Path to raster.
+    :return: <str> Path to header, or None.
+    """
+    for hdr in (os.path.splitext(path)[0] + ".hdr", path + ".hdr"):
+        if os.path.isfile(hdr):
+            return hdr
+
+    return None
+
+
+def read_envi_header(path):
+    """
+    Parse an ENVI header into a dictionary.
+
+    Keys are lower case. Values in braces, which may span several lines,
+    are returned without the braces.
+
+    :param path: <str> Path to .hdr file.
+    :return: <dict> Header key: value (str) pairs.
+    """
+    with open(path) as f:
+        lines = f.read().splitlines()
+
+    if not lines or lines[0].strip() != "ENVI":
+        raise IOError("{0} is not an ENVI header".format(path))
+
+    header = {}
+    key = None
+    for line in lines[1:]:
+        if key is not None:
+            # continuation of a multi-line {...} value
+            header[key] += "\n" + line
+        elif "=" in line:
+            key, value = [s.strip() for s in line.split("=", 1)]
+            key = key.lower()
+            header[key] = value
+        else:
+            continue
+
+        if header[key].startswith("{") and not header[key].endswith("}"):
+            continue
+
+        header[key] = header[key].strip().lstrip("{").rstrip("}").strip()
+        key = None
+
+    return header
+
+
+def envi_geotransform(map_info):
+    """
+    Convert an ENVI "map info" value to a GDAL style geotransform.
+
+    :param map_info: <str> Comma separated map info (projection name,
+                           reference pixel x/y (1-based), easting, northing,
+                           pixel size x/y, ...).
+    :return: <tuple> (x0, pixel width, 0, y0, 0, -pixel height), or None.
+    """
+    if not map_info:
+        return None
+
+    items = [s.strip() for s in map_info.split(",")]
+    try:
+        ref_x, ref_y, east, north, size_x, size_y = \
+            [float(v) for v in items[1:7]]
+    except (ValueError, IndexError):
+        return None
+
+    return (east - (ref_x - 1) * size_x, size_x, 0.0,
+            north + (ref_y - 1) * size_y, 0.0, -size_y)
+
+
+class EnviReader(object):
+    def __init__(self, path, header=None):
+        """
+        Band 1 of an ENVI raster, memory-mapped for reading.
+
+        Windows are returned as views into the mapped file, so only the pages
+        that are read are loaded, and processes reading the same raster share
+        the operating system's page cache instead of holding private copies.
+
+        :param path: <str> Path to raster (.img, .bin, ...).
+        :param header: <str> Path to .hdr file (default: see envi_header()).
+        """
+        self.path = path
+        header = header or envi_header(path)
+        if header is None:
+            raise IOError("No ENVI header found for {0}".format(path))
+
+        hdr = read_envi_header(header)
+        try:
+            self.rows = int(hdr["lines"])
+            self.cols = int(hdr["samples"])
+            bands = int(hdr.get("bands", 1))
+            dtype = envi_types[int(hdr["data type"])]
+        except (KeyError, ValueError):
+            raise IOError("Unsupported ENVI header {0}".format(header))
+
+        # byte order 0 is little endian, 1 is big endian
+        order = "<" if int(hdr.get("byte order", 0)) == 0 else ">"
+        self.dtype = dtype.newbyteorder(order)
+        offset = int(hdr.get("header offset", 0))
+        interleave = hdr.get("interleave", "bsq").lower()
+
+        shapes = {"bsq": (bands, self.rows, self.cols),
+                  "bil": (self.rows, bands, self.cols),
+                  "bip": (self.rows, self.cols, bands)}
+        if interleave not in shapes:
+            raise IOError("Unsupported ENVI interleave {0}"
+                          .format(interleave))
+
+        self.mm = np.memmap(path, dtype=self.dtype, mode="r", offset=offset,
+                            shape=shapes[interleave])
+        if interleave == "bsq":
+            self.band = self.mm[0]
+        elif interleave == "bil":
+            self.band = self.mm[:, 0, :]
+        else:
+            self.band = self.mm[:, :, 0]
+
+        # report the data type in native byte order, as GDAL does
+        self.dtype = dtype
+
+        nodata = hdr.get("data ignore value")
+        self.nodata = float(nodata) if nodata else None
+        self.geotransform = envi_geotransform(hdr.get("map info"))
+        self.projection = hdr.get("coordinate system string", "")
+
+    @property
+    def shape(self):
+        return self.rows, self.cols
+
+    def read(self, row_off=0, nrows=None, col_off=0, ncols=None):
+        """
+        Read a window of the band, or the whole band, without copying it.
+
+        :param row_off: <int> First row of window.
+        :param nrows: <int> Number of rows (default: to last row).
+        :param col_off: <int> First column of window.
+        :param ncols: <int> Number of columns (default: to last column).
+        :return: <numpy.ndarray> 2-D read-only view (copied only if the file
+                                 is not in native byte order).
+        """
+        if nrows is None:
+            nrows = self.rows - row_off
+        if ncols is None:
+            ncols = self.cols - col_off
+
+        window = np.asarray(self.band[row_off:row_off + nrows,
+                                      col_off:col_off + ncols])
+        if not window.dtype.isnative:
+            window = window.astype(self.dtype)
+
+        return window
+
+    def close(self):
+        self.band = None
+        self.mm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class EnviWriter(object):
+    def __init__(self, path, like, dtype="uint8", count=1):
+        """
+        ENVI raster opened for writing, without GDAL.
+
+        Has the same interface as RasterWriter. Bands are written band
+        sequential (bsq), little endian, with the header next to the raster
+        (x.hdr for x.img).
+
+        :param path: <str> Path to output raster.
+        :param like: <RasterReader> Raster providing size and georeferencing.
+        :param dtype: <str> Output data type.
+        :param count: <int> Number of bands.
+        """
+        self.path = path
+        self.rows, self.cols = like.shape
+        self.count = count
+
+        dtype = np.dtype(dtype)
+        codes = dict((v, k) for k, v in envi_types.items())
+        if dtype not in codes:
+            raise ValueError("Data type {0} cannot be written as ENVI"
+                             .format(dtype))
+
+        lines = ["ENVI",
+                 "samples = {0}".format(self.cols),
+                 "lines = {0}".format(self.rows),
+                 "bands = {0}".format(count),
+                 "header offset = 0",
+                 "file type = ENVI Standard",
+                 "data type = {0}".format(codes[dtype]),
+                 "interleave = bsq",
+                 "byte order = 0"]
+
+        gt = like.geotransform
+        if gt:
+            lines.append("map info = {{Arbitrary, 1.0, 1.0, {0!r}, {1!r}, "
+                         "{2!r}, {3!r}}}".format(gt[0], gt[3], gt[1],
+                                                 -gt[5]))
+        if like.projection:
+            lines.append("coordinate system string = {{{0}}}"
+                         .format(like.projection))
+
+        with open(os.path.splitext(path)[0] + ".hdr", "w") as f:
+            f.write("\n".join(lines) + "\n")
+
+        self.mm = np.memmap(path, dtype=dtype.newbyteorder("<"), mode="w+",
+                            shape=(count, self.rows, self.cols))
+
+    @property
+    def shape(self):
+        return self.rows, self.cols
+
+    def write(self, array, row_off=0, col_off=0, band=1):
+        """
+        Write a window of one band.
+
+        :param array: <numpy.ndarray> 2-D array.
+        :param row_off: <int> First row of window.
+        :param col_off: <int> First column of window.
+        :param band: <int> Band number (starting at 1).
+        :return:
+        """
+        nrows, ncols = array.shape
+        self.mm[band - 1, row_off:row_off + nrows,
+                col_off:col_off + ncols] = array
+
+    def close(self):
+        if self.mm is not None:
+            self.mm.flush()
+        self.mm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class RasterWriter(object):
+    def __init__(self, path, like, dtype="uint8", count=1):
+        """
+        Raster opened for writing, georeferenced like an input raster.
+
+        :param path: <str> Path to output raster. The extension selects the
+                           format (see drivers).
+        :param like: <RasterReader> Raster providing size and georeferencing.
+        :param dtype: <str> Output data type.
+        :param count: <int> Number of bands.
+        """
+        _require_gdal()
+
+        self.path = path
+        self.rows, self.cols = like.shape
+        self.count = count
+
+        ext = os.path.splitext(path)[-1].lower()
+        driver = gdal.GetDriverByName(drivers.get(ext, "GTiff"))
+        self.ds = driver.Create(path, self.cols, self.rows, count,
+                                gdal.GetDataTypeByName(
+                                    gdal_types[np.dtype(dtype).name]))
+        if self.ds is None:
+            raise IOError("Unable to create raster {0}".format(path))
+
+        if like.geotransform:
+            self.ds.SetGeoTransform(like.geotransform)
+        if like.projection:
+            self.ds.SetProjection(like.projection)
+
+    @property
+    def shape(self):
+        return self.rows, self.cols
+
+    def write(self, array, row_off=0, col_off=0, band=1):
+        """
+        Write a window of one band.
+
+        :param array: <numpy.ndarray> 2-D array.
+        :param row_off: <int> First row of window.
+        :param col_off: <int> First column of window.
+        :param band: <int> Band number (starting at 1).
+        :return:
+        """
+        self.ds.GetRasterBand(band).WriteArray(array, col_off, row_off)
+
+    def close(self):
+        if self.ds is not None:
+            self.ds.FlushCache()
+        self.ds = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def iter_windows(rows, cols, block_rows=None, block_cols=None):
+    """
+    Split a raster into blocks, in row-major order.
+
+    :param rows: <int> Number of rows in raster.
+    :param cols: <int> Number of columns in raster.
+    :param block_rows: <int> Rows per block (default: all rows).
+    :param block_cols: <int> Columns per block (default: all columns).
+    :return: <generator> (row_off, nrows, col_off, ncols) tuples.
+    """
+    block_rows = block_rows or rows
+    block_cols = block_cols or cols
+
+    for row_off in range(0, rows, block_rows):
+        nrows = min(block_rows, rows - row_off)
+        for col_off in range(0, cols, block_cols):
+            yield row_off, nrows, col_off, min(block_cols, cols - col_off)
+
+
+def iter_blocks(reader, block_rows=None, block_cols=None):
+    """
+    Read a raster block by block.
+
+    Only one block is held in memory at a time, so peak memory is set by the
+    block size rather than by the size of the raster.
+
+    :param reader: <RasterReader> Open input raster.
+    :param block_rows: <int> Rows per block (default: all rows).
+    :param block_cols: <int> Columns per block (default: all columns).
+    :return: <generator> (window, array) tuples, window as in iter_windows().
+    """
+    for window in iter_windows(reader.rows, reader.cols, block_rows,
+                               block_cols):
+        yield window, reader.read(*window)
+
+
+def map_blocks(func, reader, block_rows=None, block_cols=None, threads=None,
+               pipeline=False):
+    """
+    Apply a function to each block of a raster, optionally on threads.
+
+    Blocks are read in this thread and processed on a pool of threads; NumPy
+    releases the GIL for the bitwise operations and table lookups done per
+    block. Results are returned in row-major order whatever order the
+    threads finish in, and at most two blocks per thread are held at once.
+
+    With pipeline set, blocks are read on a thread of their own instead (see
+    pipeline_blocks), so reading, processing and whatever the caller does
+    with each result (e.g. writing it) all overlap.
+
+    :param func: <func> Function of a block (numpy.ndarray).
+    :param reader: <RasterReader> Open input raster.
+    :param block_rows: <int> Rows per block (default: all rows, or
+                            THREAD_BLOCK_ROWS if threads are used).
+    :param block_cols: <int> Columns per block (default: all columns).
+    :param threads: <int> Number of threads (default: 1, no pool).
+    :param pipeline: <bool> Read blocks ahead on a separate thread.
+    :return: <generator> (window, result) tuples, window as in iter_windows().
+    """
+    if pipeline:
+        for item in pipeline_blocks(func, reader, block_rows, block_cols,
+                                    threads):
+            yield item
+        return
+
+    if not threads or threads <= 1:
+        for window, block in iter_blocks(reader, block_rows, block_cols):
+            yield window, func(block)
+        return
+
+    if block_rows is None and block_cols is None:
+        block_rows = THREAD_BLOCK_ROWS
+
+    pool = ThreadPool(threads)
+    pending = collections.deque()
+    try:
+        for window, block in iter_blocks(reader, block_rows, block_cols):
+            pending.append((window, pool.apply_async(func, (block,))))
+
+            if len(pending) >= 2 * threads:
+                window, result = pending.popleft()
+                yield window, result.get()
+
+        while pending:
+            window, result = pending.popleft()
+            yield window, result.get()
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def _put(q, item, stop):
+    # wait for room in a queue, unless another stage has failed
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=_POLL)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def _get(q, stop):
+    # wait for an item of a queue; None if another stage has failed
+    while not stop.is_set():
+        try:
+            return q.get(timeout=_POLL)
+        except queue.Empty:
+            pass
+    return None
+
+
+def pipeline_blocks(func, reader, block_rows=None, block_cols=None,
+                    threads=None, depth=None):
+    """
+    Apply a function to each block of a raster, reading, processing and
+    consuming blocks concurrently.
+
+    A reader thread reads blocks into a bounded queue, worker threads apply
+    func and queue the results, and the caller consumes them (e.g. writes
+    them out) in row-major order. At most depth + 2 * threads blocks are
+    held at once: when the caller or the workers fall behind, reading waits
+    for them. If any stage fails, or the caller stops iterating, the other
+    stages stop, and the first error is raised to the caller.
+
+    :param func: <func> Function of a block (numpy.ndarray).
+    :param reader: <RasterReader> Open input raster; only read from the
+                                  reader thread.
+    :param block_rows: <int> Rows per block (default: THREAD_BLOCK_ROWS).
+    :param block_cols: <int> Columns per block (default: all columns).
+    :param threads: <int> Number of worker threads (default: 1).
+    :param depth: <int> Blocks read ahead (default: PIPELINE_DEPTH).
+    :return: <generator> (window, result) tuples, window as in iter_windows().
+    """
+    threads = max(1, threads or 1)
+    depth = depth or PIPELINE_DEPTH
+    if block_rows is None and block_cols is None:
+        block_rows = THREAD_BLOCK_ROWS
+
+    blocks = queue.Queue(depth)
+    results = queue.Queue(depth)
+    # blocks read but not yet consumed, so results out of order cannot pile
+    #   up behind a slow block
+    slots = threading.Semaphore(depth + 2 * threads)
+    stop = threading.Event()
+    errors = []
+
+    def fail(e):
+        errors.append(e)
+        stop.set()
+
+    def read():
+        try:
+            for i, window in enumerate(iter_windows(
+                    reader.rows, reader.cols, block_rows, block_cols)):
+                while not slots.acquire(False):
+                    if stop.wait(_POLL / 10):
+                        return
+                block = reader.read(*window)
+                if not block.flags.owndata:
+                    # memory-mapped: do the actual reading here
+                    block = block.copy()
+                if not _put(blocks, (i, window, block), stop):
+                    return
+        except Exception as e:
+            fail(e)
+        finally:
+            for _ in range(threads):
+                _put(blocks, None, stop)
+
+    def compute():
+        try:
+            while True:
+                item = _get(blocks, stop)
+                if item is None:
+                    break
+                i, window, block = item
+                if not _put(results, (i, window, func(block)), stop):
+                    break
+        except Exception as e:
+            fail(e)
+        finally:
+            _put(results, None, stop)
+
+    stages = [threading.Thread(target=read)] + \
+        [threading.Thread(target=compute) for _ in range(threads)]
+    for t in stages:
+        t.daemon = True
+        t.start()
+
+    pending = {}
+    done = 0
+    nxt = 0
+    try:
+        while done < threads:
+            item = _get(results, stop)
+            if item is None:
+                if stop.is_set():
+                    break
+                done += 1
+                continue
+
+            i, window, result = item
+            pending[i] = window, result
+            while nxt in pending:
+                yield pending.pop(nxt)
+                slots.release()
+                nxt += 1
+    finally:
+        stop.set()
+        for t in stages:
+            t.join()
+
+    if errors:
+        raise errors[0]
+
+
+def write_attr_table(path, values, counts, labels):
+    """
+    Attach a raster attribute table (Value, Count, Descr) to a raster.
+
+    :param path: <str> Path to raster.
+    :param values: <list> Raster values.
+    :param counts: <list> Pixel count of each value.
+    :param labels: <list> Description of each value.
+    :return:
+    """
+    _require_gdal()
+
+    ds = gdal.Open(path, gdal.GA_Update)
+    if ds is None:
+        raise IOError("Unable to open raster {0}".format(path))
+
+    rat = gdal.RasterAttributeTable()
+    rat.CreateColumn("Value", gdal.GFT_Integer, gdal.GFU_MinMax)
+    rat.CreateColumn("Count", gdal.GFT_Real, gdal.GFU_PixelCount)
+    rat.CreateColumn("Descr", gdal.GFT_String, gdal.GFU_Name)
+    rat.SetRowCount(len(values))
+
+    for i, (v, c, d) in enumerate(zip(values, counts, labels)):
+        rat.SetValueAsInt(i, 0, int(v))
+        rat.SetValueAsDouble(i, 1, float(c))
+        rat.SetValueAsString(i, 2, str(d))
+
+    ds.GetRasterBand(1).SetDefaultRAT(rat)
+    ds.FlushCache()
+    ds = None
+
+
+def open_raster(path):
+    """
+    Open a single band raster for reading.
+
+    ENVI rasters (e.g. ESPA .img with a .hdr) are memory-mapped directly;
+    anything else is read through GDAL.
+
+    :param path: <str> Path to raster.
+    :return: <RasterReader> or <EnviReader>
+    """
+    header = envi_header(path)
+    if header is not None:
+        return EnviReader(path, header)
+
+    return RasterReader(path)
+
+
+def create_raster(path, like, dtype="uint8", count=1):
+    """
+    Create a raster georeferenced like an input raster.
+
+    Without GDAL, only ENVI rasters (see envi_exts) can be written.
+
+    :param path: <str> Path to output raster.
+    :param like: <RasterReader> Raster providing size and georeferencing.
+    :param dtype: <str> Output data type.
+    :param count: <int> Number of bands.
+    :return: <RasterWriter>, or <EnviWriter> if GDAL is not installed.
+    """
+    if gdal is None:
+        ext = os.path.splitext(path)[-1].lower()
+        if ext not in envi_exts:
+            raise ImportError("GDAL (osgeo) is required to write {0} "
+                              "rasters; without it, only ENVI ({1}) can be "
+                              "written.".format(ext or path,
+                                                ", ".join(envi_exts)))
+        return EnviWriter(path, like, dtype, count)
+
+    return RasterWriter(path, like, dtype, count)
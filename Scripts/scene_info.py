@@ -0,0 +1,129 @@
+"""
+This software has been approved for release by the U.S. Geological Survey
+(USGS). Although the software has been subjected to rigorous review, the USGS
+reserves the right to update the software as needed pursuant to further
+analysis and review. No warranty, expressed or implied, is made by the USGS or
+the U.S. Government as to the functionality of the software and related
+material nor shall the fact of release constitute any such warranty.
+Furthermore, the software is released on condition that neither the USGS nor
+the U.S. Government shall be held liable for any damages resulting from its
+authorized or unauthorized use.
+
+Created:        17 Oct 2026
+Version:        1.2
+
+Changelog
+1.0     17 Oct 2026     Original development. Sensor and band detection from
+                        file names, moved out of the toolbox tools.
+1.1     17 Oct 2026     Detection results cached per file name.
+1.2     17 Oct 2026     Scene QA bands told apart from products named after
+                        them.
+"""
+import os
+
+# sensor display name: scene ID prefixes
+sensor_ids = [
+    ('Landsat 4-5, 7', ['LE07', 'LT05', 'LT04']),
+    ('Landsat 8', ['LC08', 'LT08', 'LO08'])
+]
+
+# sensor display name: qa_values sensor name
+sensor_codes = {
+    'Landsat 4-5, 7': 'L47',
+    'Landsat 8': 'L8'
+}
+
+# band: file name patterns (ESPA, then Level-1/ARD)
+band_ids = [
+    ('BQA', ['bqa', 'BQA']),
+    ('pixel_qa', ['pixel_qa', 'PIXELQA']),
+    ('radsat_qa', ['radsat_qa', 'RADSATQA']),
+    ('sr_aerosol', ['sr_aerosol', 'SRAEROSOLQA']),
+    ('sr_cloud_qa', ['sr_cloud_qa', 'SRCLOUDQA'])
+]
+
+# all band types, in the order shown by the tools
+band_names = [b for b, _ in band_ids]
+
+# sensor display name: bands available for sensor
+sensor_bands = {
+    'Landsat 8': ['BQA',
+                  'pixel_qa',
+                  'radsat_qa',
+                  'sr_aerosol'],
+    'Landsat 4-5, 7': ['BQA',
+                       'pixel_qa',
+                       'radsat_qa',
+                       'sr_cloud_qa']
+}
+
+
+# path: detected sensor, and path: detected band; the toolbox asks again on
+#   every parameter change of its dialog
+_sensors = {}
+_bands = {}
+
+# entries kept in each of the above before they are cleared
+MAX_CACHED = 4096
+
+
+def _match(path, id_list):
+    # first name whose patterns occur in path
+    for name, ids in id_list:
+        for i in ids:
+            if i in path:
+                return name
+
+    return None
+
+
+def _cached(cache, path, id_list):
+    try:
+        return cache[path]
+    except KeyError:
+        pass
+
+    if len(cache) >= MAX_CACHED:
+        cache.clear()
+    cache[path] = _match(path, id_list)
+
+    return cache[path]
+
+
+def detect_sensor(path):
+    """
+    Determine sensor from the scene ID in a file name.
+
+    :param path: <str> Path to raster.
+    :return: <str> Sensor display name, or None if not found.
+    """
+    return _cached(_sensors, path, sensor_ids)
+
+
+def detect_band(path):
+    """
+    Determine QA band from a file name.
+
+    :param path: <str> Path to raster.
+    :return: <str> Band type, or None if not found.
+    """
+    return _cached(_bands, path, band_ids)
+
+
+def detect_scene_band(path):
+    """
+    Determine QA band of a scene's own QA raster, whose file name (less its
+    extension) ends with the band ID, e.g. "..._pixel_qa.tif" or
+    "..._BQA.TIF". Products named after a scene (e.g.
+    "..._pixel_qa_cloud.img") are not QA bands.
+
+    :param path: <str> Path to raster.
+    :return: <str> Band type, or None if not a scene QA band.
+    """
+    name = os.path.splitext(os.path.basename(path))[0]
+    for band, ids in band_ids:
+        for i in ids:
+            if name.endswith("_" + i):
+                return band
+
+    return None
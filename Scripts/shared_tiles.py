@@ -0,0 +1,200 @@
+"""
+This software has been approved for release by the U.S. Geological Survey
+(USGS). Although the software has been subjected to rigorous review, the USGS
+reserves the right to update the software as needed pursuant to further
+analysis and review. No warranty, expressed or implied, is made by the USGS or
+the U.S. Government as to the functionality of the software and related
+material nor shall the fact of release constitute any such warranty.
+Furthermore, the software is released on condition that neither the USGS nor
+the U.S. Government shall be held liable for any damages resulting from its
+authorized or unauthorized use.
+
+Created:        17 Oct 2026
+Version:        1.2
+
+Changelog
+1.0     17 Oct 2026     Original development. Tiles of one raster processed
+                        by worker processes over memory-mapped files.
+1.1     17 Oct 2026     Byte order of ENVI rasters shared in place kept.
+1.2     17 Oct 2026     Tile results returned as they arrive on Python 2.
+
+Worker processes are only sent the location of the input and output arrays
+and a window, never the pixels: the input raster (or a scratch copy of it)
+and the output bands are memory-mapped by every process, so the operating
+system holds one copy of each in its page cache, whatever the number of
+workers. Each worker writes a disjoint window of the outputs.
+"""
+import os
+import shutil
+import tempfile
+import multiprocessing
+import numpy as np
+import instrument
+
+# rows per tile when no block size is given
+TILE_ROWS = 1024
+
+# (path, mode): memory map opened by this process
+_mapped = {}
+
+
+class SharedArray(object):
+    def __init__(self, path, dtype, shape, offset=0):
+        """
+        Array in a file, memory-mapped by each process using it.
+
+        Only the description is pickled when sent to a worker.
+
+        :param path: <str> Path to file.
+        :param dtype: <numpy.dtype> Data type, with byte order.
+        :param shape: <tuple> Shape of array.
+        :param offset: <int> Offset of the array in the file, in bytes.
+        """
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.shape = tuple(shape)
+        self.offset = offset
+
+    def create(self):
+        """
+        Create the file (filled with zeros) and map it for writing.
+
+        :return: <numpy.memmap>
+        """
+        return np.memmap(self.path, dtype=self.dtype, mode="w+",
+                         shape=self.shape)
+
+    def open(self, mode="r"):
+        """
+        Map the array, or return the map already opened by this process.
+
+        :param mode: <str> "r" or "r+".
+        :return: <numpy.memmap>
+        """
+        key = (self.path, mode)
+        if key not in _mapped:
+            _mapped[key] = np.memmap(self.path, dtype=self.dtype, mode=mode,
+                                     shape=self.shape, offset=self.offset)
+        return _mapped[key]
+
+
+def share_raster(reader, directory):
+    """
+    Describe a raster's band as a SharedArray.
+
+    ENVI rasters whose band 1 is stored contiguously (bsq, or any single band
+    raster) are shared in place, in the byte order of the file. Others are
+    copied, block by block, to a scratch file in directory.
+
+    :param reader: <RasterReader> Open input raster (see raster_io).
+    :param directory: <str> Scratch directory.
+    :return: <SharedArray>
+    """
+    import raster_io
+
+    mm = getattr(reader, "mm", None)
+    if isinstance(mm, np.memmap) and reader.band.flags.c_contiguous:
+        # reader.dtype is in native byte order; the file may not be
+        return SharedArray(reader.path, reader.band.dtype, reader.shape,
+                           mm.offset)
+
+    shared = SharedArray(os.path.join(directory, "input.dat"),
+                         reader.dtype.newbyteorder("="), reader.shape)
+    copy = shared.create()
+    for (row_off, nrows, col_off, ncols), block in raster_io.iter_blocks(
+            reader, TILE_ROWS):
+        copy[row_off:row_off + nrows, col_off:col_off + ncols] = block
+    copy.flush()
+
+    return shared
+
+
+def _run_tile(task):
+    # apply func to one window, in a worker process
+    func, args, source, target, window = task
+    row_off, nrows, col_off, ncols = window
+
+    qa = np.asarray(source.open()[row_off:row_off + nrows,
+                                  col_off:col_off + ncols])
+    if not qa.dtype.isnative:
+        qa = qa.astype(qa.dtype.newbyteorder("="))
+    out = func(qa, *args)
+    if target is None:
+        return out
+
+    mm = target.open("r+")
+    for i, band in enumerate(out):
+        mm[i, row_off:row_off + nrows, col_off:col_off + ncols] = band
+
+
+def map_tiles(func, args, reader, block_rows=None, block_cols=None,
+              processes=None, bands=0, dtype="uint8", scratch=None):
+    """
+    Apply a function to each tile of a raster on a pool of processes.
+
+    With bands, func returns that many 2-D arrays per tile, which workers
+    write to memory-mapped output bands; views of the bands are returned,
+    tile by tile, for the caller to write out. Otherwise, whatever func
+    returns (e.g. counts) is sent back and returned. Results are returned in
+    row-major order, as soon as all tiles before them are done, so the
+    caller works while later tiles are processed.
+
+    Results are identical to applying func to the same blocks in a single
+    process.
+
+    :param func: <func> Function of a tile (numpy.ndarray) and args; must
+                        be defined at module level, to be sent to workers.
+    :param args: <tuple> Further arguments of func.
+    :param reader: <RasterReader> Open input raster (see raster_io).
+    :param block_rows: <int> Rows per tile (default: TILE_ROWS).
+    :param block_cols: <int> Columns per tile (default: all columns).
+    :param processes: <int> Number of worker processes (default: number of
+                            CPUs).
+    :param bands: <int> Number of output bands (default: none).
+    :param dtype: <str> Data type of output bands.
+    :param scratch: <str> Directory for scratch files (default: system
+                          temporary directory).
+    :return: <generator> (window, result) tuples, window as in
+                         raster_io.iter_windows().
+    """
+    import raster_io
+
+    processes = processes or multiprocessing.cpu_count()
+    if block_rows is None and block_cols is None:
+        block_rows = TILE_ROWS
+
+    directory = tempfile.mkdtemp(prefix="landsat_qa_", dir=scratch)
+    pool = None
+    out = None
+    try:
+        with instrument.stage("share_input"):
+            source = share_raster(reader, directory)
+
+        target = None
+        if bands:
+            target = SharedArray(os.path.join(directory, "output.dat"),
+                                 dtype, (bands,) + reader.shape)
+            out = target.create()
+
+        windows = list(raster_io.iter_windows(reader.rows, reader.cols,
+                                              block_rows, block_cols))
+        instrument.add("tiles", len(windows))
+
+        pool = multiprocessing.Pool(processes)
+        tasks = ((func, args, source, target, w) for w in windows)
+        # not zip, which waits for every result on Python 2
+        for i, result in enumerate(pool.imap(_run_tile, tasks)):
+            window = windows[i]
+            row_off, nrows, col_off, ncols = window
+            instrument.add("pixels", nrows * ncols)
+            if bands:
+                result = [out[b, row_off:row_off + nrows,
+                              col_off:col_off + ncols] for b in range(bands)]
+            yield window, result
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+        out = None
+        # maps still open (e.g. on Windows) leave files behind
+        shutil.rmtree(directory, ignore_errors=True)
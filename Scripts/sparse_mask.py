@@ -0,0 +1,417 @@
+"""
+This software has been approved for release by the U.S. Geological Survey
+(USGS). Although the software has been subjected to rigorous review, the USGS
+reserves the right to update the software as needed pursuant to further
+analysis and review. No warranty, expressed or implied, is made by the USGS or
+the U.S. Government as to the functionality of the software and related
+material nor shall the fact of release constitute any such warranty.
+Furthermore, the software is released on condition that neither the USGS nor
+the U.S. Government shall be held liable for any damages resulting from its
+authorized or unauthorized use.
+
+Created:        17 Oct 2026
+Version:        1.0
+
+Changelog
+1.0     17 Oct 2026     Original development. Run-length encoded mask
+                        rasters, for flags set on few pixels.
+
+Each row of a mask is stored as its runs of set pixels, (start, end) column
+pairs with the end excluded, so a flag set on a few pixels takes a few bytes
+whatever the size of the scene. Masks set on many short runs (e.g. noise)
+are better stored dense or packed (packed_mask).
+
+File layout:
+    MAGIC
+    header length   <uint32, little endian>
+    header          <JSON: rows, cols, count, runs (per band), geotransform,
+                     projection>
+    bands           <per band: rows + 1 run offsets <int64>, then runs x 2
+                     columns <int32>, all little endian>
+"""
+import os
+import json
+import struct
+import numpy as np
+
+MAGIC = b"LSQARLE1"
+
+# extension of sparse mask files
+SPARSE_EXT = ".qarle"
+
+_offset_type = np.dtype("<i8")
+_run_type = np.dtype("<i4")
+
+
+def encode(array, row_off=0, col_off=0):
+    """
+    Find the runs of non-zero values in each row of a block.
+
+    :param array: <numpy.ndarray> 2-D array.
+    :param row_off: <int> Row of the block in the raster.
+    :param col_off: <int> Column of the block in the raster.
+    :return: <tuple> (rows, starts, ends) int64 arrays, in row-major order.
+    """
+    nrows, ncols = array.shape
+    padded = np.zeros((nrows, ncols + 2), dtype=np.int8)
+    padded[:, 1:-1] = np.asarray(array) != 0
+    edges = np.diff(padded, axis=1)
+
+    rows, starts = np.nonzero(edges == 1)
+    ends = np.nonzero(edges == -1)[1]
+
+    return rows + row_off, starts + col_off, ends + col_off
+
+
+def _merge(rows, starts, ends):
+    """
+    Sort runs and join runs that touch (e.g. split by column blocks).
+
+    :return: <tuple> (rows, starts, ends)
+    """
+    order = np.lexsort((starts, rows))
+    rows, starts, ends = rows[order], starts[order], ends[order]
+
+    if len(rows) > 1:
+        # a run continues the previous one when it starts where it ended
+        cont = np.r_[False, (rows[1:] == rows[:-1]) &
+                     (starts[1:] == ends[:-1])]
+        first = ~cont
+        last = np.r_[first[1:], True]
+        rows, starts, ends = rows[first], starts[first], ends[last]
+
+    return rows, starts, ends
+
+
+def _write_file(path, rows, cols, bands, geotransform, projection):
+    """
+    Write a sparse mask.
+
+    :param bands: <list> (rows, starts, ends) runs of each band.
+    """
+    header = {"rows": rows, "cols": cols, "count": len(bands),
+              "runs": [len(b[0]) for b in bands],
+              "geotransform": list(geotransform) if geotransform else None,
+              "projection": projection or ""}
+    raw = json.dumps(header, sort_keys=True).encode("utf-8")
+
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(raw)))
+        f.write(raw)
+        for run_rows, starts, ends in bands:
+            offsets = np.zeros(rows + 1, dtype=_offset_type)
+            np.cumsum(np.bincount(run_rows, minlength=rows), out=offsets[1:])
+            f.write(offsets.tobytes())
+            f.write(np.column_stack((starts, ends)).astype(_run_type)
+                    .tobytes())
+
+
+class SparseMask(object):
+    def __init__(self, path):
+        """
+        Sparse mask file, opened for reading.
+
+        Run offsets and runs are memory-mapped, so reading a window only
+        touches the runs of its rows.
+
+        :param path: <str> Path to mask.
+        """
+        self.path = path
+
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise IOError("{0} is not a sparse mask".format(path))
+            size = struct.unpack("<I", f.read(4))[0]
+            header = json.loads(f.read(size).decode("utf-8"))
+            offset = f.tell()
+
+        self.rows = header["rows"]
+        self.cols = header["cols"]
+        self.count = header["count"]
+        self.geotransform = tuple(header["geotransform"]) \
+            if header["geotransform"] else None
+        self.projection = header["projection"]
+        self.dtype = np.dtype("uint8")
+        self.nodata = None
+
+        # (run offsets, runs) of each band
+        self.bands = []
+        for n in header["runs"]:
+            offsets = np.memmap(path, dtype=_offset_type, mode="r",
+                                offset=offset, shape=(self.rows + 1,))
+            offset += offsets.nbytes
+            runs = np.memmap(path, dtype=_run_type, mode="r", offset=offset,
+                             shape=(n, 2)) if n else \
+                np.zeros((0, 2), dtype=_run_type)
+            offset += n * 2 * _run_type.itemsize
+            self.bands.append((offsets, runs))
+
+    @property
+    def shape(self):
+        return self.rows, self.cols
+
+    def runs(self, row_off=0, nrows=None, band=1):
+        """
+        Read the runs of rows of one band.
+
+        :param row_off: <int> First row.
+        :param nrows: <int> Number of rows (default: to last row).
+        :param band: <int> Band number (starting at 1).
+        :return: <tuple> (rows, starts, ends) int64 arrays.
+        """
+        if nrows is None:
+            nrows = self.rows - row_off
+
+        offsets, runs = self.bands[band - 1]
+        lo, hi = int(offsets[row_off]), int(offsets[row_off + nrows])
+        counts = np.diff(np.asarray(offsets[row_off:row_off + nrows + 1]))
+        rows = np.repeat(np.arange(row_off, row_off + nrows), counts)
+        block = np.asarray(runs[lo:hi], dtype=np.int64)
+
+        return rows, block[:, 0], block[:, 1]
+
+    def read(self, row_off=0, nrows=None, col_off=0, ncols=None, band=1):
+        """
+        Read a window of one band, as 0/1 values.
+
+        Only the runs of the window's rows are read.
+
+        :param row_off: <int> First row of window.
+        :param nrows: <int> Number of rows (default: to last row).
+        :param col_off: <int> First column of window.
+        :param ncols: <int> Number of columns (default: to last column).
+        :param band: <int> Band number (starting at 1).
+        :return: <numpy.ndarray> 2-D uint8 array.
+        """
+        if nrows is None:
+            nrows = self.rows - row_off
+        if ncols is None:
+            ncols = self.cols - col_off
+
+        rows, starts, ends = self.runs(row_off, nrows, band)
+        starts = np.clip(starts - col_off, 0, ncols)
+        ends = np.clip(ends - col_off, 0, ncols)
+        keep = ends > starts
+        rows, starts, ends = rows[keep] - row_off, starts[keep], ends[keep]
+
+        # +1 where each run starts and -1 where it ends, summed along rows
+        edges = np.zeros((nrows, ncols + 1), dtype=np.int32)
+        np.add.at(edges, (rows, starts), 1)
+        np.add.at(edges, (rows, ends), -1)
+
+        return (np.cumsum(edges[:, :-1], axis=1) > 0).astype(np.uint8)
+
+    def close(self):
+        self.bands = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class SparseMaskWriter(object):
+    def __init__(self, path, like, count=1):
+        """
+        Sparse mask opened for writing, georeferenced like an input raster.
+
+        Has the same write() interface as raster_io.RasterWriter. Runs are
+        collected as blocks are written and saved when the mask is closed.
+
+        :param path: <str> Path to output mask.
+        :param like: <RasterReader> Raster providing size and georeferencing.
+        :param count: <int> Number of bands.
+        """
+        self.path = path
+        self.rows, self.cols = like.shape
+        self.count = count
+        self.geotransform = like.geotransform
+        self.projection = like.projection
+
+        # runs found in each band, block by block
+        self._runs = [[] for _ in range(count)]
+
+    @property
+    def shape(self):
+        return self.rows, self.cols
+
+    def write(self, array, row_off=0, col_off=0, band=1):
+        """
+        Write a window of one band.
+
+        :param array: <numpy.ndarray> 2-D array, non-zero values are set.
+        :param row_off: <int> First row of window.
+        :param col_off: <int> First column of window.
+        :param band: <int> Band number (starting at 1).
+        :return:
+        """
+        self._runs[band - 1].append(encode(array, row_off, col_off))
+
+    def close(self):
+        if self._runs is None:
+            return
+
+        bands = []
+        for blocks in self._runs:
+            if blocks:
+                bands.append(_merge(*[np.concatenate(a)
+                                      for a in zip(*blocks)]))
+            else:
+                bands.append(tuple(np.zeros(0, dtype=np.int64)
+                                   for _ in range(3)))
+
+        _write_file(self.path, self.rows, self.cols, bands,
+                    self.geotransform, self.projection)
+        self._runs = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def open_mask(path):
+    """
+    Open a sparse mask for reading.
+
+    :param path: <str> Path to mask.
+    :return: <SparseMask>
+    """
+    return SparseMask(path)
+
+
+def create_mask(path, like, count=1):
+    """
+    Create a sparse mask georeferenced like an input raster.
+
+    :param path: <str> Path to output mask.
+    :param like: <RasterReader> Raster providing size and georeferencing.
+    :param count: <int> Number of bands.
+    :return: <SparseMaskWriter>
+    """
+    return SparseMaskWriter(path, like, count)
+
+
+def _combine(runs, weights, select, rows, cols):
+    """
+    Combine runs of several masks, without expanding them to pixels.
+
+    Every run adds its input's weight to a coverage value from its start to
+    its end; the result is the runs where select(coverage) is True.
+
+    :param runs: <list> (rows, starts, ends) of each input.
+    :param weights: <list> Weight of each input.
+    :param select: <func> Function of coverage array, returning booleans.
+    :param rows: <int> Number of rows in masks.
+    :param cols: <int> Number of columns in masks.
+    :return: <tuple> (rows, starts, ends)
+    """
+    width = cols + 1
+    keys = np.concatenate([r * width + s for r, s, _ in runs] +
+                          [r * width + e for r, _, e in runs])
+    deltas = np.concatenate(
+        [np.full(len(r), w, dtype=np.int64) for (r, _, _), w in
+         zip(runs, weights)] +
+        [np.full(len(r), -w, dtype=np.int64) for (r, _, _), w in
+         zip(runs, weights)])
+
+    empty = np.zeros(0, dtype=np.int64)
+    if not len(keys):
+        return empty, empty, empty
+
+    # coverage is constant from each distinct key to the next
+    points, inverse = np.unique(keys, return_inverse=True)
+    cover = np.cumsum(np.bincount(inverse, weights=deltas,
+                                  minlength=len(points)).astype(np.int64))
+    sel = select(cover)
+
+    before = np.r_[False, sel[:-1]]
+    after = np.r_[sel[1:], False]
+    starts = points[sel & ~before]
+    ends = points[np.nonzero(sel & ~after)[0] + 1]
+
+    # runs never cross rows, as no row is covered past its last column
+    return starts // width, starts % width, ends % width
+
+
+def _combine_files(paths, out_path, bands, weights, select, extra=None):
+    masks = [open_mask(p) for p in paths]
+    bands = bands or [1] * len(masks)
+    try:
+        first = masks[0]
+        for m in masks[1:]:
+            if m.shape != first.shape:
+                raise ValueError("Masks differ in size: {0} and {1}"
+                                 .format(first.path, m.path))
+
+        runs = [m.runs(band=b) for m, b in zip(masks, bands)]
+        if extra is not None:
+            runs.append(extra(first))
+
+        out = _combine(runs, weights, select, first.rows, first.cols)
+        _write_file(out_path, first.rows, first.cols, [out],
+                    first.geotransform, first.projection)
+    finally:
+        for m in masks:
+            m.close()
+
+    return out_path
+
+
+def mask_and(paths, out_path, bands=None):
+    """
+    Pixels set in all of the input masks, computed from their runs.
+
+    :param paths: <list> Paths to input masks.
+    :param out_path: <str> Path to output mask.
+    :param bands: <list> Band number of each input (default: 1).
+    :return: <str> out_path
+    """
+    n = len(paths)
+    return _combine_files(paths, out_path, bands, [1] * n,
+                          lambda c: c == n)
+
+
+def mask_or(paths, out_path, bands=None):
+    """
+    Pixels set in any of the input masks, computed from their runs.
+
+    :param paths: <list> Paths to input masks.
+    :param out_path: <str> Path to output mask.
+    :param bands: <list> Band number of each input (default: 1).
+    :return: <str> out_path
+    """
+    return _combine_files(paths, out_path, bands, [1] * len(paths),
+                          lambda c: c > 0)
+
+
+def mask_not(path, out_path, band=1):
+    """
+    Pixels not set in the input mask, computed from its runs.
+
+    :param path: <str> Path to input mask.
+    :param out_path: <str> Path to output mask.
+    :param band: <int> Band number of input.
+    :return: <str> out_path
+    """
+    def whole_rows(m):
+        rows = np.arange(m.rows, dtype=np.int64)
+        return rows, np.zeros(m.rows, dtype=np.int64), \
+            np.full(m.rows, m.cols, dtype=np.int64)
+
+    # covered by the whole rows (1) but not by the mask (2)
+    return _combine_files([path], out_path, [band], [2, 1],
+                          lambda c: c == 1, whole_rows)
+
+
+def sparse_name(path):
+    """
+    Return the sparse mask name for an output raster name.
+
+    :param path: <str> Output raster name (e.g. basename_cloud.tif).
+    :return: <str>
+    """
+    return os.path.splitext(path)[0] + SPARSE_EXT
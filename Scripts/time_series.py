@@ -0,0 +1,217 @@
+"""
+This software has been approved for release by the U.S. Geological Survey
+(USGS). Although the software has been subjected to rigorous review, the USGS
+reserves the right to update the software as needed pursuant to further
+analysis and review. No warranty, expressed or implied, is made by the USGS or
+the U.S. Government as to the functionality of the software and related
+material nor shall the fact of release constitute any such warranty.
+Furthermore, the software is released on condition that neither the USGS nor
+the U.S. Government shall be held liable for any damages resulting from its
+authorized or unauthorized use.
+
+Created:        17 Oct 2026
+Version:        1.3
+
+Changelog
+1.0     17 Oct 2026     Original development. Per-pixel observation counts
+                        over a time series of QA rasters of one grid.
+1.1     17 Oct 2026     Flag bits looked up through lut_cache.
+1.2     17 Oct 2026     Default radsat_qa counter built from the flags of the
+                        series' sensors.
+1.3     17 Oct 2026     Rasters opened for one block at a time, so open
+                        files do not grow with the number of dates.
+"""
+import os
+import numpy as np
+import qa_api
+import lut_cache
+import flag_registry
+import extract_bands
+import instrument
+
+# name of the counter of pixels that are not Fill
+VALID = "valid"
+
+# name of the flag marking pixels outside of the scene
+FILL = "Fill"
+
+# band: (counter name, flag names) pairs; a pixel is counted when any of
+#   the flags is set
+default_counters = {
+    "pixel_qa": [("clear", ["Clear"]),
+                 ("water", ["Water"]),
+                 ("cloud", ["Cloud"]),
+                 ("shadow", ["Cloud Shadow"]),
+                 ("snow", ["Snow"])],
+    "BQA": [("cloud", ["Cloud"]),
+            ("shadow", ["High Cloud Shadow Confidence"]),
+            ("snow", ["High Snow/Ice Confidence"])],
+    "sr_cloud_qa": [("cloud", ["Cloud"]),
+                    ("shadow", ["Cloud Shadow"]),
+                    ("snow", ["Snow"]),
+                    ("water", ["Water"])],
+    "sr_aerosol": [("high_aerosol", ["High Aerosol"]),
+                   ("water", ["Water"])]
+}
+
+# band: (counter name, flag name suffix) pairs; a pixel is counted when any
+#   flag ending in the suffix, of any sensor of the series, is set
+default_suffix_counters = {
+    "radsat_qa": [("saturated", "Data Saturation")]
+}
+
+# rows per block; every raster is read once per block
+TS_BLOCK_ROWS = 256
+
+# largest number of rasters the uint16 counters can hold
+MAX_RASTERS = 65535
+
+
+def parse_counter(text):
+    """
+    Parse a counter given as "name=Flag[,Flag...]".
+
+    :param text: <str> Counter definition (e.g. "clear=Clear").
+    :return: <tuple> (name, list of flag names)
+    """
+    if "=" not in text:
+        raise ValueError("Counter '{0}' is not of the form name=Flag[,Flag]"
+                         .format(text))
+
+    name, flags = text.split("=", 1)
+
+    return name.strip(), [f.strip() for f in flags.split(",") if f.strip()]
+
+
+def counter_bits(counters, band, sens):
+    """
+    Bits of the lookup table flag masks (lut_cache) tested by each counter.
+
+    Flags not defined for the sensor (e.g. "Terrain Occlusion" on Landsat
+    4-7) are left out, so a series may mix sensors.
+
+    :param counters: <list> (counter name, flag names) pairs.
+    :param band: <str> Band type.
+    :param sens: <str> Sensor type, as either "L8" or "L47".
+    :return: <tuple> (Fill bit, or 0 if the band has no Fill flag, list of
+                      bits of each counter)
+    """
+    flags = flag_registry.get_flags(band, sens)
+
+    fill = 1 << flags[FILL].index if FILL in flags.by_name else 0
+    bits = [sum(1 << flags[f].index for f in names if f in flags.by_name)
+            for _, names in counters]
+
+    return fill, bits
+
+
+def accumulate(rasters, basename, counters=None, sensor=None, band=None,
+               block_rows=None, block_cols=None):
+    """
+    Count, for each pixel, the rasters of a time series having each counter's
+    flags set, and the rasters in which it is not Fill ("valid").
+
+    The rasters are read block by block: every raster is read for one block,
+    its counts added to uint16 counters of that block, and the counters are
+    written before the next block is read. Each raster is opened for the
+    block and closed again, so memory and open files are set by the block
+    size, not by the number of rasters.
+
+    :param rasters: <list> Paths to QA rasters of one grid (e.g. path/row),
+                           all of the same band and size.
+    :param basename: <str> Base filename for output data.
+    :param counters: <list> (counter name, flag names) pairs (default:
+                            default_counters and default_suffix_counters
+                            of the band).
+    :param sensor: <str> Sensor of all rasters (default: from each file
+                         name).
+    :param band: <str> Band type (default: from file names).
+    :param block_rows: <int> Rows per block (default: TS_BLOCK_ROWS).
+    :param block_cols: <int> Columns per block (default: all columns).
+    :return: <list> (counter name, path of output raster) pairs, "valid"
+                    first.
+    """
+    import raster_io
+
+    if not rasters:
+        raise ValueError("No rasters given.")
+    if len(rasters) > MAX_RASTERS:
+        raise ValueError("At most {0} rasters can be counted."
+                         .format(MAX_RASTERS))
+
+    scenes = [qa_api.resolve_scene(r, sensor, band) for r in rasters]
+    bands = sorted(set(b for _, b in scenes))
+    if len(bands) > 1:
+        raise ValueError("Rasters are of different bands: {0}"
+                         .format(", ".join(bands)))
+    band = bands[0]
+
+    # every flag must be defined for at least one of the sensors
+    known = []
+    for sens in sorted(set(s for s, _ in scenes)):
+        known.extend(f for f in flag_registry.get_flags(band, sens).names
+                     if f not in known)
+
+    if counters is None:
+        counters = default_counters.get(band, []) + \
+            [(name, [f for f in known if f.endswith(suffix)])
+             for name, suffix in default_suffix_counters.get(band, [])]
+    for name, flags in counters:
+        unknown = [f for f in flags if f not in known]
+        if unknown or not flags:
+            raise ValueError("Counter '{0}': no flag(s) {1} in band {2}"
+                             .format(name, ", ".join(unknown), band))
+
+    bits = dict((sens, counter_bits(counters, band, sens))
+                for sens in set(s for s, _ in scenes))
+
+    names = [VALID] + [name for name, _ in counters]
+    input_ext = os.path.splitext(rasters[0])[-1]
+    outputs = [extract_bands.output_name(basename, name, input_ext)
+               for name in names]
+
+    writers = []
+    with instrument.run("accumulate"):
+        try:
+            # check sizes without keeping every raster open
+            like = raster_io.open_raster(rasters[0])
+            like.close()
+            for r in rasters[1:]:
+                with raster_io.open_raster(r) as r_in:
+                    if r_in.shape != like.shape:
+                        raise ValueError("Rasters differ in size: {0} and "
+                                         "{1}".format(rasters[0], r))
+
+            writers = [raster_io.create_raster(p, like, "uint16")
+                       for p in outputs]
+
+            for row_off, nrows, col_off, ncols in raster_io.iter_windows(
+                    like.rows, like.cols, block_rows or TS_BLOCK_ROWS,
+                    block_cols):
+                counts = np.zeros((len(names), nrows, ncols),
+                                  dtype=np.uint16)
+
+                for r, (sens, _) in zip(rasters, scenes):
+                    with instrument.stage("read"):
+                        with raster_io.open_raster(r) as r_in:
+                            qa = r_in.read(row_off, nrows, col_off, ncols)
+                    instrument.add("pixels", qa.size)
+                    instrument.add("bytes_read", qa.nbytes)
+
+                    with instrument.stage("count"):
+                        fbits = lut_cache.lookup_flag_bits(qa, band, sens)
+                        fill, cbits = bits[sens]
+                        counts[0] += (fbits & fill) == 0
+                        for i, b in enumerate(cbits, 1):
+                            if b:
+                                counts[i] += (fbits & b) != 0
+
+                with instrument.stage("write"):
+                    for i, r_out in enumerate(writers):
+                        r_out.write(counts[i], row_off, col_off)
+                instrument.add("bytes_written", counts.nbytes)
+        finally:
+            for r in writers:
+                r.close()
+
+    return list(zip(names, outputs))
@@ -0,0 +1,29 @@
+import os
+import sys
+
+import pytest
+
+# modules in Scripts import each other by name, as in the toolbox
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), "Scripts"))
+
+
+class Like(object):
+    # size and georeferencing of a raster, as read by raster_io
+    def __init__(self, rows, cols):
+        self.shape = (rows, cols)
+        self.geotransform = (500000.0, 30.0, 0.0, 4000000.0, 0.0, -30.0)
+        self.projection = "EPSG:32613"
+
+
+@pytest.fixture
+def envi_raster(tmpdir):
+    # write an array as a single band ENVI raster in tmpdir; return its path
+    def write(name, array):
+        import raster_io
+        path = str(tmpdir.join(name))
+        with raster_io.EnviWriter(path, Like(*array.shape),
+                                  array.dtype.name) as w:
+            w.write(array)
+        return path
+    return write
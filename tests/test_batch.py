@@ -0,0 +1,77 @@
+import os
+
+import numpy as np
+import pytest
+
+import batch
+import qa_api
+
+SCENE = "LC08_L1TP_044034_20170101_20170218_01_T1_pixel_qa.img"
+
+
+@pytest.fixture
+def scene(envi_raster):
+    # ENVI pixel_qa: fill, clear, water, shadow, snow and cloud values
+    rng = np.random.RandomState(0)
+    qa = rng.choice([1, 322, 324, 328, 336, 352, 480, 834],
+                    size=(20, 30)).astype(np.uint16)
+    return batch.Scene(envi_raster(SCENE, qa))
+
+
+@pytest.fixture
+def decodes(monkeypatch):
+    # decode holding the table in the raster itself, as GDAL does in Erdas
+    #   Imagine rasters; ENVI rasters here, so the sidecar is written too
+    calls = []
+
+    def decode(raster, *args, **kwargs):
+        calls.append(raster)
+        with open(raster, "ab") as f:
+            f.write(b"RAT")
+        with open(raster + ".aux.xml", "w") as f:
+            f.write("<PAMDataset/>")
+
+    monkeypatch.setattr(qa_api, "decode", decode)
+    return calls
+
+
+def test_second_run_skips_products(tmpdir, scene, decodes):
+    kwargs = {"flags": ["Cloud", "Water"], "backend": "numpy",
+              "manifest": str(tmpdir.join("manifest"))}
+
+    first = batch.process_scene(scene, **kwargs)
+    assert first["status"] == "ok", first["error"]
+    assert first["skipped"] == []
+
+    second = batch.process_scene(scene, **kwargs)
+    assert second["status"] == "ok", second["error"]
+    assert second["skipped"] == ["decode", "Cloud", "Water"]
+    assert sorted(second["outputs"]) == sorted(first["outputs"])
+    assert len(decodes) == 1
+
+
+def test_missing_output_redone(tmpdir, scene, decodes):
+    kwargs = {"flags": ["Cloud", "Water"], "backend": "numpy",
+              "manifest": str(tmpdir.join("manifest"))}
+
+    first = batch.process_scene(scene, **kwargs)
+    water = [p for p in first["outputs"] if p.endswith("_water.img")][0]
+    os.remove(water)
+
+    second = batch.process_scene(scene, **kwargs)
+    assert second["skipped"] == ["decode", "Cloud"]
+    assert os.path.exists(water)
+
+
+def test_unknown_outputs_not_recorded(tmpdir, scene, decodes, monkeypatch):
+    kwargs = {"decode": False, "flags": ["Cloud", "Water"],
+              "backend": "numpy", "manifest": str(tmpdir.join("manifest"))}
+
+    # a backend not returning one output per flag
+    monkeypatch.setattr(qa_api, "extract", lambda *a, **k: [])
+    batch.process_scene(scene, **kwargs)
+
+    monkeypatch.undo()
+    second = batch.process_scene(scene, **kwargs)
+    assert second["skipped"] == []
+    assert len(second["outputs"]) == 2
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+import decode_engine
+import lut_cache
+from lookup_dict import bit_flags
+
+
+def baseline_label(value, band, sens, rm_low):
+    # labelling of one value as in qa_decode.build_attr_table before the
+    #   NumPy engine (release 1.2), without the ArcPy cursor
+    bit_values = sorted(bit_flags[band][sens].values())
+    bit_bool = [all(value & 1 << b > 0 for b in bv) for bv in bit_values]
+    true_bits = [i for (i, bb) in zip(bit_values, bit_bool) if bb]
+
+    bb_double = [len(i) > 1 for i in true_bits]
+    if any(bb_double):
+        dbits = [b for i, db in zip(true_bits, bb_double) if db for b in i]
+        true_bits = [t for t in true_bits
+                     if all(t[0] != d or len(t) > 1 for d in dbits)]
+
+    bits = true_bits
+    if len(bits) == 0:
+        if band == 'radsat_qa':
+            return 'No Saturation'
+        elif band == 'sr_cloud_qa' or band == 'sr_aerosol':
+            return 'None'
+        elif band == 'BQA':
+            return 'Not Determined'
+
+    desc = []
+    for tb in bits:
+        k = next(key for key, v in bit_flags[band][sens].items() if v == tb)
+        if rm_low and band != 'BQA' and 'low' in k.lower():
+            continue
+        elif rm_low and band == 'BQA' and 'low' in k.lower() and \
+                tb == bits[-1] and 'radiometric' not in k.lower() and \
+                not desc:
+            k = 'Clear'
+        elif rm_low and band == 'BQA' and 'low' in k.lower():
+            if 'radiometric' not in k.lower():
+                continue
+
+        if band == 'radsat_qa':
+            if not desc:
+                desc = "Band {0} Data Saturation".format(tb[0])
+            else:
+                desc = "{0},{1} Data Saturation".format(
+                    desc[:desc.find('Data') - 1], tb[0])
+        else:
+            if not desc:
+                desc = "{0}".format(k)
+            else:
+                desc += ", {0}".format(k)
+
+    if not desc:
+        desc = 'ERROR: bit set incorrectly'
+
+    return desc
+
+
+@pytest.mark.parametrize("rm_low", [False, True])
+@pytest.mark.parametrize("band, sens", [(b, s) for b in sorted(bit_flags)
+                                        for s in sorted(bit_flags[b])])
+def test_labels_match_baseline(band, sens, rm_low):
+    # every combination of the bits any flag uses
+    top = max(b for bits in bit_flags[band][sens].values() for b in bits)
+    values = np.arange(1 << (top + 1))
+    expected = [baseline_label(v, band, sens, rm_low) for v in values]
+
+    assert decode_engine.decode_values(values, band, sens, rm_low).tolist() \
+        == expected
+    assert lut_cache.lookup_labels(values, band, sens, rm_low).tolist() \
+        == expected
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+import flag_expr
+import flag_registry
+
+
+def _name(n):
+    return "name", n
+
+
+def test_tokenize_joins_words_of_a_name():
+    assert flag_expr.tokenize('Cloud AND NOT "Cloud Shadow" | ~Snow') == [
+        ("name", "Cloud"), ("and", "AND"), ("not", "NOT"),
+        ("name", "Cloud Shadow"), ("or", "|"), ("not", "~"),
+        ("name", "Snow")]
+    assert flag_expr.tokenize("High  Cirrus Confidence") == [
+        ("name", "High Cirrus Confidence")]
+
+
+@pytest.mark.parametrize("text, tree", [
+    ("A OR B AND C",
+     ("or", [_name("A"), ("and", [_name("B"), _name("C")])])),
+    ("A AND B OR C",
+     ("or", [("and", [_name("A"), _name("B")]), _name("C")])),
+    ("NOT A AND B",
+     ("and", [("not", _name("A")), _name("B")])),
+    ("NOT (A AND B)",
+     ("not", ("and", [_name("A"), _name("B")]))),
+    ("A AND (B OR C)",
+     ("and", [_name("A"), ("or", [_name("B"), _name("C")])])),
+    ("~~A | B & !C",
+     ("or", [("not", ("not", _name("A"))),
+             ("and", [_name("B"), ("not", _name("C"))])])),
+    ("a or b or c",
+     ("or", [_name("a"), _name("b"), _name("c")])),
+])
+def test_precedence(text, tree):
+    assert flag_expr.parse(text) == tree
+
+
+@pytest.mark.parametrize("text", [
+    "", "Cloud AND", "OR Cloud", "(Cloud", "Cloud)", "Cloud AND ()",
+    'Cloud "Cloud Shadow"', "NOT", 'Cloud AND "Snow',
+])
+def test_syntax_errors(text):
+    with pytest.raises(ValueError):
+        flag_expr.parse(text)
+
+
+def test_unknown_flag():
+    with pytest.raises(ValueError) as e:
+        flag_expr.Expression("Cloud AND Smoke", "pixel_qa", "L8")
+    assert "Smoke" in str(e.value)
+
+
+def test_truth_table_matches_flags():
+    flags = flag_registry.get_flags("pixel_qa", "L8")
+    qa = np.arange(1 << 16, dtype=np.uint16)
+
+    def has(name):
+        f = flags[name]
+        return (qa.astype(np.int64) & f.mask) == f.value
+
+    expr = flag_expr.Expression(
+        'cloud and not "Cloud Shadow" or (Snow AND NOT Fill)', "pixel_qa",
+        "L8")
+    expected = has("Cloud") & ~has("Cloud Shadow") | \
+        (has("Snow") & ~has("Fill"))
+
+    np.testing.assert_array_equal(expr.evaluate(qa), expected)
+    # values of other integer types are tested flag by flag
+    np.testing.assert_array_equal(expr.evaluate(qa.astype(np.int32)),
+                                  expected)
+    assert expr.matching_values([322, 352, 480, 834]) == \
+        [v for v in [322, 352, 480, 834] if expected[v]]
+
+
+def test_compiled_once_per_expression():
+    a = flag_expr.compile_expr("Cloud  AND NOT Water", "pixel_qa", "L8")
+    b = flag_expr.compile_expr("Cloud AND NOT Water", "pixel_qa", "L8")
+    assert a is b
+    assert a is not flag_expr.compile_expr("Cloud AND NOT Water",
+                                           "pixel_qa", "L47")
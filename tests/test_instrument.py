@@ -0,0 +1,72 @@
+import json
+import os
+import threading
+
+import numpy as np
+import pytest
+
+import instrument
+
+
+@pytest.fixture
+def reports(tmpdir, monkeypatch):
+    # reports written as JSON lines, in order
+    fname = str(tmpdir.join("profile.jsonl"))
+    monkeypatch.setenv("LANDSAT_QA_PROFILE_FILE", fname)
+    instrument.enable()
+    instrument.reset()
+    yield lambda: [json.loads(line) for line in open(fname)] \
+        if os.path.exists(fname) else []
+    instrument.enable(False)
+
+
+def test_nested_runs_report_once(reports):
+    with instrument.run("outer"):
+        instrument.add("pixels", 5)
+        with instrument.run("inner"):
+            with instrument.stage("read"):
+                instrument.add("pixels", 3)
+
+    rep, = reports()
+    assert rep["run"] == "outer"
+    assert rep["counters"] == {"pixels": 8}
+    assert rep["stages"]["read"]["calls"] == 1
+
+
+def test_runs_on_threads_reported_separately(reports):
+    started, done = threading.Event(), threading.Event()
+
+    def other():
+        started.wait()
+        with instrument.run("other"):
+            instrument.add("rows", 2)
+        done.set()
+
+    t = threading.Thread(target=other)
+    t.start()
+    with instrument.run("main"):
+        instrument.add("pixels", 1)
+        started.set()
+        done.wait()
+    t.join()
+
+    runs = dict((r["run"], r) for r in reports())
+    assert sorted(runs) == ["main", "other"]
+    assert runs["other"]["counters"] == {"rows": 2}
+    # work done meanwhile on other threads is included
+    assert runs["main"]["counters"] == {"pixels": 1, "rows": 2}
+
+
+def test_sparse_bytes_written(reports, envi_raster):
+    import extract_bands
+
+    qa = np.where(np.arange(600).reshape(20, 30) % 7, 322, 352)
+    path = envi_raster("x_pixel_qa.img", qa.astype(np.uint16))
+    outputs = extract_bands.extract_bits_from_band(
+        path, "L8", "pixel_qa", ["Cloud", "Clear"],
+        os.path.splitext(path)[0], backend="numpy", sparse=True,
+        block_rows=6)
+
+    rep, = reports()
+    assert rep["counters"]["bytes_written"] == \
+        sum(os.path.getsize(p) for p in outputs)
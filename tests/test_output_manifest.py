@@ -0,0 +1,86 @@
+import os
+
+import pytest
+
+import output_manifest
+
+
+@pytest.fixture
+def store(tmpdir):
+    return output_manifest.Manifest(str(tmpdir.join("manifest")))
+
+
+@pytest.fixture
+def product(tmpdir):
+    out = tmpdir.join("x_cloud.img")
+    out.write(b"\x01")
+    return {"kind": "extract", "flags": ["Cloud"]}, str(out)
+
+
+def test_current_until_settings_change(store, product):
+    key, out = product
+    store.record(key, {"input": "a", "flags": "v1"}, [out])
+
+    assert store.is_current(key, {"input": "a", "flags": "v1"})
+    assert not store.is_current(key, {"input": "b", "flags": "v1"})
+    assert not store.is_current(key, {"input": "a", "flags": "v2"})
+    assert not store.is_current({"kind": "decode"}, {"input": "a"})
+    assert store.outputs(key) == [out]
+
+
+def test_stale_when_output_missing(store, product):
+    key, out = product
+    store.record(key, {"input": "a"}, [out])
+    os.remove(out)
+
+    assert not store.is_current(key, {"input": "a"})
+
+
+def test_record_replaces_entry(store, product):
+    key, out = product
+    store.record(key, {"input": "a"}, [out])
+    store.record(key, {"input": "b"}, [out])
+
+    assert store.is_current(key, {"input": "b"})
+    assert not store.is_current(key, {"input": "a"})
+
+
+def test_record_replaces_entry_without_os_replace(store, product,
+                                                  monkeypatch):
+    # Python 2 on Windows: no os.replace, and os.rename does not overwrite
+    rename = os.rename
+
+    def rename_no_overwrite(src, dst):
+        if os.path.exists(dst):
+            raise OSError(17, "File exists", dst)
+        rename(src, dst)
+
+    monkeypatch.delattr(os, "replace", raising=False)
+    monkeypatch.setattr(os, "rename", rename_no_overwrite)
+
+    key, out = product
+    store.record(key, {"input": "a"}, [out])
+    store.record(key, {"input": "b"}, [out])
+
+    assert store.is_current(key, {"input": "b"})
+    entries = os.listdir(os.path.join(store.path, "products"))
+    assert [e for e in entries if e.endswith(".tmp")] == []
+
+
+def test_input_hash_follows_content(store, tmpdir):
+    raster = tmpdir.join("x_pixel_qa.img")
+    raster.write(b"\x00" * 16)
+    first = store.input_hash(str(raster))
+
+    assert first == output_manifest.content_hash(str(raster))
+    assert store.input_hash(str(raster)) == first
+
+    raster.write(b"\x01" * 17)
+    assert store.input_hash(str(raster)) != first
+
+
+def test_flag_version_only_of_flags_used():
+    cloud = output_manifest.flag_version("pixel_qa", "L8", ["Cloud"])
+
+    assert cloud == output_manifest.flag_version("pixel_qa", "L8", ["Cloud"])
+    assert cloud != output_manifest.flag_version("pixel_qa", "L8", ["Water"])
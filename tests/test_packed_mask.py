@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+import packed_mask
+from conftest import Like
+
+
+def test_bits_msb_first_rows_padded(tmpdir):
+    mask = np.zeros((2, 10), dtype=np.uint8)
+    mask[0, [0, 7, 8]] = 1
+    mask[1, 9] = 1
+    path = str(tmpdir.join("m.qamask"))
+    with packed_mask.create_mask(path, Like(2, 10)) as out:
+        out.write(mask)
+
+    with packed_mask.open_mask(path) as m:
+        assert m.row_bytes == 2
+        np.testing.assert_array_equal(m.read_packed(),
+                                      [[0x81, 0x80], [0x00, 0x40]])
+        np.testing.assert_array_equal(m.read(), mask)
+
+
+@pytest.mark.parametrize("col_off", range(8))
+@pytest.mark.parametrize("ncols", [1, 3, 8, 11])
+def test_partial_byte_read_modify_write(tmpdir, col_off, ncols):
+    # ones everywhere, then a window of zeros sharing bytes with its
+    #   neighbours: only the window's bits may change
+    path = str(tmpdir.join("m.qamask"))
+    with packed_mask.create_mask(path, Like(3, 21)) as out:
+        out.write(np.ones((3, 21), dtype=np.uint8))
+        out.write(np.zeros((1, ncols), dtype=np.uint8), 1, col_off)
+
+    expected = np.ones((3, 21), dtype=np.uint8)
+    expected[1, col_off:col_off + ncols] = 0
+    with packed_mask.open_mask(path) as m:
+        np.testing.assert_array_equal(m.read(), expected)
+        np.testing.assert_array_equal(
+            m.read(1, 1, col_off, ncols), expected[1:2,
+                                                   col_off:col_off + ncols])
+
+
+def test_unaligned_column_blocks(tmpdir):
+    rng = np.random.RandomState(1)
+    mask = (rng.random_sample((11, 29)) < 0.4).astype(np.uint8)
+    path = str(tmpdir.join("m.qamask"))
+    with packed_mask.create_mask(path, Like(*mask.shape)) as out:
+        for r in range(0, 11, 4):
+            for c in range(0, 29, 5):
+                out.write(mask[r:r + 4, c:c + 5], r, c)
+
+    with packed_mask.open_mask(path) as m:
+        np.testing.assert_array_equal(m.read(), mask)
+
+
+def test_not_keeps_padding_clear(tmpdir, monkeypatch):
+    # blocks of rows smaller than the mask, to cover every block edge
+    monkeypatch.setattr(packed_mask, "OP_BLOCK_ROWS", 2)
+    path = str(tmpdir.join("m.qamask"))
+    with packed_mask.create_mask(path, Like(5, 13)) as out:
+        out.write(np.zeros((5, 13), dtype=np.uint8))
+    out = packed_mask.mask_not(path, str(tmpdir.join("not.qamask")))
+
+    with packed_mask.open_mask(out) as m:
+        assert (m.read() == 1).all()
+        assert (m.read_packed()[:, -1] == 0xF8).all()
+
+
+def test_bitwise_operations_on_bands(tmpdir, monkeypatch):
+    monkeypatch.setattr(packed_mask, "OP_BLOCK_ROWS", 3)
+    rng = np.random.RandomState(2)
+    a, b = (rng.random_sample((2, 7, 19)) < 0.5).astype(np.uint8)
+    path = str(tmpdir.join("stack.qamask"))
+    with packed_mask.create_mask(path, Like(7, 19), count=2) as out:
+        out.write(a, band=1)
+        out.write(b, band=2)
+
+    def read(p):
+        with packed_mask.open_mask(p) as m:
+            return m.read()
+
+    out = str(tmpdir.join("out.qamask"))
+    np.testing.assert_array_equal(
+        read(packed_mask.mask_and([path, path], out, [1, 2])), a & b)
+    np.testing.assert_array_equal(
+        read(packed_mask.mask_or([path, path], out, [1, 2])), a | b)
+    np.testing.assert_array_equal(
+        read(packed_mask.mask_not(path, out, band=2)), 1 - b)
+
+
+def test_not_a_packed_mask(tmpdir):
+    path = tmpdir.join("x.qamask")
+    path.write(b"LSQARLE1")
+
+    with pytest.raises(IOError):
+        packed_mask.open_mask(str(path))
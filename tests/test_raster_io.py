@@ -0,0 +1,164 @@
+import os
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import raster_io
+
+
+def test_img_written_as_envi(tmpdir, envi_raster):
+    qa = np.arange(35, dtype=np.uint16).reshape(5, 7)
+    with raster_io.open_raster(envi_raster("qa.img", qa)) as like:
+        out = str(tmpdir.join("out.img"))
+        with raster_io.create_raster(out, like, "uint8", 2) as w:
+            w.write(qa[:, :4] % 2, 0, 0, 2)
+            w.write(qa[:, 4:] % 2, 0, 4, 2)
+
+    # same format, with a .hdr, whether or not GDAL is installed
+    assert raster_io.envi_header(out) is not None
+    with raster_io.open_raster(out) as r:
+        assert isinstance(r, raster_io.EnviReader)
+        assert r.geotransform == like.geotransform
+        np.testing.assert_array_equal(r.mm[1], qa % 2)
+
+
+@pytest.mark.skipif(raster_io.gdal is not None, reason="GDAL installed")
+def test_non_envi_name_needs_gdal(tmpdir, envi_raster):
+    qa = np.zeros((3, 3), dtype=np.uint16)
+    with raster_io.open_raster(envi_raster("qa.img", qa)) as like:
+        with pytest.raises(ImportError):
+            raster_io.create_raster(str(tmpdir.join("out.tif")), like)
+
+    assert not os.path.exists(str(tmpdir.join("out.tif")))
+
+
+class _Reader(object):
+    # reader of a rows x cols grid of row numbers, failing at row fail_at
+    def __init__(self, rows, cols, fail_at=None):
+        self.rows, self.cols = rows, cols
+        self.fail_at = fail_at
+        self.reads = 0
+
+    def read(self, row_off, nrows, col_off, ncols):
+        if row_off == self.fail_at:
+            raise IOError("bad block at row {0}".format(row_off))
+        self.reads += 1
+        return np.repeat(np.arange(row_off, row_off + nrows)[:, None],
+                         ncols, axis=1)
+
+
+def _threads_stopped(before):
+    return threading.active_count() == before
+
+
+def test_pipeline_results_in_order():
+    rng = np.random.RandomState(0)
+    delays = rng.random_sample(40) / 500
+
+    def func(block):
+        # finish out of order
+        time.sleep(delays[block[0, 0] % 40])
+        return block.sum(axis=1)
+
+    before = threading.active_count()
+    reader = _Reader(40, 5)
+    windows = [w for w, _ in raster_io.pipeline_blocks(
+        func, reader, block_rows=1, threads=3, depth=2)]
+
+    assert windows == list(raster_io.iter_windows(40, 5, 1))
+    assert _threads_stopped(before)
+
+
+@pytest.mark.parametrize("where", ["func", "reader"])
+def test_pipeline_error_raised(where):
+    def func(block):
+        if where == "func" and block[0, 0] == 12:
+            raise ValueError("bad value")
+        return block
+
+    before = threading.active_count()
+    reader = _Reader(40, 5, fail_at=12 if where == "reader" else None)
+    seen = []
+    with pytest.raises(ValueError if where == "func" else IOError):
+        for window, _ in raster_io.pipeline_blocks(
+                func, reader, block_rows=2, threads=2, depth=2):
+            seen.append(window[0])
+
+    # blocks are returned in order, and none from the failed one on
+    assert seen == list(range(0, 2 * len(seen), 2))
+    assert all(row < 12 for row in seen)
+    assert _threads_stopped(before)
+
+
+def test_pipeline_stops_with_caller():
+    before = threading.active_count()
+    reader = _Reader(1000, 5)
+    blocks = raster_io.pipeline_blocks(lambda b: b, reader, block_rows=1,
+                                       threads=2, depth=3)
+    for window, _ in blocks:
+        if window[0] == 4:
+            break
+    blocks.close()
+
+    # reading stopped at most depth + 2 * threads blocks ahead
+    assert reader.reads <= 5 + 3 + 2 * 2
+    assert _threads_stopped(before)
+
+
+def _raw_envi(tmpdir, array, byte_order=0, interleave="bsq", offset=0,
+              hdr_name="x.hdr"):
+    # write an ENVI raster by hand; array is (bands, rows, cols)
+    bands, rows, cols = array.shape
+    data = {"bsq": array, "bil": array.transpose(1, 0, 2),
+            "bip": array.transpose(1, 2, 0)}[interleave]
+    dtype = array.dtype.newbyteorder(">" if byte_order else "<")
+
+    path = tmpdir.join("x.img")
+    path.write(b"\xff" * offset + np.ascontiguousarray(data, dtype).tobytes(),
+               mode="wb")
+    tmpdir.join(hdr_name).write(
+        "ENVI\nsamples = {0}\nlines = {1}\nbands = {2}\n"
+        "header offset = {3}\ndata type = 12\ninterleave = {4}\n"
+        "byte order = {5}\n".format(cols, rows, bands, offset, interleave,
+                                    byte_order))
+    return str(path)
+
+
+@pytest.mark.parametrize("interleave", ["bsq", "bil", "bip"])
+@pytest.mark.parametrize("byte_order", [0, 1])
+def test_envi_reader_byte_order(tmpdir, byte_order, interleave):
+    # values differing in both bytes, so swapped bytes are noticed
+    array = (np.arange(2 * 6 * 9).reshape(2, 6, 9) * 257 + 1) \
+        .astype(np.uint16)
+    path = _raw_envi(tmpdir, array, byte_order, interleave, offset=5)
+
+    with raster_io.open_raster(path) as r:
+        assert r.dtype == np.dtype(np.uint16) and r.dtype.isnative
+        block = r.read(1, 3, 2, 5)
+        assert block.dtype.isnative
+        np.testing.assert_array_equal(block, array[0, 1:4, 2:7])
+        np.testing.assert_array_equal(r.read(), array[0])
+
+
+def test_envi_header_with_img_suffix(tmpdir):
+    array = np.arange(12, dtype=np.uint16).reshape(1, 3, 4)
+    path = _raw_envi(tmpdir, array, 1, hdr_name="x.img.hdr")
+
+    assert raster_io.envi_header(path) == path + ".hdr"
+    with raster_io.open_raster(path) as r:
+        np.testing.assert_array_equal(r.read(), array[0])
+
+
+def test_big_endian_blocks_pipelined(tmpdir):
+    array = (np.arange(40 * 7).reshape(1, 40, 7) * 251).astype(np.uint16)
+    path = _raw_envi(tmpdir, array, byte_order=1)
+
+    with raster_io.open_raster(path) as r:
+        out = np.zeros((40, 7), dtype=np.uint16)
+        for (row_off, nrows, _, _), block in raster_io.map_blocks(
+                lambda b: b, r, 3, threads=2, pipeline=True):
+            out[row_off:row_off + nrows] = block
+
+    np.testing.assert_array_equal(out, array[0])
@@ -0,0 +1,119 @@
+import os
+
+import numpy as np
+import pytest
+
+import sparse_mask
+from conftest import Like
+
+
+def _runs(path, band=1):
+    with sparse_mask.open_mask(path) as m:
+        rows, starts, ends = m.runs(band=band)
+    return list(zip(rows.tolist(), starts.tolist(), ends.tolist()))
+
+
+def test_encode_runs_end_exclusive():
+    mask = np.array([[1, 1, 0, 1],
+                     [0, 0, 0, 0],
+                     [1, 1, 1, 1]])
+    rows, starts, ends = sparse_mask.encode(mask, row_off=10, col_off=4)
+
+    assert list(zip(rows, starts, ends)) == [(10, 4, 6), (10, 7, 8),
+                                             (12, 4, 8)]
+
+
+def test_runs_joined_across_column_blocks(tmpdir):
+    # one run per row, split by every block of 3 columns
+    mask = np.zeros((4, 14), dtype=np.uint8)
+    mask[:, 1:12] = 1
+    mask[2, :] = 0
+    path = str(tmpdir.join("m.qarle"))
+    with sparse_mask.create_mask(path, Like(*mask.shape)) as out:
+        for c in range(0, 14, 3):
+            for r in (2, 0, 3, 1):
+                out.write(mask[r:r + 1, c:c + 3], r, c)
+
+    assert _runs(path) == [(0, 1, 12), (1, 1, 12), (3, 1, 12)]
+    with sparse_mask.open_mask(path) as m:
+        np.testing.assert_array_equal(m.read(), mask)
+
+
+def test_window_clips_runs(tmpdir):
+    rng = np.random.RandomState(1)
+    mask = (rng.random_sample((10, 27)) < 0.6).astype(np.uint8)
+    path = str(tmpdir.join("m.qarle"))
+    with sparse_mask.create_mask(path, Like(*mask.shape)) as out:
+        out.write(mask)
+
+    with sparse_mask.open_mask(path) as m:
+        for row_off, nrows, col_off, ncols in [(0, 10, 3, 5), (2, 3, 9, 18),
+                                               (9, 1, 26, 1), (4, 0, 0, 27)]:
+            np.testing.assert_array_equal(
+                m.read(row_off, nrows, col_off, ncols),
+                mask[row_off:row_off + nrows, col_off:col_off + ncols])
+
+
+def test_size_follows_runs_not_pixels(tmpdir):
+    sizes = []
+    for cols in (10, 10000):
+        path = str(tmpdir.join("m{0}.qarle".format(cols)))
+        with sparse_mask.create_mask(path, Like(3, cols)) as out:
+            out.write(np.ones((3, cols), dtype=np.uint8))
+        assert _runs(path) == [(r, 0, cols) for r in range(3)]
+        sizes.append(os.path.getsize(path))
+
+    # only the digits of the header differ
+    assert abs(sizes[1] - sizes[0]) < 8
+
+
+def test_operations_on_runs(tmpdir):
+    rng = np.random.RandomState(2)
+    masks = (rng.random_sample((3, 7, 19)) < 0.6).astype(np.uint8)
+    # rows empty, full, and touching both edges
+    masks[:, 0] = 0
+    masks[0, 1] = 1
+    masks[1, 2, [0, -1]] = 1
+    paths = []
+    for i, m in enumerate(masks):
+        paths.append(str(tmpdir.join("{0}.qarle".format(i))))
+        with sparse_mask.create_mask(paths[-1], Like(7, 19)) as out:
+            out.write(m)
+
+    def read(p):
+        with sparse_mask.open_mask(p) as m:
+            return m.read()
+
+    out = str(tmpdir.join("out.qarle"))
+    a, b, c = masks
+    np.testing.assert_array_equal(
+        read(sparse_mask.mask_and(paths, out)), a & b & c)
+    np.testing.assert_array_equal(
+        read(sparse_mask.mask_or(paths, out)), a | b | c)
+    for m, p in zip(masks, paths):
+        np.testing.assert_array_equal(
+            read(sparse_mask.mask_not(p, out)), 1 - m)
+
+    # results are runs too: none empty, none touching the next
+    runs = _runs(sparse_mask.mask_or(paths, out))
+    assert all(s < e for _, s, e in runs)
+    assert all(r0 != r1 or e0 < s1
+               for (r0, _, e0), (r1, s1, _) in zip(runs, runs[1:]))
+
+
+def test_empty_band(tmpdir):
+    path = str(tmpdir.join("stack.qarle"))
+    with sparse_mask.create_mask(path, Like(4, 6), count=2) as out:
+        out.write(np.ones((4, 6), dtype=np.uint8), band=2)
+
+    assert _runs(path, band=1) == []
+    out = sparse_mask.mask_not(path, str(tmpdir.join("not.qarle")), band=1)
+    assert _runs(out) == [(r, 0, 6) for r in range(4)]
+
+
+def test_not_a_sparse_mask(tmpdir):
+    path = tmpdir.join("x.qarle")
+    path.write(b"LSQAMSK1")
+
+    with pytest.raises(IOError):
+        sparse_mask.open_mask(str(path))